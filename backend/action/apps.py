@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.core.signals import request_finished
 
 
 class ActionConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'action'
+
+    def ready(self):
+        from action.audit import flush_on_request_finished
+        request_finished.connect(
+            flush_on_request_finished,
+            dispatch_uid='action-audit-flush',
+        )
@@ -0,0 +1,221 @@
+"""
+Buffered writer for UserAction audit events.
+
+Each process keeps a buffer of unsaved UserAction rows and writes them with
+one bulk_create when the buffer reaches AUDIT_BUFFER_SIZE, when the oldest
+event is AUDIT_FLUSH_INTERVAL seconds old (checked by a background timer
+and at the end of each request), and when the process exits. If the
+database is unavailable the events are kept, up to AUDIT_BUFFER_MAX, after
+which the oldest are dropped and counted. An interval of 0 turns off
+time-based flushing.
+
+The timer is a Python thread, so under uWSGI it needs --enable-threads;
+without it a worker that stops getting requests keeps its aged events
+until it exits (uWSGI runs atexit handlers unless --skip-atexit is set).
+"""
+import atexit
+import json
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import (
+    IntegrityError,
+    close_old_connections,
+    connection,
+    transaction,
+)
+from django.utils import timezone
+
+from core.models import UserAction
+
+logger = logging.getLogger(__name__)
+
+
+def audit_data(additional_data):
+    """JSON-safe additional_data; non-dict values are wrapped, not dropped."""
+    if additional_data is None:
+        return {'data': ['nodata']}
+    if not isinstance(additional_data, dict):
+        additional_data = {'data': additional_data}
+    try:
+        return json.loads(json.dumps(additional_data, cls=DjangoJSONEncoder))
+    except (TypeError, ValueError):
+        return {'data': repr(additional_data)}
+
+
+class AuditBuffer:
+    """Per-process buffer of UserAction rows flushed with bulk_create."""
+
+    def __init__(self, size, interval, max_buffered):
+        self.size = size
+        self.interval = interval
+        self.max_buffered = max_buffered
+        self._events = []
+        self._oldest = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer = None
+        self.stats = {
+            'buffered': 0,
+            'flushes': 0,
+            'flushed': 0,
+            'failed_flushes': 0,
+            'dropped': 0,
+            'last_flush_ms': None,
+            'max_flush_ms': 0.0,
+            'total_flush_ms': 0.0,
+        }
+
+    def add(self, user, action_type, additional_data):
+        """Queue an action; flushes inline only when the buffer is full."""
+        if not getattr(user, 'pk', None):
+            with self._lock:
+                self.stats['dropped'] += 1
+            return
+
+        event = UserAction(
+            user_id=user.pk,
+            action_type=action_type,
+            timestamp=timezone.now(),
+            additional_data=audit_data(additional_data),
+        )
+        with self._lock:
+            self._events.append(event)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            full = len(self._events) >= self.size
+        self.start_timer()
+        # Inside a transaction the batch (holding other requests' events)
+        # would roll back with it; leave it to the timer or request end
+        if full and not connection.in_atomic_block:
+            self.flush()
+
+    def due(self):
+        with self._lock:
+            return bool(self._events) and (
+                len(self._events) >= self.size
+                or (self.interval and time.monotonic() - self._oldest >= self.interval)
+            )
+
+    def _requeue(self, events):
+        """Put unsaved events back, dropping the oldest beyond max_buffered."""
+        with self._lock:
+            self._events = events + self._events
+            overflow = len(self._events) - self.max_buffered
+            if overflow > 0:
+                del self._events[:overflow]
+                self.stats['dropped'] += overflow
+            if self._events and self._oldest is None:
+                self._oldest = time.monotonic()
+
+    def _save_individually(self, events):
+        """
+        Save rows one by one after a batch failed on a bad row, dropping
+        the bad ones. Returns the number saved and the rows still unsaved
+        if the database failed partway.
+        """
+        saved = 0
+        for position, event in enumerate(events):
+            try:
+                with transaction.atomic():
+                    event.save(force_insert=True)
+            except IntegrityError:
+                with self._lock:
+                    self.stats['dropped'] += 1
+                continue
+            except Exception:
+                logger.exception("Saving audit events one by one failed")
+                return saved, events[position:]
+            saved += 1
+        return saved, []
+
+    def flush(self):
+        """Write every buffered event; returns the number saved."""
+        with self._flush_lock:
+            with self._lock:
+                events, self._events, self._oldest = self._events, [], None
+            if not events:
+                return 0
+
+            started = time.monotonic()
+            try:
+                try:
+                    with transaction.atomic():
+                        UserAction.objects.bulk_create(events, batch_size=self.size)
+                    saved, unsaved = len(events), []
+                except IntegrityError:
+                    # e.g. a user deleted since the event was queued
+                    saved, unsaved = self._save_individually(events)
+            except Exception:
+                logger.exception("Flushing %d audit events failed", len(events))
+                saved, unsaved = 0, events
+
+            if unsaved:
+                # Only rows not written yet go back, so none is saved twice
+                with self._lock:
+                    self.stats['failed_flushes'] += 1
+                    self.stats['flushed'] += saved
+                self._requeue(unsaved)
+                return saved
+
+            elapsed_ms = (time.monotonic() - started) * 1000
+            with self._lock:
+                self.stats['flushes'] += 1
+                self.stats['flushed'] += saved
+                self.stats['last_flush_ms'] = round(elapsed_ms, 2)
+                self.stats['max_flush_ms'] = round(max(self.stats['max_flush_ms'], elapsed_ms), 2)
+                self.stats['total_flush_ms'] += elapsed_ms
+            return saved
+
+    def flush_if_due(self):
+        if self.due():
+            self.flush()
+
+    def metrics(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats['buffered'] = len(self._events)
+        stats['avg_flush_ms'] = (
+            round(stats['total_flush_ms'] / stats['flushes'], 2)
+            if stats['flushes'] else None
+        )
+        stats['total_flush_ms'] = round(stats['total_flush_ms'], 2)
+        return stats
+
+    def start_timer(self):
+        """Start the background thread flushing aged events, once per process."""
+        if self._timer is not None or not self.interval:
+            return
+        with self._lock:
+            if self._timer is not None:
+                return
+            self._timer = threading.Thread(
+                target=self._run_timer,
+                name='audit-buffer-flush',
+                daemon=True,
+            )
+        self._timer.start()
+
+    def _run_timer(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                close_old_connections()
+                self.flush_if_due()
+            finally:
+                connection.close()
+
+
+audit_buffer = AuditBuffer(
+    size=settings.AUDIT_BUFFER_SIZE,
+    interval=settings.AUDIT_FLUSH_INTERVAL,
+    max_buffered=settings.AUDIT_BUFFER_MAX,
+)
+atexit.register(audit_buffer.flush)
+
+
+def flush_on_request_finished(sender, **kwargs):
+    audit_buffer.flush_if_due()
@@ -0,0 +1,110 @@
+"""
+Django command to maintain the monthly UserAction partitions
+"""
+import gzip
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from action.rollup import rolled_up_until
+from core import partitions
+from core.models import UserAction
+
+
+class Command(BaseCommand):
+    """
+    Django command to create upcoming UserAction partitions and retire
+    old ones. A new partition takes over its month's rows from the default
+    partition. A partition is only dropped once its days are in the daily
+    rollup; with --archive-dir its rows are first written to a gzipped CSV.
+    """
+
+    help = 'Create future UserAction partitions and drop or archive expired ones.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ahead',
+            type=int,
+            default=3,
+            help='Months of partitions to keep created ahead of now.',
+        )
+        parser.add_argument(
+            '--retain-months',
+            type=int,
+            default=settings.USER_ACTION_RETENTION_MONTHS,
+            help='Months of actions to keep, including the current one.',
+        )
+        parser.add_argument(
+            '--archive-dir',
+            help='Write each expired partition to a gzipped CSV here before dropping it.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would change without changing anything.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        if connection.vendor != 'postgresql':
+            raise CommandError('UserAction partitioning requires PostgreSQL.')
+
+        table = UserAction._meta.db_table
+        column = UserAction._meta.get_field('timestamp').column
+        qn = connection.ops.quote_name
+        this_month = partitions.month_start(timezone.now())
+        dry_run = options['dry_run']
+
+        with connection.cursor() as cursor:
+            if not partitions.is_partitioned(cursor, table):
+                raise CommandError(f'{table} is not partitioned.')
+            existing = partitions.list_partitions(cursor, table)
+
+            for offset in range(options['ahead'] + 1):
+                month = partitions.add_months(this_month, offset)
+                if month not in existing:
+                    self.stdout.write(f"Creating {partitions.partition_name(table, month)}")
+                    if not dry_run:
+                        with transaction.atomic():
+                            moved = partitions.split_default_partition(
+                                cursor, qn, table, column, month
+                            )
+                        if moved:
+                            self.stdout.write(f"  moved {moved} rows out of the default partition")
+
+        cutoff = partitions.add_months(this_month, 1 - options['retain_months'])
+        rolled_up = rolled_up_until()
+        for month, name in sorted(existing.items()):
+            if month >= cutoff:
+                break
+            _, end = partitions.month_bounds(month)
+            if rolled_up is None or rolled_up < end:
+                self.stdout.write(self.style.WARNING(
+                    f"Keeping {name}: not rolled up yet (run rollup_user_actions)."
+                ))
+                continue
+            self.retire_partition(table, name, options['archive_dir'], dry_run)
+
+        self.stdout.write(self.style.SUCCESS('UserAction partitions up to date.'))
+
+    def retire_partition(self, table, name, archive_dir, dry_run):
+        qn = connection.ops.quote_name
+        verb = 'Archiving and dropping' if archive_dir else 'Dropping'
+        self.stdout.write(f"{verb} {name}")
+        if dry_run:
+            return
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"ALTER TABLE {qn(table)} DETACH PARTITION {qn(name)}")
+            if archive_dir:
+                os.makedirs(archive_dir, exist_ok=True)
+                path = os.path.join(archive_dir, f"{name}.csv.gz")
+                with gzip.open(path, 'wt', newline='') as archive:
+                    cursor.copy_expert(
+                        f"COPY {qn(name)} TO STDOUT WITH (FORMAT csv, HEADER)",
+                        archive,
+                    )
+            cursor.execute(f"DROP TABLE {qn(name)}")
@@ -0,0 +1,18 @@
+"""
+Django command to roll UserActions up into daily counts
+"""
+
+from django.core.management.base import BaseCommand
+
+from action.rollup import rollup_user_actions
+
+
+class Command(BaseCommand):
+    """Django command to refresh UserActionDailyCount."""
+
+    help = 'Count UserActions per day and action type since the last rollup.'
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        rows = rollup_user_actions()
+        self.stdout.write(self.style.SUCCESS(f"Updated {rows} daily counts."))
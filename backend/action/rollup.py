@@ -0,0 +1,69 @@
+"""
+Daily per-action-type rollup of UserAction into UserActionDailyCount.
+
+Each run re-counts whole days from the day of the last run onwards, so the
+summary rows are exact and re-running is harmless. The range filter on
+timestamp lets PostgreSQL prune to the recent partitions.
+"""
+from datetime import datetime, time
+
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from core.models import JobWatermark, UserAction, UserActionDailyCount
+
+ROLLUP_WATERMARK = 'useraction-daily-rollup'
+
+
+def start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def rollup_user_actions(now=None):
+    """Refresh daily counts for every day touched since the last rollup."""
+    now = now or timezone.now()
+    with transaction.atomic():
+        watermark, _ = JobWatermark.objects.select_for_update().get_or_create(
+            name=ROLLUP_WATERMARK
+        )
+        actions = UserAction.objects.filter(timestamp__lt=now)
+        if watermark.timestamp:
+            since = start_of_day(timezone.localdate(watermark.timestamp))
+            actions = actions.filter(timestamp__gte=since)
+
+        rows = (
+            actions
+            .annotate(day=TruncDate('timestamp'))
+            .values('day', 'action_type')
+            .annotate(total=Count('id'))
+            .order_by()
+        )
+        counts = [
+            UserActionDailyCount(
+                date=row['day'],
+                action_type=row['action_type'],
+                count=row['total'],
+            )
+            for row in rows
+        ]
+        UserActionDailyCount.objects.bulk_create(
+            counts,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['date', 'action_type'],
+            update_fields=['count'],
+        )
+
+        watermark.timestamp = now
+        watermark.save()
+    return len(counts)
+
+
+def rolled_up_until():
+    """Everything before this time is reflected in the daily counts."""
+    watermark = JobWatermark.objects.filter(name=ROLLUP_WATERMARK).first()
+    if not watermark or not watermark.timestamp:
+        return None
+    return start_of_day(timezone.localdate(watermark.timestamp))
@@ -0,0 +1,92 @@
+"""
+Test the buffered UserAction writer.
+"""
+from decimal import Decimal
+from unittest import mock
+
+from django.db import IntegrityError, OperationalError
+from django.test import TestCase
+
+from action.audit import AuditBuffer, audit_data
+from core.models import User, UserAction
+
+
+class AuditBufferTests(TestCase):
+    """Test AuditBuffer"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='player@example.com',
+            password='testpass123',
+            first_name='Test',
+            last_name='Player',
+        )
+        # No background timer; flushes are driven by the test
+        self.buffer = AuditBuffer(size=3, interval=0, max_buffered=5)
+
+    def test_non_dict_data_is_wrapped(self):
+        self.assertEqual(audit_data(None), {'data': ['nodata']})
+        self.assertEqual(audit_data([1, 2]), {'data': [1, 2]})
+        self.assertEqual(audit_data({'price': Decimal('1.50')}), {'price': '1.50'})
+
+    def test_flushes_in_one_batch_when_full(self):
+        self.buffer.add(self.user, 'new review', {'id': 1})
+        self.buffer.add(self.user, 'new review', 'text')
+        self.assertFalse(self.buffer.due())
+
+        # Inside a transaction the full buffer waits for request end
+        self.buffer.add(self.user, 'new review', None)
+        self.assertEqual(UserAction.objects.count(), 0)
+        self.assertTrue(self.buffer.due())
+
+        with self.assertNumQueries(3):
+            # savepoint, INSERT, release
+            self.buffer.flush_if_due()
+
+        self.assertEqual(UserAction.objects.count(), 3)
+        self.assertEqual(self.buffer.metrics()['flushed'], 3)
+
+    def test_failed_flush_keeps_events_up_to_the_bound(self):
+        for _ in range(2):
+            self.buffer.add(self.user, 'new review', None)
+        self.buffer._requeue([
+            UserAction(user_id=self.user.pk, action_type='old', additional_data={})
+            for _ in range(4)
+        ])
+
+        metrics = self.buffer.metrics()
+        self.assertEqual(metrics['buffered'], 5)
+        self.assertEqual(metrics['dropped'], 1)
+
+    def test_partial_fallback_requeues_only_unsaved_events(self):
+        self.buffer._requeue([
+            UserAction(user_id=self.user.pk, action_type=f'event {number}', additional_data={})
+            for number in range(3)
+        ])
+        save = UserAction.save
+
+        def save_then_fail(event, *args, **kwargs):
+            if event.action_type == 'event 1':
+                raise OperationalError('connection lost')
+            return save(event, *args, **kwargs)
+
+        with mock.patch.object(
+            UserAction.objects, 'bulk_create', side_effect=IntegrityError
+        ), mock.patch.object(UserAction, 'save', save_then_fail):
+            saved = self.buffer.flush()
+
+        self.assertEqual(saved, 1)
+        self.assertEqual(
+            list(UserAction.objects.values_list('action_type', flat=True)),
+            ['event 0'],
+        )
+        metrics = self.buffer.metrics()
+        self.assertEqual(metrics['buffered'], 2)
+        self.assertEqual(metrics['failed_flushes'], 1)
+
+        self.buffer.flush()
+
+        self.assertEqual(
+            sorted(UserAction.objects.values_list('action_type', flat=True)),
+            ['event 0', 'event 1', 'event 2'],
+        )
@@ -0,0 +1,131 @@
+"""
+Test the manage_useraction_partitions command.
+"""
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from action.rollup import ROLLUP_WATERMARK
+from core import partitions
+from core.models import JobWatermark, User, UserAction
+
+TABLE = UserAction._meta.db_table
+
+
+class PartitionCommandTests(TestCase):
+    """Test manage_useraction_partitions"""
+
+    @unittest.skipIf(connection.vendor == 'postgresql', 'Covers other databases.')
+    def test_requires_postgresql(self):
+        with self.assertRaises(CommandError):
+            call_command('manage_useraction_partitions', stdout=StringIO())
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'Needs PostgreSQL partitions.')
+class PostgresPartitionCommandTests(TestCase):
+    """Test creating and retiring UserAction partitions"""
+
+    def setUp(self):
+        self.this_month = partitions.month_start(timezone.now())
+        self.old_month = partitions.add_months(self.this_month, -14)
+        self.user = User.objects.create_user(
+            email='player@example.com',
+            password='testpass123',
+            first_name='Test',
+            last_name='Player',
+        )
+        with connection.cursor() as cursor:
+            partitions.create_month_partition(
+                cursor, connection.ops.quote_name, TABLE, self.old_month
+            )
+        start, _ = partitions.month_bounds(self.old_month)
+        UserAction.objects.create(
+            user=self.user, action_type='new review', timestamp=start
+        )
+
+    def existing(self):
+        with connection.cursor() as cursor:
+            return partitions.list_partitions(cursor, TABLE)
+
+    def roll_up_to(self, timestamp):
+        JobWatermark.objects.update_or_create(
+            name=ROLLUP_WATERMARK, defaults={'timestamp': timestamp}
+        )
+
+    def run_command(self, *args):
+        out = StringIO()
+        call_command(
+            'manage_useraction_partitions', '--retain-months', '12', *args,
+            stdout=out,
+        )
+        return out.getvalue()
+
+    def test_creates_partitions_ahead(self):
+        self.run_command('--ahead', '6')
+
+        existing = self.existing()
+        for offset in range(7):
+            self.assertIn(partitions.add_months(self.this_month, offset), existing)
+
+    def test_new_partition_takes_rows_from_default(self):
+        future = partitions.add_months(self.this_month, 8)
+        start, _ = partitions.month_bounds(future)
+        action = UserAction.objects.create(
+            user=self.user, action_type='new price', timestamp=start
+        )
+
+        output = self.run_command('--ahead', '8')
+
+        self.assertIn(future, self.existing())
+        self.assertIn('moved 1 rows out of the default partition', output)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT "id" FROM {partitions.partition_name(TABLE, future)}'
+            )
+            self.assertEqual(cursor.fetchall(), [(action.id,)])
+
+    def test_keeps_partition_until_rolled_up(self):
+        output = self.run_command()
+
+        self.assertIn(self.old_month, self.existing())
+        self.assertIn('not rolled up yet', output)
+
+    def test_detaches_and_drops_expired_partition(self):
+        self.roll_up_to(timezone.now())
+
+        output = self.run_command()
+
+        self.assertNotIn(self.old_month, self.existing())
+        self.assertIn(f'Dropping {partitions.partition_name(TABLE, self.old_month)}', output)
+        self.assertEqual(UserAction.objects.count(), 0)
+
+    def test_archives_before_dropping(self):
+        self.roll_up_to(timezone.now())
+        archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, archive_dir)
+
+        self.run_command('--archive-dir', archive_dir)
+
+        name = partitions.partition_name(TABLE, self.old_month)
+        with gzip.open(os.path.join(archive_dir, f'{name}.csv.gz'), 'rt') as archive:
+            lines = archive.read().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertIn('new review', lines[1])
+        self.assertNotIn(self.old_month, self.existing())
+
+    def test_dry_run_changes_nothing(self):
+        self.roll_up_to(timezone.now())
+        before = self.existing()
+
+        self.run_command('--ahead', '6', '--dry-run')
+
+        self.assertEqual(self.existing(), before)
@@ -0,0 +1,80 @@
+"""
+Test the daily UserAction rollup.
+"""
+from datetime import date, datetime
+
+from django.test import TestCase
+from django.utils import timezone
+
+from action.rollup import ROLLUP_WATERMARK, rolled_up_until, rollup_user_actions
+from core.models import JobWatermark, User, UserAction, UserActionDailyCount
+
+
+def local(day, hour, minute=0):
+    return timezone.make_aware(datetime(2026, 3, day, hour, minute))
+
+
+class RollupUserActionsTests(TestCase):
+    """Test rollup_user_actions"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='player@example.com',
+            password='testpass123',
+            first_name='Test',
+            last_name='Player',
+        )
+
+    def act(self, action_type, timestamp):
+        UserAction.objects.create(
+            user=self.user, action_type=action_type, timestamp=timestamp
+        )
+
+    def counts(self):
+        return {
+            (row.date, row.action_type): row.count
+            for row in UserActionDailyCount.objects.all()
+        }
+
+    def test_counts_by_local_day_and_type(self):
+        self.act('new review', local(1, 10))
+        # Late evening locally is already the next day in UTC
+        self.act('new review', local(1, 23, 30))
+        self.act('new price', local(1, 12))
+        self.act('new review', local(2, 1))
+        # Not yet part of the rollup
+        self.act('new review', local(3, 13))
+
+        rollup_user_actions(now=local(3, 12))
+
+        self.assertEqual(self.counts(), {
+            (date(2026, 3, 1), 'new review'): 2,
+            (date(2026, 3, 1), 'new price'): 1,
+            (date(2026, 3, 2), 'new review'): 1,
+        })
+        self.assertEqual(
+            JobWatermark.objects.get(name=ROLLUP_WATERMARK).timestamp,
+            local(3, 12),
+        )
+        self.assertEqual(rolled_up_until(), local(3, 0))
+
+    def test_rerun_recounts_from_the_watermark_day(self):
+        self.act('new review', local(1, 10))
+        self.act('new review', local(3, 9))
+        rollup_user_actions(now=local(3, 12))
+
+        self.act('new review', local(3, 13))
+        self.act('new review', local(4, 8))
+        rollup_user_actions(now=local(4, 12))
+        # Re-running over the same window changes nothing
+        rollup_user_actions(now=local(4, 12))
+
+        self.assertEqual(self.counts(), {
+            (date(2026, 3, 1), 'new review'): 1,
+            (date(2026, 3, 3), 'new review'): 2,
+            (date(2026, 3, 4), 'new review'): 1,
+        })
+        self.assertEqual(rolled_up_until(), local(4, 0))
+
+    def test_not_rolled_up(self):
+        self.assertIsNone(rolled_up_until())
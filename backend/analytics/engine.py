@@ -0,0 +1,294 @@
+"""
+Report engine for AnalyticsReport.
+
+A report spec is a report_type plus JSON parameters and filters. Rows are
+read from PriceListing CHUNK_SIZE at a time with values_list, into pandas
+frames, by keyset pagination (primary-key order, or series order for
+reports comparing consecutive listings), and each chunk is reduced to
+partial aggregates before the next is read, so memory stays bounded and no
+single query has to aggregate the whole table.
+
+Report types:
+    average_price: average/min/max price grouped by any of region,
+        category, store, product, week and month.
+    price_change_frequency: per store, how often consecutive listings of
+        the same product changed price.
+"""
+import json
+from datetime import datetime, time
+
+import pandas as pd
+from django.conf import settings
+from django.db.models import F, Field, Func, Q, Value
+from django.db.models.lookups import GreaterThan
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils import timezone
+
+from core.models import PriceListing, Store
+
+CHUNK_SIZE = 50000
+
+# Keyset order walking each (product, store) price series by time; the
+# leading columns match PriceListing's (product, store, date_added) index
+SERIES_ORDER = ['product_id', 'store_id', 'date_added', 'pk']
+
+# Filter name -> PriceListing lookup
+FILTERS = {
+    'region': 'store__region__region__iexact',
+    'category': 'product__category__iexact',
+    'store': 'store_id',
+    'product': 'product_id',
+    'date_from': 'date_added__gte',
+    'date_to': 'date_added__lt',
+    'verified_only': 'price_is_verified',
+}
+
+# Grouping name -> PriceListing column read for it
+GROUPINGS = {
+    'region': 'store__region__region',
+    'category': 'product__category',
+    'store': 'store__name',
+    'product': 'product__name',
+    'week': 'date_added',
+    'month': 'date_added',
+}
+
+
+class ReportError(ValueError):
+    """The report spec is invalid."""
+
+
+def parse_moment(value, name):
+    moment = parse_datetime(value) or parse_date(value)
+    if moment is None:
+        raise ReportError(f"{name} must be an ISO date or datetime.")
+    if not hasattr(moment, 'hour'):
+        moment = datetime.combine(moment, time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def parse_group_by(parameters):
+    group_by = parameters.get('group_by') or ['region']
+    if not isinstance(group_by, list) or not all(
+        isinstance(name, str) and name in GROUPINGS for name in group_by
+    ):
+        raise ReportError(f"group_by must be a list drawn from {', '.join(GROUPINGS)}.")
+    return list(dict.fromkeys(group_by))
+
+
+def filtered_listings(filters):
+    """PriceListing queryset restricted by the report filters."""
+    unknown = set(filters) - set(FILTERS)
+    if unknown:
+        raise ReportError(f"Unknown filters: {', '.join(sorted(unknown))}.")
+
+    lookups = {}
+    for name, value in filters.items():
+        if value in (None, ''):
+            continue
+        if name in ('date_from', 'date_to'):
+            value = parse_moment(str(value), name)
+        elif name in ('store', 'product'):
+            try:
+                value = int(value)
+            except (TypeError, ValueError):
+                raise ReportError(f"{name} must be an id.")
+        elif name == 'verified_only':
+            if not value:
+                continue
+            value = 'verified'
+        lookups[FILTERS[name]] = value
+    return PriceListing.objects.filter(**lookups)
+
+
+def iter_chunks(queryset, columns, chunk_size=CHUNK_SIZE):
+    """Yield DataFrames of the given {name: path} columns in pk order."""
+    names = list(columns)
+    paths = [columns[name] for name in names]
+    last_pk = 0
+    while True:
+        rows = list(
+            queryset
+            .filter(pk__gt=last_pk)
+            .order_by('pk')
+            .values_list('pk', *paths)[:chunk_size]
+        )
+        if not rows:
+            return
+        last_pk = rows[-1][0]
+        yield pd.DataFrame.from_records(rows, columns=['pk', *names])
+
+
+class RowValue(Func):
+    """A row constructor, (a, b, ...), compared column by column."""
+    template = '(%(expressions)s)'
+    output_field = Field()
+
+
+def keyset_after(paths, values):
+    """
+    Condition matching rows that sort after values when ordered by paths
+    ascending, as one row comparison the database can run as an index
+    range scan rather than an OR of prefixes.
+    """
+    return GreaterThan(
+        RowValue(*[F(path) for path in paths]),
+        RowValue(*[Value(value) for value in values]),
+    )
+
+
+def iter_ordered_chunks(queryset, columns, order, chunk_size=CHUNK_SIZE):
+    """
+    Yield DataFrames of the given {name: path} columns sorted by order, a
+    list of column names ending in 'pk' so every row has a unique position.
+    """
+    names = ['pk', *columns]
+    paths = [columns.get(name, name) for name in order]
+    positions = [names.index(name) for name in order]
+    after = Q()
+    while True:
+        rows = list(
+            queryset
+            .filter(after)
+            .order_by(*paths)
+            .values_list('pk', *columns.values())[:chunk_size]
+        )
+        if not rows:
+            return
+        after = keyset_after(paths, [rows[-1][position] for position in positions])
+        yield pd.DataFrame.from_records(rows, columns=names)
+
+
+def local_times(values):
+    return pd.to_datetime(values, utc=True).dt.tz_convert(settings.TIME_ZONE)
+
+
+def frame_records(frame):
+    """JSON-safe list of row dicts (NaN becomes null)."""
+    return json.loads(frame.to_json(orient='records', date_format='iso'))
+
+
+########################
+# Reports
+########################
+
+def average_price(parameters, filters, chunk_size=CHUNK_SIZE):
+    group_by = parse_group_by(parameters)
+
+    columns = {'price': 'price'}
+    columns.update(
+        (name, GROUPINGS[name]) for name in group_by if name not in ('week', 'month')
+    )
+    if 'week' in group_by or 'month' in group_by:
+        columns['date_added'] = 'date_added'
+
+    partials, source_rows = [], 0
+    for chunk in iter_chunks(filtered_listings(filters), columns, chunk_size):
+        source_rows += len(chunk)
+        chunk['price'] = chunk['price'].astype(float)
+        if 'date_added' in chunk:
+            added = local_times(chunk['date_added'])
+            if 'week' in group_by:
+                chunk['week'] = added.dt.tz_localize(None).dt.to_period('W-SUN').dt.start_time.dt.strftime('%Y-%m-%d')
+            if 'month' in group_by:
+                chunk['month'] = added.dt.strftime('%Y-%m')
+        partials.append(
+            chunk.groupby(group_by, dropna=False)['price']
+            .agg(['sum', 'count', 'min', 'max'])
+        )
+
+    result_columns = [*group_by, 'average_price', 'min_price', 'max_price', 'listings']
+    if not partials:
+        return {'columns': result_columns, 'rows': [], 'source_rows': 0}
+
+    totals = (
+        pd.concat(partials)
+        .groupby(level=list(range(len(group_by))), dropna=False)
+        .agg({'sum': 'sum', 'count': 'sum', 'min': 'min', 'max': 'max'})
+    )
+    totals['average_price'] = (totals['sum'] / totals['count']).round(2)
+    totals = totals.rename(columns={'min': 'min_price', 'max': 'max_price', 'count': 'listings'})
+    frame = totals.reset_index()[result_columns].sort_values(group_by, na_position='last')
+    return {'columns': result_columns, 'rows': frame_records(frame), 'source_rows': source_rows}
+
+
+def price_change_frequency(parameters, filters, chunk_size=CHUNK_SIZE):
+    columns = {
+        'store_id': 'store_id',
+        'product_id': 'product_id',
+        'date_added': 'date_added',
+        'price': 'price',
+    }
+    series_columns = ['store_id', 'product_id', 'price']
+    partials, source_rows, carry = [], 0, None
+    chunks = iter_ordered_chunks(
+        filtered_listings(filters), columns, SERIES_ORDER, chunk_size
+    )
+    for chunk in chunks:
+        source_rows += len(chunk)
+        chunk = chunk[series_columns].astype({'price': float})
+        previous = chunk.shift()
+        if carry is not None:
+            # A series can continue from the previous chunk's last row
+            previous.iloc[0] = carry
+        carry = chunk.iloc[-1]
+        same_series = (
+            (chunk['store_id'] == previous['store_id'])
+            & (chunk['product_id'] == previous['product_id'])
+        )
+        chunk['new_series'] = ~same_series
+        chunk['comparison'] = same_series
+        chunk['change'] = same_series & (chunk['price'] != previous['price'])
+        # Series are contiguous, so counting their starts counts products
+        partials.append(chunk.groupby('store_id').agg(
+            listings=('price', 'size'),
+            products=('new_series', 'sum'),
+            comparisons=('comparison', 'sum'),
+            changes=('change', 'sum'),
+        ))
+
+    result_columns = [
+        'store_id', 'store', 'listings', 'products', 'comparisons',
+        'changes', 'change_rate',
+    ]
+    if not partials:
+        return {'columns': result_columns, 'rows': [], 'source_rows': 0}
+
+    stores = pd.concat(partials).groupby(level=0).sum().reset_index()
+    stores['change_rate'] = (
+        stores['changes'] / stores['comparisons'].where(stores['comparisons'] > 0)
+    ).round(4)
+    names = Store.objects.in_bulk(stores['store_id'].tolist())
+    stores['store'] = stores['store_id'].map(
+        lambda store_id: names[store_id].name if store_id in names else None
+    )
+    stores = stores.sort_values(['changes', 'store_id'], ascending=[False, True])
+    return {
+        'columns': result_columns,
+        'rows': frame_records(stores[result_columns]),
+        'source_rows': source_rows,
+    }
+
+
+REPORTS = {
+    'average_price': average_price,
+    'price_change_frequency': price_change_frequency,
+}
+
+
+def validate_spec(report_type, parameters, filters):
+    """Raise ReportError if the spec can't be run."""
+    if report_type not in REPORTS:
+        raise ReportError(f"report_type must be one of {', '.join(REPORTS)}.")
+    if not isinstance(parameters, dict) or not isinstance(filters, dict):
+        raise ReportError("parameters and filters must be objects.")
+    filtered_listings(filters)
+    if report_type == 'average_price':
+        parse_group_by(parameters)
+
+
+def run_report(report_type, parameters, filters, chunk_size=CHUNK_SIZE):
+    validate_spec(report_type, parameters, filters)
+    return REPORTS[report_type](parameters, filters, chunk_size)
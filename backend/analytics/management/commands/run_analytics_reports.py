@@ -0,0 +1,42 @@
+"""
+Django command to compute queued analytics reports
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from analytics.worker import process_next_report
+
+
+class Command(BaseCommand):
+    """Django command to run pending AnalyticsReport rows."""
+
+    help = 'Compute pending analytics reports one at a time.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--watch',
+            action='store_true',
+            help='Keep polling for new reports instead of exiting when idle.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5.0,
+            help='Seconds to wait between polls in --watch mode.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        processed = 0
+        while True:
+            report = process_next_report()
+            if report is not None:
+                processed += 1
+                self.stdout.write(f"Report {report.pk}: {report.status}")
+                continue
+            if not options['watch']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} reports."))
@@ -0,0 +1,52 @@
+from rest_framework import serializers
+
+from core.models import AnalyticsReport
+from analytics.engine import ReportError, REPORTS, validate_spec
+
+
+class AnalyticsReportSerializer(serializers.ModelSerializer):
+    report_type = serializers.ChoiceField(choices=list(REPORTS))
+
+    class Meta:
+        model = AnalyticsReport
+        fields = [
+            'id',
+            'report_type',
+            'parameters',
+            'filters',
+            'status',
+            'error',
+            'created_at',
+            'started_at',
+            'finished_at',
+            'report_data',
+        ]
+        read_only_fields = [
+            'status',
+            'error',
+            'created_at',
+            'started_at',
+            'finished_at',
+            'report_data',
+        ]
+
+    def validate(self, attrs):
+        try:
+            validate_spec(
+                attrs['report_type'],
+                attrs.get('parameters', {}),
+                attrs.get('filters', {}),
+            )
+        except ReportError as error:
+            raise serializers.ValidationError(str(error))
+        return attrs
+
+
+class AnalyticsReportListSerializer(AnalyticsReportSerializer):
+    """Report status without the (possibly large) result payload."""
+
+    class Meta(AnalyticsReportSerializer.Meta):
+        fields = [
+            field for field in AnalyticsReportSerializer.Meta.fields
+            if field != 'report_data'
+        ]
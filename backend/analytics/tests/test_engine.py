@@ -0,0 +1,129 @@
+"""
+Test the analytics report engine.
+"""
+from datetime import datetime
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from analytics.engine import ReportError, run_report
+from core.models import PriceListing, Product, Region, Store
+
+
+class ReportEngineTests(TestCase):
+    """Test report computation across chunks"""
+
+    def setUp(self):
+        north = Region.objects.create(region='North')
+        south = Region.objects.create(region='South')
+        self.north_store = Store.objects.create(
+            name='North Mart', lat=0, lon=0, region=north
+        )
+        self.south_store = Store.objects.create(
+            name='South Mart', lat=0, lon=0, region=south
+        )
+        milk = Product.objects.create(name='Milk', category='Dairy')
+        bread = Product.objects.create(name='Bread', category='Bakery')
+        self.milk, self.bread = milk, bread
+
+        listings = [
+            (self.north_store, milk, '10.00', 1),
+            (self.north_store, milk, '12.00', 2),
+            (self.north_store, milk, '12.00', 3),
+            (self.north_store, bread, '5.00', 1),
+            (self.south_store, milk, '11.00', 1),
+        ]
+        for store, product, price, day in listings:
+            PriceListing.objects.create(
+                store=store,
+                product=product,
+                price=Decimal(price),
+                date_added=timezone.make_aware(datetime(2026, 3, day, 12)),
+            )
+
+    def test_average_price_by_region_and_category(self):
+        result = run_report(
+            'average_price',
+            {'group_by': ['region', 'category']},
+            {},
+            chunk_size=2,
+        )
+
+        self.assertEqual(result['source_rows'], 5)
+        self.assertEqual(
+            [
+                (row['region'], row['category'], row['average_price'], row['listings'])
+                for row in result['rows']
+            ],
+            [
+                ('North', 'Bakery', 5.0, 1),
+                ('North', 'Dairy', 11.33, 3),
+                ('South', 'Dairy', 11.0, 1),
+            ],
+        )
+
+    def test_price_change_frequency_per_store(self):
+        result = run_report('price_change_frequency', {}, {}, chunk_size=2)
+
+        north = result['rows'][0]
+        self.assertEqual(north['store'], 'North Mart')
+        self.assertEqual(
+            (north['listings'], north['products'], north['comparisons'], north['changes']),
+            (4, 2, 2, 1),
+        )
+        self.assertEqual(north['change_rate'], 0.5)
+
+    def test_price_change_frequency_same_for_any_chunk_size(self):
+        # Inserted out of series order, with a timestamp tie
+        for price, day in [('9.00', 2), ('9.00', 1), ('12.00', 4), ('11.00', 2)]:
+            PriceListing.objects.create(
+                store=self.south_store,
+                product=self.milk,
+                price=Decimal(price),
+                date_added=timezone.make_aware(datetime(2026, 3, day, 12)),
+            )
+        PriceListing.objects.create(
+            store=self.north_store,
+            product=self.bread,
+            price=Decimal('6.00'),
+            date_added=timezone.make_aware(datetime(2026, 3, 2, 12)),
+        )
+
+        results = [
+            run_report('price_change_frequency', {}, {}, chunk_size=chunk_size)
+            for chunk_size in (1, 2, 3, 1000)
+        ]
+
+        for result in results:
+            self.assertEqual(result, results[-1])
+        self.assertEqual(results[-1]['source_rows'], 10)
+        self.assertEqual(
+            [
+                (row['store'], row['listings'], row['products'], row['comparisons'], row['changes'])
+                for row in results[-1]['rows']
+            ],
+            [('South Mart', 5, 1, 4, 3), ('North Mart', 5, 2, 3, 2)],
+        )
+
+    def test_invalid_spec_is_rejected(self):
+        with self.assertRaises(ReportError):
+            run_report('average_price', {'group_by': ['colour']}, {})
+        with self.assertRaises(ReportError):
+            run_report('average_price', {}, {'date_from': 'soon'})
+
+    def test_series_pages_use_one_row_comparison(self):
+        with CaptureQueriesContext(connection) as queries:
+            run_report('price_change_frequency', {}, {}, chunk_size=2)
+
+        table = connection.ops.quote_name(PriceListing._meta.db_table)
+        pages = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('SELECT') and ') > (' in query['sql']
+        ]
+        self.assertTrue(pages)
+        for sql in pages:
+            self.assertIn(f'({table}."product_id", {table}."store_id"', sql)
+            self.assertNotIn(' OR ', sql)
@@ -0,0 +1,12 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from analytics import views
+
+router = DefaultRouter()
+router.register('reports', views.AnalyticsReportViewSet, basename='analytics-report')
+
+app_name = 'analytics'
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
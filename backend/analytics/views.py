@@ -0,0 +1,49 @@
+from rest_framework import mixins, status, viewsets
+from rest_framework.exceptions import Throttled
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from core.authentication import CustomJWTAuthentication
+from core.models import AnalyticsReport
+from .serializers import AnalyticsReportSerializer, AnalyticsReportListSerializer
+
+MAX_QUEUED_REPORTS = 5
+
+
+class AnalyticsReportViewSet(
+    mixins.CreateModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.ListModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    Queue analytics reports and poll for their results. Creating a report
+    returns 202 straight away; run_analytics_reports computes it and the
+    client polls the detail endpoint until status is done or failed.
+    """
+    serializer_class = AnalyticsReportSerializer
+    authentication_classes = [CustomJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return AnalyticsReportListSerializer
+        return self.serializer_class
+
+    def get_queryset(self):
+        queryset = AnalyticsReport.objects.filter(user=self.request.user)
+        if self.action == 'list':
+            queryset = queryset.defer('report_data')
+        return queryset.order_by('-created_at', '-id')
+
+    def create(self, request, *args, **kwargs):
+        queued = AnalyticsReport.objects.filter(
+            user=request.user,
+            status__in=['pending', 'running']
+        ).count()
+        if queued >= MAX_QUEUED_REPORTS:
+            raise Throttled(detail=f"At most {MAX_QUEUED_REPORTS} reports can be queued at once.")
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save(user=request.user)
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
@@ -0,0 +1,66 @@
+"""
+Background execution of AnalyticsReport rows.
+
+Workers claim the oldest pending report with SKIP LOCKED, mark it running
+and commit before computing, so several workers can run side by side and
+requests only ever create rows and poll them. Reports left running longer
+than STALE_AFTER (a worker that died) are claimed again.
+"""
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from analytics.engine import run_report
+from core.models import AnalyticsReport
+
+logger = logging.getLogger(__name__)
+
+STALE_AFTER = timedelta(hours=1)
+
+
+def claim_next_report():
+    """Mark the oldest runnable report as running and return it."""
+    stale = timezone.now() - STALE_AFTER
+    with transaction.atomic():
+        report = (
+            AnalyticsReport.objects
+            .select_for_update(skip_locked=True)
+            .filter(Q(status='pending') | Q(status='running', started_at__lt=stale))
+            .order_by('created_at', 'id')
+            .first()
+        )
+        if report is None:
+            return None
+        report.status = 'running'
+        report.started_at = timezone.now()
+        report.error = None
+        report.save(update_fields=['status', 'started_at', 'error'])
+    return report
+
+
+def process_report(report):
+    """Compute a claimed report and store the result or the error."""
+    try:
+        report.report_data = run_report(
+            report.report_type,
+            report.parameters,
+            report.filters,
+        )
+        report.status = 'done'
+    except Exception as error:
+        logger.exception("Analytics report %s failed", report.pk)
+        report.status = 'failed'
+        report.error = str(error)
+    report.finished_at = timezone.now()
+    report.save(update_fields=['report_data', 'status', 'error', 'finished_at'])
+    return report
+
+
+def process_next_report():
+    report = claim_next_report()
+    if report is None:
+        return None
+    return process_report(report)
@@ -35,6 +35,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework.authtoken',
     'drf_spectacular',
@@ -53,6 +54,7 @@ INSTALLED_APPS = [
     'review',
     'webmin',
     'search_suggest',
+    'analytics',
 ]
 
 MIDDLEWARE = [
@@ -104,6 +106,46 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+CACHES = {
+    # Point at a shared backend (Redis, Memcached) when running several
+    # processes: cache invalidations for users and point actions go
+    # through it and are otherwise only seen by the process that made them
+    'default': {
+        'BACKEND': os.environ.get(
+            'DJANGO_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.environ.get('DJANGO_CACHE_LOCATION', ''),
+    },
+    # Per-process cache of users resolved from JWTs (see core.auth_cache).
+    # Invalidations travel through the default cache, so unless that is
+    # shared across processes a changed or deactivated user stays cached
+    # in other processes for up to this TIMEOUT.
+    'auth': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'auth-users',
+        'TIMEOUT': int(os.environ.get('AUTH_USER_CACHE_TIMEOUT', 60)),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('AUTH_USER_CACHE_MAX_ENTRIES', 5000)),
+        },
+    },
+    # Request budgets for core.throttling (per process unless overridden)
+    'throttle': {
+        'BACKEND': os.environ.get(
+            'THROTTLE_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.environ.get('THROTTLE_CACHE_LOCATION', 'throttle'),
+        'OPTIONS': {
+            'MAX_ENTRIES': 20000,
+        },
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
 
@@ -149,6 +191,16 @@ MEDIA_ROOT = '/vol/web/media'
 
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 
+# Uploads are named by content hash and reference counted (core.storage)
+STORAGES = {
+    'default': {
+        'BACKEND': 'core.storage.ContentAddressedStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.0/ref/settings/#default-auto-field
 
@@ -174,6 +226,17 @@ REST_FRAMEWORK = {
         # Allow any user by default
         'rest_framework.permissions.AllowAny',
     ],
+    # Token budgets for core.throttling.TokenBucketThrottle scopes; views
+    # charge more than one token for expensive calls
+    'DEFAULT_THROTTLE_RATES': {
+        'search': os.environ.get('THROTTLE_RATE_SEARCH', '300/min'),
+        'suggest': os.environ.get('THROTTLE_RATE_SUGGEST', '300/min'),
+        'public_token': os.environ.get('THROTTLE_RATE_PUBLIC_TOKEN', '20/hour'),
+    },
+    # Reverse proxies in front of the app whose X-Forwarded-For entries are
+    # trusted when keying anonymous callers by IP; with 0 the header is
+    # ignored and REMOTE_ADDR is used, so clients can't spoof it
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', 0)),
 }
 
 # JWT Settings
@@ -242,6 +305,23 @@ else:
 
 DJANGO_REST_PASSWORDRESET_TOKEN_VALIDITY = 3600  # 1 hour
 
+# Most recent searches kept per user by prune_search_history
+SEARCH_HISTORY_MAX_PER_USER = int(
+    os.environ.get('SEARCH_HISTORY_MAX_PER_USER', 100)
+)
+
+# UserAction audit buffer (per process): flush at this many events, when
+# the oldest is this many seconds old, and drop the oldest beyond the max.
+# The age check runs on a thread: under uWSGI pass --enable-threads.
+AUDIT_BUFFER_SIZE = int(os.environ.get('AUDIT_BUFFER_SIZE', 100))
+AUDIT_FLUSH_INTERVAL = float(os.environ.get('AUDIT_FLUSH_INTERVAL', 5))
+AUDIT_BUFFER_MAX = int(os.environ.get('AUDIT_BUFFER_MAX', 10000))
+
+# Months of UserAction partitions kept by manage_useraction_partitions
+USER_ACTION_RETENTION_MONTHS = int(
+    os.environ.get('USER_ACTION_RETENTION_MONTHS', 12)
+)
+
 CORS_ALLOW_CREDENTIALS = True
 
 DOMAIN = os.environ.get('DOMAIN')
@@ -34,6 +34,8 @@ urlpatterns = [
     path('api/review/', include('review.urls')),
     path('api/webmin/', include('webmin.urls')),
     path('api/search-suggest/', include('search_suggest.urls')),
+    path('api/game/', include('game.urls')),
+    path('api/analytics/', include('analytics.urls')),
 
     # drf-spectacular schema and documentation URLs
     path('api/schema/', SpectacularAPIView.as_view(), name='api-schema'),
@@ -83,13 +83,27 @@ admin.site.register(models.ShoppingList)
 admin.site.register(models.ShoppingListItem)
 admin.site.register(models.AnalyticsReport)
 admin.site.register(models.UserAction)
+admin.site.register(models.UserActionDailyCount)
 admin.site.register(models.Notification)
 admin.site.register(models.Submission)
 admin.site.register(models.Badge)
 admin.site.register(models.UserBadge)
 admin.site.register(models.PointsAction)
+admin.site.register(models.MilestoneRule)
 admin.site.register(models.UserPoint)
+admin.site.register(models.UserActivityCounter)
+admin.site.register(models.Leaderboard)
+admin.site.register(models.LeaderboardEntry)
+admin.site.register(models.GameEvent)
+admin.site.register(models.GameNotification)
 admin.site.register(models.UnresolvedBarcode)
 admin.site.register(models.PriceListImportHistory)
 admin.site.register(models.DataSources)
 admin.site.register(models.UserSearchHistory)
+admin.site.register(models.JobWatermark)
+admin.site.register(models.SearchQueryTrend)
+admin.site.register(models.PriceBasket)
+admin.site.register(models.PriceBasketItem)
+admin.site.register(models.RegionPriceIndex)
+admin.site.register(models.ImageDerivativeTask)
+admin.site.register(models.MediaBlob)
@@ -0,0 +1,86 @@
+"""
+Cache of authenticated users for CustomJWTAuthentication.
+
+Resolved users are kept in the process-local 'auth' cache (bounded size
+with LRU culling and a short TTL) under a per-user stamp held in the
+default cache. The stamp carries the user's auth_version and changes after
+every committed save of the user.
+
+Counters that are written with UPDATE statements bypassing User.save
+(points, login counts and streaks) are left out of the cached copy, so
+they are read fresh from the database whenever a request uses them.
+
+Invalidation only reaches every process when the default cache is shared
+between them (DJANGO_CACHE_BACKEND set to Redis or Memcached); then a
+password change, deactivation or role change is seen on the next request
+everywhere. With the default per-process LocMemCache only the process that
+made the change drops its copy, and other processes can keep authenticating
+the stale user for up to AUTH_USER_CACHE_TIMEOUT seconds.
+"""
+import uuid
+
+from django.core.cache import cache, caches
+from django.db import transaction
+from django.db.models import F
+
+from core.models import User
+
+AUTH_CACHE = 'auth'
+
+
+def stamp_key(user_id):
+    return f'auth-user-stamp:{user_id}'
+
+
+def user_key(user_id, stamp):
+    return f'auth-user:{user_id}:{stamp}'
+
+
+def new_stamp(user):
+    return f'{user.auth_version}.{uuid.uuid4().hex[:12]}'
+
+
+def without_counters(user):
+    """Defer User.COUNTER_FIELDS, so they load from the database on access."""
+    for field in User.COUNTER_FIELDS:
+        user.__dict__.pop(field, None)
+    return user
+
+
+def get_cached_user(user_id, load_user):
+    """
+    Return the user with user_id from the cache, or from load_user() when
+    it is missing or stale. Exceptions from load_user are not cached.
+    """
+    local = caches[AUTH_CACHE]
+    stamp = cache.get(stamp_key(user_id))
+    if stamp is not None:
+        user = local.get(user_key(user_id, stamp))
+        if user is not None:
+            return user
+
+    user = without_counters(load_user())
+    if stamp is None:
+        stamp = new_stamp(user)
+        if not cache.add(stamp_key(user_id), stamp, None):
+            stamp = cache.get(stamp_key(user_id))
+    if stamp is not None:
+        local.set(user_key(user_id, stamp), user)
+    return user
+
+
+def invalidate_user(user_id):
+    """Drop cached copies of the user once the current transaction commits."""
+    transaction.on_commit(lambda: cache.delete(stamp_key(user_id)))
+
+
+def bump_auth_version(user_ids):
+    """
+    Bump auth_version for changes that bypass User.save, such as role
+    changes or queryset updates, and drop the cached users.
+    """
+    User.objects.filter(pk__in=user_ids).update(
+        auth_version=F('auth_version') + 1
+    )
+    for user_id in user_ids:
+        invalidate_user(user_id)
@@ -1,14 +1,23 @@
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
 from drf_spectacular.extensions import OpenApiAuthenticationExtension
 
+from core.auth_cache import get_cached_user
+
 class CustomJWTAuthentication(JWTAuthentication):
     def get_user(self, validated_token):
         # If the token is public, skip user retrieval
         if validated_token.get("is_public", False):
             return None  # No user associated with public tokens
 
-        # For authenticated tokens, proceed with default behavior
-        return super().get_user(validated_token)
+        # For authenticated tokens, reuse the cached user while its stamp
+        # is current; otherwise load and check it the default way
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+        return get_cached_user(
+            user_id, lambda: super(CustomJWTAuthentication, self).get_user(validated_token)
+        )
 
 
 class CustomJWTAuthenticationExtension(OpenApiAuthenticationExtension):
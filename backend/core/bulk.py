@@ -0,0 +1,248 @@
+"""
+List-payload bulk create and update for the catalog viewsets.
+
+POST <prefix>/bulk/ creates and PATCH <prefix>/bulk/ updates (each item
+carrying its "id") up to MAX_BULK_ITEMS rows per call. Items are
+validated by one BulkItemSerializer instance in a single pass; foreign
+keys arrive as plain ids and are checked with one IN query per related
+model, and unique columns with one IN query each, instead of per-item
+lookups. Valid items are written with bulk_create/bulk_update in one
+transaction and every item gets a result: created, updated or invalid
+with its errors.
+
+bulk_create and bulk_update skip save() and the model signals, so views
+fill in derived columns in prepare_bulk_instance and refresh caches in
+perform_bulk_write.
+"""
+import logging
+
+from django.db import IntegrityError, transaction
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.validators import UniqueValidator
+
+logger = logging.getLogger(__name__)
+
+MAX_BULK_ITEMS = 10000
+BULK_BATCH_SIZE = 1000
+
+
+class BulkReferenceField(serializers.IntegerField):
+    """Primary key of a related row, checked per batch by BulkWriteMixin."""
+
+
+class BulkItemSerializer(serializers.ModelSerializer):
+    """
+    Item serializer for bulk writes. Related fields become plain ids and
+    unique validators are dropped; both are checked for the whole batch
+    by BulkWriteMixin.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        for name, field in fields.items():
+            if isinstance(field, serializers.PrimaryKeyRelatedField) and not field.read_only:
+                fields[name] = BulkReferenceField(
+                    min_value=1,
+                    required=field.required,
+                    allow_null=field.allow_null,
+                )
+            else:
+                field.validators = [
+                    validator for validator in field.validators
+                    if not isinstance(validator, UniqueValidator)
+                ]
+        return fields
+
+    def get_validators(self):
+        return []
+
+
+class BulkWriteMixin:
+    """
+    Add bulk create/update to a ModelViewSet. Views set
+    `bulk_serializer_class` and may list `bulk_unique_fields`.
+    """
+    bulk_serializer_class = None
+    bulk_unique_fields = []
+
+    def get_serializer_class(self):
+        if self.action == 'bulk':
+            return self.bulk_serializer_class
+        return super().get_serializer_class()
+
+    def get_bulk_queryset(self):
+        return self.bulk_serializer_class.Meta.model.objects.all()
+
+    def prepare_bulk_items(self, items, errors):
+        """Hook to resolve extra references of the valid items in place."""
+
+    def prepare_bulk_instance(self, instance, fields):
+        """Hook to fill derived columns; returns the extra fields it set."""
+        return []
+
+    def perform_bulk_write(self, created, updated, previous):
+        """Hook run after commit with the written instances."""
+
+    def validate_bulk_items(self, serializer, data, partial):
+        items, errors, ids = {}, {}, {}
+        for index, item in enumerate(data):
+            if partial:
+                item_id = item.get('id') if isinstance(item, dict) else None
+                if not isinstance(item_id, int) or isinstance(item_id, bool):
+                    errors[index] = {'id': ['A valid integer id is required.']}
+                    continue
+                ids[index] = item_id
+            try:
+                items[index] = serializer.run_validation(item)
+            except ValidationError as error:
+                errors[index] = error.detail
+        return items, errors, ids
+
+    def check_references(self, serializer, items, errors):
+        """Check the related ids of the batch with one query per field."""
+        model = serializer.Meta.model
+        for name, field in serializer.fields.items():
+            if not isinstance(field, BulkReferenceField):
+                continue
+            wanted = {
+                item[name] for item in items.values()
+                if item.get(name) is not None
+            }
+            if not wanted:
+                continue
+            existing = set(
+                model._meta.get_field(name).related_model.objects
+                .filter(pk__in=wanted).values_list('pk', flat=True)
+            )
+            for index, item in list(items.items()):
+                value = item.get(name)
+                if value is not None and value not in existing:
+                    errors[index] = {name: [f'Invalid pk "{value}" - object does not exist.']}
+                    del items[index]
+
+    def check_unique(self, model, items, errors, ids):
+        for name in self.bulk_unique_fields:
+            owners = {}
+            for index, item in list(items.items()):
+                value = item.get(name)
+                if value is None:
+                    continue
+                if value in owners:
+                    errors[index] = {name: [f'Duplicate {name} in this request.']}
+                    del items[index]
+                else:
+                    owners[value] = index
+            taken = model.objects.filter(
+                **{f'{name}__in': list(owners)}
+            ).values_list(name, 'pk')
+            for value, pk in taken:
+                index = owners[value]
+                if ids.get(index) != pk:
+                    errors[index] = {name: [
+                        f'{model._meta.verbose_name} with this {name} already exists.'
+                    ]}
+                    del items[index]
+
+    def create_bulk_items(self, model, items):
+        instances = {}
+        for index, item in items.items():
+            instance = model(**{
+                model._meta.get_field(name).attname: value
+                for name, value in item.items()
+            })
+            self.prepare_bulk_instance(instance, set(item))
+            instances[index] = instance
+        model.objects.bulk_create(instances.values(), batch_size=BULK_BATCH_SIZE)
+        return instances, {}
+
+    def update_bulk_items(self, model, items, errors, ids):
+        loaded = self.get_bulk_queryset().in_bulk([ids[index] for index in items])
+        instances, previous, fields = {}, {}, set()
+        for index, item in items.items():
+            instance = loaded.get(ids[index])
+            if instance is None:
+                errors[index] = {'id': [f'Invalid pk "{ids[index]}" - object does not exist.']}
+                continue
+            attnames = {name: model._meta.get_field(name).attname for name in item}
+            previous[instance.pk] = {
+                name: getattr(instance, attname) for name, attname in attnames.items()
+            }
+            for name, value in item.items():
+                setattr(instance, attnames[name], value)
+            fields.update(item)
+            fields.update(self.prepare_bulk_instance(instance, set(item)))
+            instances[index] = instance
+        if instances and fields:
+            model.objects.bulk_update(
+                instances.values(), sorted(fields), batch_size=BULK_BATCH_SIZE
+            )
+        return instances, previous
+
+    @action(detail=False, methods=['POST', 'PATCH'], url_path='bulk')
+    def bulk(self, request):
+        """Create (POST) or update (PATCH) a list of items in one call."""
+        data = request.data
+        if not isinstance(data, list):
+            return Response(
+                {'detail': 'Expected a list of items.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(data) > MAX_BULK_ITEMS:
+            return Response(
+                {'detail': f'At most {MAX_BULK_ITEMS} items per request.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        partial = request.method == 'PATCH'
+        serializer = self.bulk_serializer_class(
+            partial=partial, context=self.get_serializer_context()
+        )
+        model = serializer.Meta.model
+        items, errors, ids = self.validate_bulk_items(serializer, data, partial)
+        try:
+            with transaction.atomic():
+                self.prepare_bulk_items(items, errors)
+                self.check_references(serializer, items, errors)
+                self.check_unique(model, items, errors, ids)
+                if partial:
+                    instances, previous = self.update_bulk_items(model, items, errors, ids)
+                else:
+                    instances, previous = self.create_bulk_items(model, items)
+                written = list(instances.values())
+                if written:
+                    transaction.on_commit(lambda: self.perform_bulk_write(
+                        [] if partial else written,
+                        written if partial else [],
+                        previous,
+                    ))
+        except IntegrityError:
+            # A row written concurrently; the batch can't say which item hit
+            # it, and the constraint text isn't for clients
+            logger.exception("Bulk %s of %s failed", request.method, model.__name__)
+            return Response(
+                {'detail': 'The items conflict with existing data; nothing was written.'},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        results = []
+        for index in range(len(data)):
+            if index in instances:
+                results.append({
+                    'index': index,
+                    'status': 'updated' if partial else 'created',
+                    'id': instances[index].pk,
+                })
+            else:
+                results.append({
+                    'index': index,
+                    'status': 'invalid',
+                    'errors': errors.get(index, {}),
+                })
+        return Response({
+            'written': len(instances),
+            'invalid': len(data) - len(instances),
+            'results': results,
+        }, status=status.HTTP_200_OK if partial else status.HTTP_201_CREATED)
@@ -0,0 +1,20 @@
+"""
+Serializer fields shared across apps.
+"""
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema_field
+from rest_framework import serializers
+
+from core.images import image_url
+
+
+@extend_schema_field(OpenApiTypes.URI)
+class ImageDerivativeField(serializers.ReadOnlyField):
+    """Absolute URL of an image's derivative in `size` (or the original until rendered)."""
+
+    def __init__(self, size, **kwargs):
+        self.size = size
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return image_url(value, self.size)
@@ -0,0 +1,85 @@
+from django.db.models import Q
+from rest_framework.filters import BaseFilterBackend, SearchFilter
+
+from core.normalize import attribute_key, query_terms
+
+
+class SearchKeyFilter(SearchFilter):
+    """
+    Search filter that matches normalized query terms against the indexed
+    search_key columns listed in the view's `search_key_fields`.
+
+    Every term must match at least one of the fields; a term matches a
+    field when it is one of the field's tokens or token prefixes, which
+    resolves through the GIN index instead of a wildcard scan.
+    """
+
+    def get_search_terms(self, request):
+        search_query = request.query_params.get(self.search_param, '')
+        return query_terms(search_query)
+
+    def get_search_key_fields(self, view, request):
+        return getattr(view, 'search_key_fields', None)
+
+    def get_term_condition(self, term, fields):
+        condition = Q()
+        for field in fields:
+            condition |= Q(**{f'{field}__contains': [term]})
+        return condition
+
+    def filter_queryset(self, request, queryset, view):
+        fields = self.get_search_key_fields(view, request)
+        terms = self.get_search_terms(request)
+
+        if not fields or not terms:
+            return queryset
+
+        for term in terms:
+            queryset = queryset.filter(self.get_term_condition(term, fields))
+        return queryset
+
+
+class AttributeFilter(BaseFilterBackend):
+    """
+    Filter on the JSON attributes column named by the view's
+    `attribute_field` with ?attr.<name>=<value> parameters.
+
+    Names are normalized like stored keys, so ?attr.Size=2L matches
+    {"size": "2L"}. All single-valued parameters form one containment
+    test (attributes @> {...}) answered by the GIN index; a name given
+    several values matches any of them.
+    """
+    attribute_param_prefix = 'attr.'
+
+    def get_attribute_values(self, request):
+        values = {}
+        for param in request.query_params:
+            if not param.startswith(self.attribute_param_prefix):
+                continue
+            key = attribute_key(param[len(self.attribute_param_prefix):])
+            if not key:
+                continue
+            for value in request.query_params.getlist(param):
+                if value.strip():
+                    values.setdefault(key, []).append(value.strip())
+        return values
+
+    def filter_queryset(self, request, queryset, view):
+        field = getattr(view, 'attribute_field', None)
+        values = self.get_attribute_values(request)
+        if not field or not values:
+            return queryset
+
+        required = {
+            key: options[0] for key, options in values.items()
+            if len(options) == 1
+        }
+        if required:
+            queryset = queryset.filter(**{f'{field}__contains': required})
+        for key, options in values.items():
+            if len(options) > 1:
+                condition = Q()
+                for option in options:
+                    condition |= Q(**{f'{field}__contains': {key: option}})
+                queryset = queryset.filter(condition)
+        return queryset
@@ -0,0 +1,163 @@
+"""
+Resized WebP derivatives of uploaded images.
+
+Every stored image gets a WebP rendering per DERIVATIVE_SIZES (longest
+side in pixels, never upscaled) at a path derived from its own name:
+uploads/product/<name>.jpg -> derivatives/uploads/product/<name>/thumb.webp.
+Saves that change an image queue an ImageDerivativeTask, and the
+process_image_tasks worker renders them with Pillow, so uploads never
+wait for resizing. Until a derivative exists, URLs fall back to the
+original.
+"""
+import io
+import logging
+import posixpath
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import F
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVE_ROOT = 'derivatives'
+DERIVATIVE_SIZES = {
+    'thumb': 200,
+    'medium': 800,
+    'large': 1600,
+}
+WEBP_QUALITY = 80
+MAX_ATTEMPTS = 5
+
+# Derivatives known to exist; they only go away with their original
+_existing = OrderedDict()
+_existing_lock = threading.Lock()
+MAX_KNOWN_DERIVATIVES = 10000
+
+
+def derivative_name(name, size):
+    base, _ = posixpath.splitext(name)
+    return posixpath.join(DERIVATIVE_ROOT, base, f'{size}.webp')
+
+
+def derivative_exists(storage, name):
+    with _existing_lock:
+        if name in _existing:
+            _existing.move_to_end(name)
+            return True
+    if not storage.exists(name):
+        return False
+    with _existing_lock:
+        _existing[name] = True
+        if len(_existing) > MAX_KNOWN_DERIVATIVES:
+            _existing.popitem(last=False)
+    return True
+
+
+def image_url(field_file, size=None):
+    """
+    Absolute URL of the image's derivative in size, or of the original
+    while that has not been rendered yet. None without an image.
+    """
+    if not field_file:
+        return None
+    url = field_file.url
+    if size is not None:
+        name = derivative_name(field_file.name, size)
+        if derivative_exists(field_file.storage, name):
+            url = field_file.storage.url(name)
+    return f"{settings.DOMAIN}{url}"
+
+
+def render_derivatives(storage, name, force=False):
+    """Write the missing (or, with force, all) derivatives of name."""
+    targets = {
+        size: derivative_name(name, size)
+        for size in DERIVATIVE_SIZES
+    }
+    if not force:
+        targets = {
+            size: target for size, target in targets.items()
+            if not storage.exists(target)
+        }
+    if not targets:
+        return 0
+
+    with storage.open(name, 'rb') as source:
+        image = ImageOps.exif_transpose(Image.open(source))
+        image.load()
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+
+    for size, target in targets.items():
+        rendered = image.copy()
+        rendered.thumbnail((DERIVATIVE_SIZES[size],) * 2, Image.LANCZOS)
+        buffer = io.BytesIO()
+        rendered.save(buffer, format='WEBP', quality=WEBP_QUALITY, method=4)
+        if storage.exists(target):
+            storage.delete(target)
+        storage.save(target, ContentFile(buffer.getvalue()))
+    return len(targets)
+
+
+def delete_derivatives(storage, name):
+    """Remove every derivative of the image stored as name."""
+    for size in DERIVATIVE_SIZES:
+        target = derivative_name(name, size)
+        with _existing_lock:
+            _existing.pop(target, None)
+        if storage.exists(target):
+            storage.delete(target)
+
+
+def queue_derivatives(names):
+    """Queue images for rendering once the current transaction commits."""
+    from core.models import ImageDerivativeTask
+
+    names = [name for name in names if name]
+    if not names:
+        return
+    transaction.on_commit(lambda: ImageDerivativeTask.objects.bulk_create(
+        [ImageDerivativeTask(name=name) for name in names],
+        ignore_conflicts=True,
+    ))
+
+
+def process_image_tasks(batch_size=50, storage=None):
+    """
+    Render one batch of queued images. Returns (tasks handled, files
+    written). Failing tasks stay queued with their attempt count raised
+    and are skipped after MAX_ATTEMPTS.
+    """
+    from django.core.files.storage import default_storage
+
+    from core.models import ImageDerivativeTask
+
+    storage = storage or default_storage
+    with transaction.atomic():
+        tasks = list(
+            ImageDerivativeTask.objects
+            .select_for_update(skip_locked=True)
+            .filter(attempts__lt=MAX_ATTEMPTS)
+            .order_by('id')[:batch_size]
+        )
+
+        done, written = [], 0
+        for task in tasks:
+            try:
+                if storage.exists(task.name):
+                    written += render_derivatives(storage, task.name)
+            except Exception as error:
+                logger.exception("Image derivatives failed for %s", task.name)
+                ImageDerivativeTask.objects.filter(pk=task.pk).update(
+                    attempts=F('attempts') + 1,
+                    last_error=repr(error),
+                )
+            else:
+                done.append(task.pk)
+
+        ImageDerivativeTask.objects.filter(pk__in=done).delete()
+    return len(tasks), written
@@ -0,0 +1,51 @@
+"""
+Django command to render derivatives for existing media
+"""
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from core.images import render_derivatives
+from core.signals import IMAGE_FIELDS
+
+
+class Command(BaseCommand):
+    """
+    Django command to render thumbnails and WebP variants for every image
+    referenced by the database. Images that already have all derivatives
+    are skipped unless --force is given (e.g. after changing sizes).
+    """
+
+    help = 'Render missing image derivatives for existing uploads.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Re-render derivatives that already exist.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        rendered = failed = 0
+        for model, fields in IMAGE_FIELDS.items():
+            for field in fields:
+                names = (
+                    model.objects.exclude(**{field: ''})
+                    .exclude(**{f'{field}__isnull': True})
+                    .values_list(field, flat=True)
+                    .distinct()
+                )
+                for name in names.iterator(chunk_size=1000):
+                    if not default_storage.exists(name):
+                        continue
+                    try:
+                        rendered += render_derivatives(
+                            default_storage, name, force=options['force']
+                        )
+                    except Exception as error:
+                        failed += 1
+                        self.stderr.write(f"{name}: {error}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{rendered} derivatives written, {failed} images failed."
+        ))
@@ -0,0 +1,88 @@
+"""
+Django command to remove media files no longer referenced
+"""
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from core.media_gc import QUARANTINE_ROOT, find_orphans, remove_orphans
+
+
+class Command(BaseCommand):
+    """
+    Django command to find files under uploads/ that no image column
+    references (left behind by queryset deletes and replaced images before
+    reference counting) and delete them, or move them under quarantine/,
+    in batches. Without --delete or --quarantine it only reports.
+    """
+
+    help = 'Delete or quarantine orphaned media files and report reclaimed bytes.'
+
+    def add_arguments(self, parser):
+        action = parser.add_mutually_exclusive_group()
+        action.add_argument(
+            '--delete',
+            action='store_true',
+            help='Delete orphaned files.',
+        )
+        action.add_argument(
+            '--quarantine',
+            action='store_true',
+            help=f'Move orphaned files under {QUARANTINE_ROOT}/ instead of deleting them.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of orphans removed per batch.',
+        )
+        parser.add_argument(
+            '--min-age',
+            type=float,
+            default=24.0,
+            help='Hours a file must exist before it is considered orphaned.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        remove = options['delete'] or options['quarantine']
+        orphans = find_orphans(
+            default_storage, min_age=timedelta(hours=options['min_age'])
+        )
+
+        found = found_bytes = removed = removed_bytes = 0
+        batch = []
+        for name, size in orphans:
+            found += 1
+            found_bytes += size
+            if options['verbosity'] > 1:
+                self.stdout.write(name)
+            if not remove:
+                continue
+            batch.append((name, size))
+            if len(batch) >= options['batch_size']:
+                files, reclaimed = remove_orphans(
+                    default_storage, batch, quarantine=options['quarantine']
+                )
+                removed += files
+                removed_bytes += reclaimed
+                batch = []
+        if batch:
+            files, reclaimed = remove_orphans(
+                default_storage, batch, quarantine=options['quarantine']
+            )
+            removed += files
+            removed_bytes += reclaimed
+
+        if not remove:
+            self.stdout.write(self.style.SUCCESS(
+                f"Found {found} orphaned files ({found_bytes} bytes); "
+                f"run with --delete or --quarantine to remove them."
+            ))
+            return
+        verb = 'Quarantined' if options['quarantine'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {removed} of {found} orphaned files, "
+            f"reclaiming {removed_bytes} bytes."
+        ))
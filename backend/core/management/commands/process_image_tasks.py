@@ -0,0 +1,50 @@
+"""
+Django command to render queued image derivatives
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.images import process_image_tasks
+
+
+class Command(BaseCommand):
+    """Django command to drain the ImageDerivativeTask queue."""
+
+    help = 'Render thumbnails and WebP variants for newly uploaded images.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50,
+            help='Number of images claimed per batch.',
+        )
+        parser.add_argument(
+            '--watch',
+            action='store_true',
+            help='Keep polling for new images instead of exiting when idle.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=2.0,
+            help='Seconds to wait between polls in --watch mode.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        total_tasks = total_files = 0
+        while True:
+            tasks, files = process_image_tasks(options['batch_size'])
+            total_tasks += tasks
+            total_files += files
+            if tasks:
+                continue
+            if not options['watch']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {total_tasks} images, {total_files} derivatives written."
+        ))
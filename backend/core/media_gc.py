@@ -0,0 +1,136 @@
+"""
+Garbage collection of media files that no row references.
+
+The media tree under uploads/ and the image columns in IMAGE_FIELDS are
+both streamed in code point order (the walk sorts each directory so that
+full paths come out ordered; the columns are ordered under the database's
+binary collation) and merged like a sort-merge join, so memory stays
+bounded by one directory listing and one batch of orphans however large
+the tree is. Files newer than the grace period are left alone, since an
+upload is written before the row that references it commits, and every
+batch is re-checked against the database right before removal.
+"""
+import heapq
+import posixpath
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models.functions import Collate
+from django.utils import timezone
+
+from core.images import delete_derivatives
+from core.storage import CONTENT_ADDRESSED_PREFIX
+
+MEDIA_ROOT_PREFIX = CONTENT_ADDRESSED_PREFIX.rstrip('/')
+QUARANTINE_ROOT = 'quarantine'
+BINARY_COLLATIONS = {
+    'postgresql': 'C',
+    'sqlite': 'BINARY',
+}
+
+
+def walk_files(storage, root=MEDIA_ROOT_PREFIX):
+    """Yield the names of all files under root in code point order."""
+    if not storage.exists(root):
+        return
+    directories, files = storage.listdir(root)
+    # 'a.jpg' sorts before 'a/x.jpg' because '.' < '/'
+    entries = sorted(
+        [(f'{name}/', name, True) for name in directories]
+        + [(name, name, False) for name in files]
+    )
+    for _, name, is_directory in entries:
+        path = posixpath.join(root, name)
+        if is_directory:
+            yield from walk_files(storage, path)
+        else:
+            yield path
+
+
+def referenced_names(chunk_size=2000):
+    """Yield every distinct stored image name in code point order."""
+    from core.signals import IMAGE_FIELDS
+
+    collation = BINARY_COLLATIONS.get(connection.vendor)
+    streams = []
+    for model, fields in IMAGE_FIELDS.items():
+        for field in fields:
+            names = (
+                model.objects
+                .filter(**{f'{field}__startswith': CONTENT_ADDRESSED_PREFIX})
+                .values_list(field, flat=True)
+                .order_by(Collate(field, collation) if collation else field)
+            )
+            streams.append(names.iterator(chunk_size=chunk_size))
+
+    previous = None
+    for name in heapq.merge(*streams):
+        if name != previous:
+            yield name
+            previous = name
+
+
+def find_orphans(storage, min_age=timedelta(days=1)):
+    """Yield (name, size) for files under uploads/ that nothing references."""
+    cutoff = timezone.now() - min_age
+    references = referenced_names()
+    reference = next(references, None)
+    for name in walk_files(storage):
+        while reference is not None and reference < name:
+            reference = next(references, None)
+        if reference == name:
+            continue
+        if storage.get_modified_time(name) > cutoff:
+            continue
+        yield name, storage.size(name)
+
+
+def still_referenced(names):
+    from core.models import MediaBlob
+    from core.signals import IMAGE_FIELDS
+
+    referenced = set(
+        MediaBlob.objects.filter(name__in=names, ref_count__gt=0)
+        .values_list('name', flat=True)
+    )
+    for model, fields in IMAGE_FIELDS.items():
+        for field in fields:
+            referenced.update(
+                model.objects.filter(**{f'{field}__in': names})
+                .values_list(field, flat=True)
+            )
+    return referenced
+
+
+def remove_orphans(storage, orphans, quarantine=False):
+    """
+    Delete (or move under quarantine/) a batch of (name, size) orphans
+    together with their derivatives and MediaBlob rows. Returns the
+    (files, bytes) actually removed.
+    """
+    from core.models import MediaBlob
+
+    names = [name for name, _ in orphans]
+    with transaction.atomic():
+        referenced = still_referenced(names)
+        removed = [
+            (name, size) for name, size in orphans
+            if name not in referenced
+        ]
+        MediaBlob.objects.filter(
+            name__in=[name for name, _ in removed]
+        ).delete()
+
+    files = reclaimed = 0
+    for name, size in removed:
+        # A repeat upload of the same bytes may have claimed it meanwhile
+        if MediaBlob.objects.filter(name=name).exists():
+            continue
+        if quarantine:
+            with storage.open(name, 'rb') as content:
+                storage.save(posixpath.join(QUARANTINE_ROOT, name), content)
+        storage.delete(name)
+        delete_derivatives(storage, name)
+        files += 1
+        reclaimed += size
+    return files, reclaimed
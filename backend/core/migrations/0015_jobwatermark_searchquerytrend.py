@@ -0,0 +1,40 @@
+# Generated by Django 5.1.15 on 2026-10-19 06:39
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_pricelisting_price_is_verified_pricelisting_source'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('timestamp', models.DateTimeField(blank=True, null=True)),
+                ('position', models.BigIntegerField(blank=True, null=True)),
+                ('last_updated', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SearchQueryTrend',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('query', models.CharField(max_length=255)),
+                ('score', models.FloatField(default=0)),
+                ('searches', models.PositiveIntegerField(default=0)),
+                ('last_searched', models.DateTimeField(default=django.utils.timezone.now)),
+                ('region', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='core.region')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['region', '-score'], name='core_search_region__a60cff_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('region__isnull', False)), fields=('query', 'region'), name='unique_trend_per_region'), models.UniqueConstraint(condition=models.Q(('region__isnull', True)), fields=('query',), name='unique_trend_global')],
+            },
+        ),
+    ]
@@ -0,0 +1,91 @@
+# Generated by Django 5.1.15 on 2026-10-19 06:40
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Q
+
+DEDUPE_BATCH_SIZE = 500
+
+
+def dedupe_search_history(apps, schema_editor):
+    """
+    Collapse duplicate (user, query) rows before the unique constraint lands.
+
+    Walks the users in primary key order, DEDUPE_BATCH_SIZE at a time, and
+    groups only their history through the user_id index, so each batch
+    costs the same however large the table is and the whole pass reads it
+    once. The migration is non-atomic, so every batch commits on its own.
+    The newest id of each group survives and takes the latest timestamp of
+    the group.
+    """
+    User = apps.get_model('core', 'User')
+    UserSearchHistory = apps.get_model('core', 'UserSearchHistory')
+
+    last_user_id = 0
+    while True:
+        user_ids = list(
+            User.objects.filter(pk__gt=last_user_id)
+            .order_by('pk')
+            .values_list('pk', flat=True)[:DEDUPE_BATCH_SIZE]
+        )
+        if not user_ids:
+            break
+        last_user_id = user_ids[-1]
+
+        groups = list(
+            UserSearchHistory.objects
+            .filter(user_id__in=user_ids)
+            .values('user_id', 'query')
+            .annotate(
+                rows=Count('id'),
+                keep_id=Max('id'),
+                latest=Max('timestamp'),
+            )
+            .filter(rows__gt=1)
+            .order_by()
+        )
+        if not groups:
+            continue
+
+        duplicates = Q()
+        for group in groups:
+            duplicates |= Q(user_id=group['user_id'], query=group['query'])
+        keep_ids = [group['keep_id'] for group in groups]
+
+        UserSearchHistory.objects.filter(duplicates).exclude(
+            id__in=keep_ids
+        ).delete()
+
+        survivors = UserSearchHistory.objects.in_bulk(keep_ids)
+        for group in groups:
+            survivors[group['keep_id']].timestamp = group['latest']
+        UserSearchHistory.objects.bulk_update(
+            survivors.values(), ['timestamp']
+        )
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('core', '0015_jobwatermark_searchquerytrend'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            dedupe_search_history,
+            migrations.RunPython.noop,
+        ),
+        migrations.AlterModelOptions(
+            name='usersearchhistory',
+            options={},
+        ),
+        migrations.AddIndex(
+            model_name='usersearchhistory',
+            index=models.Index(fields=['user', '-timestamp'], name='core_search_user_recent_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='usersearchhistory',
+            constraint=models.UniqueConstraint(fields=('user', 'query'), name='unique_search_history_query'),
+        ),
+    ]
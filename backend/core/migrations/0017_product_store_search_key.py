@@ -0,0 +1,176 @@
+# Generated by Django 5.1.15 on 2026-10-19 06:41
+
+import re
+import unicodedata
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+BACKFILL_BATCH_SIZE = 1000
+
+# A frozen copy of core.normalize's search key builder, so later changes
+# to the live normalizer can't change what this backfill writes
+STOPWORDS = {
+    "in", "at", "on", "and", "or", "for", "the", "a", "an", "of", "with",
+    "to", "from", "by",
+}
+MIN_PREFIX_LENGTH = 2
+MAX_TOKEN_LENGTH = 64
+
+UNIT_ALIASES = {
+    'l': 'l', 'lt': 'l', 'lts': 'l', 'ltr': 'l', 'ltrs': 'l',
+    'litre': 'l', 'litres': 'l', 'liter': 'l', 'liters': 'l',
+    'ml': 'ml', 'mls': 'ml', 'millilitre': 'ml', 'millilitres': 'ml',
+    'milliliter': 'ml', 'milliliters': 'ml',
+    'cl': 'cl',
+    'kg': 'kg', 'kgs': 'kg', 'kilo': 'kg', 'kilos': 'kg',
+    'kilogram': 'kg', 'kilograms': 'kg',
+    'g': 'g', 'gm': 'g', 'gms': 'g', 'gr': 'g', 'grm': 'g', 'grms': 'g',
+    'gram': 'g', 'grams': 'g', 'gramme': 'g', 'grammes': 'g',
+    'mg': 'mg',
+    'oz': 'oz', 'ozs': 'oz', 'ounce': 'oz', 'ounces': 'oz',
+    'floz': 'floz',
+    'lb': 'lb', 'lbs': 'lb', 'pound': 'lb', 'pounds': 'lb',
+    'pk': 'pk', 'pck': 'pk', 'pack': 'pk', 'packs': 'pk',
+    'ct': 'ct', 'count': 'ct',
+}
+
+TOKEN_SPLIT_RE = re.compile(r"[^a-z0-9.]+")
+FLUID_OUNCE_RE = re.compile(r"\bfl\.?\s*oz\b")
+NUMBER_RE = re.compile(r"^\d+(?:\.\d+)?$")
+QUANTITY_RE = re.compile(r"^(\d+(?:\.\d+)?)([a-z]+)$")
+
+
+def _fold(text):
+    """Lowercase and strip accents."""
+    text = unicodedata.normalize('NFKD', str(text))
+    return "".join(c for c in text if not unicodedata.combining(c)).lower()
+
+
+def _canonical_number(number):
+    """'1.0' -> '1', '0.50' -> '0.5'."""
+    if '.' in number:
+        number = number.rstrip('0').rstrip('.')
+    return number or '0'
+
+
+def _canonical_quantity(token):
+    """'1ltr' -> '1l', '500grams' -> '500g'; other tokens are unchanged."""
+    match = QUANTITY_RE.match(token)
+    if match and match.group(2) in UNIT_ALIASES:
+        return _canonical_number(match.group(1)) + UNIT_ALIASES[match.group(2)]
+    if NUMBER_RE.match(token):
+        return _canonical_number(token)
+    return token
+
+
+def normalize_tokens(text):
+    """
+    Turn free text into lowercased, unit-canonicalized tokens.
+
+    A number followed by a unit word is joined into one token, so
+    "1 Ltr", "1ltr" and "1.0 litre" all become "1l".
+    """
+    if not text:
+        return []
+
+    text = FLUID_OUNCE_RE.sub('floz', _fold(text))
+    raw = [
+        part.strip('.')
+        for part in TOKEN_SPLIT_RE.split(text)
+    ]
+    raw = [part for part in raw if part]
+
+    tokens = []
+    i = 0
+    while i < len(raw):
+        token = raw[i]
+        following = raw[i + 1] if i + 1 < len(raw) else None
+        if NUMBER_RE.match(token) and following in UNIT_ALIASES:
+            token = token + following
+            i += 1
+        i += 1
+
+        token = _canonical_quantity(token)[:MAX_TOKEN_LENGTH]
+        if token not in STOPWORDS:
+            tokens.append(token)
+    return tokens
+
+
+def build_search_key(*values):
+    """
+    Build a search_key value: every token of the given values plus each
+    token's prefixes, so both whole-term and type-ahead matches are
+    plain array containment checks.
+    """
+    key = set()
+    for value in values:
+        for token in normalize_tokens(value):
+            key.add(token)
+            for length in range(MIN_PREFIX_LENGTH, len(token)):
+                key.add(token[:length])
+    return sorted(key)
+
+
+def backfill_search_keys(apps, schema_editor):
+    """Populate search_key for existing products and stores in batches."""
+    Product = apps.get_model('core', 'Product')
+    Store = apps.get_model('core', 'Store')
+
+    batch = []
+    for product in Product.objects.order_by('pk').iterator(chunk_size=BACKFILL_BATCH_SIZE):
+        product.search_key = build_search_key(
+            product.name, product.brand, product.amount,
+            product.category, product.manufacturer, product.barcode,
+        )
+        batch.append(product)
+        if len(batch) >= BACKFILL_BATCH_SIZE:
+            Product.objects.bulk_update(batch, ['search_key'])
+            batch = []
+    Product.objects.bulk_update(batch, ['search_key'])
+
+    batch = []
+    stores = Store.objects.select_related('region').order_by('pk')
+    for store in stores.iterator(chunk_size=BACKFILL_BATCH_SIZE):
+        store.search_key = build_search_key(
+            store.name, store.address,
+            store.region.region if store.region else None,
+        )
+        batch.append(store)
+        if len(batch) >= BACKFILL_BATCH_SIZE:
+            Store.objects.bulk_update(batch, ['search_key'])
+            batch = []
+    Store.objects.bulk_update(batch, ['search_key'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_usersearchhistory_retention'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='search_key',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=64), blank=True, default=list, editable=False, size=None),
+        ),
+        migrations.AddField(
+            model_name='store',
+            name='search_key',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=64), blank=True, default=list, editable=False, size=None),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_key'], name='core_product_search_key_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='store',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_key'], name='core_store_search_key_gin'),
+        ),
+        migrations.RunPython(
+            backfill_search_keys,
+            migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.1.15 on 2026-10-19 06:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# (activity family, threshold, PointsAction.activity_type) for the awards
+# that used to be hard-coded in game/utils
+DEFAULT_RULES = [
+    ('Price Listing', 1, 'First Price Listing'),
+    ('Price Listing', 10, '10th Price Listing'),
+    ('Price Listing', 50, '50th Price Listing'),
+    ('Price Listing', 100, '100th Price Listing'),
+    ('Price Listing', 200, '200th Price Listing'),
+    ('Price Listing', 500, '500th Price Listing'),
+    ('Price Listing', 1000, '1000th Price Listing'),
+    ('Price Listing', None, 'New Price Listing'),
+    ('Login', 1, 'First Login'),
+    ('Profile Update', 1, 'Update Profile Info'),
+    ('Profile Picture', 1, 'First Profile Picture'),
+]
+
+
+def seed_milestone_rules(apps, schema_editor):
+    """Create rules for the existing awards whose PointsAction exists."""
+    PointsAction = apps.get_model('core', 'PointsAction')
+    MilestoneRule = apps.get_model('core', 'MilestoneRule')
+
+    for activity, threshold, activity_type in DEFAULT_RULES:
+        points_action = PointsAction.objects.filter(
+            activity_type=activity_type
+        ).order_by('pk').first()
+        if points_action:
+            MilestoneRule.objects.get_or_create(
+                activity=activity,
+                threshold=threshold,
+                points_action=points_action,
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_game_outbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MilestoneRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('activity', models.CharField(max_length=100)),
+                ('threshold', models.PositiveIntegerField(blank=True, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('points_action', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='milestone_rules', to='core.pointsaction')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['activity', 'threshold'], name='core_milest_activit_a3be26_idx')],
+                'constraints': [models.UniqueConstraint(fields=('activity', 'threshold', 'points_action'), name='unique_milestone_rule')],
+            },
+        ),
+        migrations.RunPython(
+            seed_milestone_rules,
+            migrations.RunPython.noop,
+        ),
+    ]
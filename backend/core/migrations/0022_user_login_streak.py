@@ -0,0 +1,62 @@
+# Generated by Django 5.1.15 on 2026-10-19 06:58
+
+from django.db import migrations, models
+
+# (streak length, points, badge name)
+STREAK_MILESTONES = [
+    (3, 10, '3 Day Streak'),
+    (7, 25, '7 Day Streak'),
+    (30, 100, '30 Day Streak'),
+    (100, 300, '100 Day Streak'),
+]
+
+
+def seed_streak_rules(apps, schema_editor):
+    """Create the streak badges, their PointsActions and MilestoneRules."""
+    Badge = apps.get_model('core', 'Badge')
+    PointsAction = apps.get_model('core', 'PointsAction')
+    MilestoneRule = apps.get_model('core', 'MilestoneRule')
+
+    for days, points, badge_name in STREAK_MILESTONES:
+        badge, _ = Badge.objects.get_or_create(
+            name=badge_name,
+            defaults={'description': f'Logged in {days} days in a row.'},
+        )
+        points_action, _ = PointsAction.objects.get_or_create(
+            activity_type=f'{days} Day Login Streak',
+            defaults={'point_amount': points, 'badge': badge},
+        )
+        MilestoneRule.objects.get_or_create(
+            activity='Login Streak',
+            threshold=days,
+            points_action=points_action,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_milestonerule'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='current_streak',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='last_active_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='longest_streak',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(
+            seed_streak_rules,
+            migrations.RunPython.noop,
+        ),
+    ]
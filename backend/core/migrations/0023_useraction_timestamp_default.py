@@ -0,0 +1,19 @@
+# Generated by Django 5.1.15 on 2026-10-19 07:00
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_user_login_streak'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='useraction',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,160 @@
+# Generated by Django 5.1.15 on 2026-10-19 07:03
+
+from django.db import migrations, models, transaction
+from django.utils import timezone
+
+from core import partitions
+
+TABLE = 'core_useraction'
+OLD_TABLE = 'core_useraction_unpartitioned'
+MONTHS_AHEAD = 3
+COPY_BATCH_SIZE = 10000
+
+
+def partition_useraction(apps, schema_editor):
+    """
+    Rebuild core_useraction as a table range-partitioned by month on
+    timestamp. PostgreSQL only; the primary key becomes (id, timestamp)
+    since a partitioned table's keys must include the partition column.
+
+    The swap to the new table is one short transaction. Existing rows are
+    then moved over in batches of COPY_BATCH_SIZE, newest first, each in
+    its own transaction, so writers are never blocked for the whole copy;
+    until it finishes older actions are missing from reads. Re-running
+    the migration resumes an interrupted copy.
+    """
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+
+    qn = schema_editor.quote_name
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        if not partitions.is_partitioned(cursor, TABLE):
+            swap_in_partitioned_table(cursor, qn)
+
+    columns = '"id", "action_type", "timestamp", "additional_data", "user_id"'
+    while True:
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.execute("SELECT to_regclass(%s)", [OLD_TABLE])
+            if cursor.fetchone()[0] is None:
+                return
+            cursor.execute(
+                f"""
+                WITH moved AS (
+                    DELETE FROM {qn(OLD_TABLE)} WHERE "id" IN (
+                        SELECT "id" FROM {qn(OLD_TABLE)}
+                        ORDER BY "id" DESC LIMIT %s
+                    )
+                    RETURNING {columns}
+                )
+                INSERT INTO {qn(TABLE)} ({columns})
+                SELECT {columns} FROM moved
+                """,
+                [COPY_BATCH_SIZE],
+            )
+            if not cursor.rowcount:
+                # Also drops the old table's id sequence, which it owns
+                cursor.execute(f"DROP TABLE {qn(OLD_TABLE)}")
+
+
+def swap_in_partitioned_table(cursor, qn):
+    """Rename the old table away and create the partitioned one."""
+    cursor.execute(f"ALTER TABLE {qn(TABLE)} RENAME TO {qn(OLD_TABLE)}")
+    cursor.execute(
+        """
+        SELECT conname FROM pg_constraint
+        WHERE conrelid = %s::regclass AND contype = 'p'
+        """,
+        [OLD_TABLE],
+    )
+    (old_pkey,) = cursor.fetchone()
+    cursor.execute(
+        f"ALTER TABLE {qn(OLD_TABLE)} RENAME CONSTRAINT {qn(old_pkey)} "
+        f"TO {qn(OLD_TABLE + '_pkey')}"
+    )
+    # Free the sequence name for the new table while the old one is copied
+    cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [OLD_TABLE])
+    (old_sequence,) = cursor.fetchone()
+    if old_sequence:
+        cursor.execute(
+            f"ALTER SEQUENCE {old_sequence} RENAME TO {qn(OLD_TABLE + '_id_seq')}"
+        )
+
+    cursor.execute(
+        f"""
+        CREATE TABLE {qn(TABLE)} (
+            "id" bigint NOT NULL,
+            "action_type" varchar(255) NOT NULL,
+            "timestamp" timestamp with time zone NOT NULL,
+            "additional_data" jsonb NULL,
+            "user_id" bigint NOT NULL,
+            PRIMARY KEY ("id", "timestamp")
+        ) PARTITION BY RANGE ("timestamp")
+        """
+    )
+
+    cursor.execute(
+        f'SELECT MIN("timestamp"), COALESCE(MAX("id"), 0) FROM {qn(OLD_TABLE)}'
+    )
+    first_timestamp, max_id = cursor.fetchone()
+    now = timezone.now()
+    month = partitions.month_start(first_timestamp or now)
+    last_month = partitions.add_months(partitions.month_start(now), MONTHS_AHEAD)
+    while month <= last_month:
+        partitions.create_month_partition(cursor, qn, TABLE, month)
+        month = partitions.add_months(month, 1)
+    partitions.create_default_partition(cursor, qn, TABLE)
+
+    # New actions are numbered after every copied one
+    sequence = TABLE + '_id_seq'
+    cursor.execute(f"CREATE SEQUENCE {qn(sequence)} OWNED BY {qn(TABLE)}.\"id\"")
+    cursor.execute("SELECT setval(%s, %s, false)", [sequence, max_id + 1])
+    cursor.execute(
+        f"ALTER TABLE {qn(TABLE)} ALTER COLUMN \"id\" "
+        f"SET DEFAULT nextval('{sequence}'::regclass)"
+    )
+    cursor.execute(
+        f"""
+        ALTER TABLE {qn(TABLE)}
+        ADD CONSTRAINT {qn(TABLE + '_user_id_fk_core_user_id')}
+        FOREIGN KEY ("user_id") REFERENCES {qn('core_user')} ("id")
+        DEFERRABLE INITIALLY DEFERRED
+        """
+    )
+
+
+class Migration(migrations.Migration):
+    # The row copy commits batch by batch (see partition_useraction)
+    atomic = False
+
+    dependencies = [
+        ('core', '0023_useraction_timestamp_default'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            partition_useraction,
+            migrations.RunPython.noop,
+        ),
+        migrations.CreateModel(
+            name='UserActionDailyCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('action_type', models.CharField(max_length=255)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='useraction',
+            index=models.Index(fields=['user', 'timestamp'], name='core_useraction_user_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='useraction',
+            index=models.Index(fields=['action_type', 'timestamp'], name='core_useraction_type_ts_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='useractiondailycount',
+            constraint=models.UniqueConstraint(fields=('date', 'action_type'), name='unique_useraction_daily_count'),
+        ),
+    ]
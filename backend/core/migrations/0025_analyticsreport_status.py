@@ -0,0 +1,73 @@
+# Generated by Django 5.1.15 on 2026-10-19 07:06
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def mark_existing_reports_done(apps, schema_editor):
+    """Reports saved before the engine existed already carry their data."""
+    AnalyticsReport = apps.get_model('core', 'AnalyticsReport')
+    AnalyticsReport.objects.update(status='done')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0024_useraction_partitioning'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analyticsreport',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='analyticsreport',
+            name='error',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='analyticsreport',
+            name='finished_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='analyticsreport',
+            name='report_type',
+            field=models.CharField(blank=True, default='', max_length=50),
+        ),
+        migrations.AddField(
+            model_name='analyticsreport',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='analyticsreport',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='analyticsreport',
+            name='filters',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AlterField(
+            model_name='analyticsreport',
+            name='parameters',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AlterField(
+            model_name='analyticsreport',
+            name='report_data',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddIndex(
+            model_name='analyticsreport',
+            index=models.Index(fields=['status', 'created_at'], name='core_report_status_idx'),
+        ),
+        migrations.RunPython(
+            mark_existing_reports_done,
+            migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.1.15 on 2026-10-19 07:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0025_analyticsreport_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceBasket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PriceBasketItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.DecimalField(decimal_places=2, default=1, max_digits=8)),
+                ('basket', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='core.pricebasket')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.product')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='pricebasket',
+            name='products',
+            field=models.ManyToManyField(related_name='price_baskets', through='core.PriceBasketItem', to='core.product'),
+        ),
+        migrations.CreateModel(
+            name='RegionPriceIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('cost', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('items_priced', models.PositiveIntegerField(default=0)),
+                ('items_total', models.PositiveIntegerField(default=0)),
+                ('basket', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='index_points', to='core.pricebasket')),
+                ('region', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.region')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='pricebasketitem',
+            constraint=models.UniqueConstraint(fields=('basket', 'product'), name='unique_price_basket_item'),
+        ),
+        migrations.AddConstraint(
+            model_name='regionpriceindex',
+            constraint=models.UniqueConstraint(fields=('basket', 'region', 'date'), name='unique_region_price_index_day'),
+        ),
+    ]
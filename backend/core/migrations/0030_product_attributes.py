@@ -0,0 +1,132 @@
+# Generated by Django 5.1.15 on 2026-10-19 07:38
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+from django.db.models import Q
+
+from core.normalize import attribute_key, build_attributes
+
+BACKFILL_BATCH_SIZE = 1000
+OPTION_SLOTS = range(1, 6)
+
+
+def copy_options_to_attributes(apps, schema_editor):
+    """Move option1name/option1value..option5 pairs into attributes in batches."""
+    Product = apps.get_model('core', 'Product')
+
+    with_options = Q()
+    for slot in OPTION_SLOTS:
+        with_options |= Q(**{f'option{slot}name__isnull': False})
+    products = Product.objects.filter(with_options).order_by('pk')
+
+    fields = ['attributes', 'option_order']
+    batch = []
+    for product in products.iterator(chunk_size=BACKFILL_BATCH_SIZE):
+        pairs = [
+            (getattr(product, f'option{slot}name'), getattr(product, f'option{slot}value'))
+            for slot in OPTION_SLOTS
+        ]
+        product.attributes = build_attributes(pairs)
+        # Keep the slot order, which jsonb keys don't
+        product.option_order = [
+            name for name in dict.fromkeys(attribute_key(name) for name, _ in pairs)
+            if name in product.attributes
+        ]
+        batch.append(product)
+        if len(batch) >= BACKFILL_BATCH_SIZE:
+            Product.objects.bulk_update(batch, fields)
+            batch = []
+    Product.objects.bulk_update(batch, fields)
+
+
+def copy_attributes_to_options(apps, schema_editor):
+    """Restore the first five attributes, in slot order, into the option columns."""
+    Product = apps.get_model('core', 'Product')
+    fields = [
+        f'option{slot}{part}'
+        for slot in OPTION_SLOTS for part in ('name', 'value')
+    ]
+
+    batch = []
+    products = Product.objects.exclude(attributes={}).order_by('pk')
+    for product in products.iterator(chunk_size=BACKFILL_BATCH_SIZE):
+        attributes = product.attributes
+        names = [name for name in product.option_order if name in attributes]
+        names += sorted(set(attributes) - set(names))
+        for slot, name in zip(OPTION_SLOTS, names):
+            setattr(product, f'option{slot}name', name)
+            setattr(product, f'option{slot}value', attributes[name])
+        batch.append(product)
+        if len(batch) >= BACKFILL_BATCH_SIZE:
+            Product.objects.bulk_update(batch, fields)
+            batch = []
+    Product.objects.bulk_update(batch, fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0029_media_blob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='attributes',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='option_order',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=255), blank=True, default=list, size=None),
+        ),
+        migrations.RunPython(
+            copy_options_to_attributes,
+            copy_attributes_to_options,
+        ),
+        migrations.RemoveField(
+            model_name='product',
+            name='option1name',
+        ),
+        migrations.RemoveField(
+            model_name='product',
+            name='option1value',
+        ),
+        migrations.RemoveField(
+            model_name='product',
+            name='option2name',
+        ),
+        migrations.RemoveField(
+            model_name='product',
+            name='option2value',
+        ),
+        migrations.RemoveField(
+            model_name='product',
+            name='option3name',
+        ),
+        migrations.RemoveField(
+            model_name='product',
+            name='option3value',
+        ),
+        migrations.RemoveField(
+            model_name='product',
+            name='option4name',
+        ),
+        migrations.RemoveField(
+            model_name='product',
+            name='option4value',
+        ),
+        migrations.RemoveField(
+            model_name='product',
+            name='option5name',
+        ),
+        migrations.RemoveField(
+            model_name='product',
+            name='option5value',
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['attributes'], name='core_product_attributes_gin', opclasses=['jsonb_path_ops']),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.15 on 2026-10-19 08:00
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0030_product_attributes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='leaderboardentry',
+            name='core_leaderboard_rank_idx',
+        ),
+        migrations.RemoveField(
+            model_name='leaderboard',
+            name='size',
+        ),
+        migrations.RemoveField(
+            model_name='leaderboardentry',
+            name='rank',
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-19 08:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0031_leaderboard_upsert_entries'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mediablob',
+            name='uploads',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
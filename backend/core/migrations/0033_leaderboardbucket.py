@@ -0,0 +1,54 @@
+# Generated by Django 5.1.15 on 2026-10-19 08:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_buckets(apps, schema_editor):
+    """Build each board's points histogram from its existing entries."""
+    LeaderboardBucket = apps.get_model('core', 'LeaderboardBucket')
+    LeaderboardEntry = apps.get_model('core', 'LeaderboardEntry')
+
+    rows = (
+        LeaderboardEntry.objects
+        .values('leaderboard_id', 'points')
+        .annotate(entries=models.Count('id'))
+        .order_by()
+    )
+    LeaderboardBucket.objects.bulk_create(
+        (
+            LeaderboardBucket(
+                leaderboard_id=row['leaderboard_id'],
+                points=row['points'],
+                count=row['entries'],
+            )
+            for row in rows.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0032_mediablob_uploads'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('points', models.IntegerField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('leaderboard', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='buckets', to='core.leaderboard')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('leaderboard', 'points'), name='unique_leaderboard_bucket')],
+            },
+        ),
+        migrations.RunPython(
+            fill_buckets,
+            migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.1.15 on 2026-10-19 08:49
+
+from django.db import migrations
+from django.db.models import Count, Value
+
+BATCH_SIZE = 1000
+
+
+def seed_activity_counters(apps, schema_editor):
+    """
+    Start each user's milestone counters at their past activity, so users
+    who already earned a milestone aren't awarded it again. Counters that
+    already exist are kept. Login counters were seeded by an earlier
+    version of 0021 but are never read (logins count in User.number_logins)
+    and are removed.
+    """
+    User = apps.get_model('core', 'User')
+    UserActivityCounter = apps.get_model('core', 'UserActivityCounter')
+    UserPoint = apps.get_model('core', 'UserPoint')
+
+    sources = {
+        'Price Listing': (
+            UserPoint.objects
+            .filter(points_action__activity_type__contains='Price Listing')
+            .values('user_id')
+            .annotate(events=Count('id'))
+            .order_by()
+            .values_list('user_id', 'events')
+        ),
+        'Profile Update': (
+            User.objects.filter(profile_updated=True)
+            .annotate(events=Value(1))
+            .values_list('id', 'events')
+        ),
+        'Profile Picture': (
+            User.objects.filter(profile_picture_updated=True)
+            .annotate(events=Value(1))
+            .values_list('id', 'events')
+        ),
+    }
+    for activity, rows in sources.items():
+        UserActivityCounter.objects.bulk_create(
+            (
+                UserActivityCounter(user_id=user_id, activity=activity, count=count)
+                for user_id, count in rows.iterator()
+            ),
+            batch_size=BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+
+    UserActivityCounter.objects.filter(activity='Login').delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0033_leaderboardbucket'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            seed_activity_counters,
+            migrations.RunPython.noop,
+        ),
+    ]
@@ -1,10 +1,11 @@
 """
 Database Models.
 """
-import uuid
 import os
 
 from django.conf import settings
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 from django.contrib.auth.models import (
     AbstractBaseUser,
@@ -15,37 +16,123 @@ import django.utils.timezone as timezone
 from django.utils.timezone import now
 from django.core.validators import MaxValueValidator, MinValueValidator
 
+from core.normalize import build_search_key
+
 
 def product_image_file_path(instance, filename):
-    """Generate file path for new product image."""
+    """
+    Directory and extension for a new product image; the storage names
+    the file by its content hash.
+    """
     ext = os.path.splitext(filename)[1]
-    filename = f'{uuid.uuid4()}{ext}'
 
-    return os.path.join('uploads', 'product', filename)
+    return os.path.join('uploads', 'product', f'upload{ext}')
 
 
 def store_image_file_path(instance, filename):
-    """Generate file path for new store image."""
+    """
+    Directory and extension for a new store image; the storage names
+    the file by its content hash.
+    """
     ext = os.path.splitext(filename)[1]
-    filename = f'{uuid.uuid4()}{ext}'
 
-    return os.path.join('uploads', 'store_images', filename)
+    return os.path.join('uploads', 'store_images', f'upload{ext}')
 
 
 def profile_picture_file_path(instance, filename):
-    """Generate file path for new profile picture."""
+    """
+    Directory and extension for a new profile picture; the storage names
+    the file by its content hash.
+    """
     ext = os.path.splitext(filename)[1]
-    filename = f'{uuid.uuid4()}{ext}'
 
-    return os.path.join('uploads', 'profile_pictures', filename)
+    return os.path.join('uploads', 'profile_pictures', f'upload{ext}')
 
 
 def price_image_file_path(instance, filename):
-    """Generate file path for new price image."""
+    """
+    Directory and extension for a new price image; the storage names
+    the file by its content hash.
+    """
     ext = os.path.splitext(filename)[1]
-    filename = f'{uuid.uuid4()}{ext}'
 
-    return os.path.join('uploads', 'price_images', filename)
+    return os.path.join('uploads', 'price_images', f'upload{ext}')
+
+
+def sync_search_key(instance, save_kwargs):
+    """
+    Recompute instance.search_key before a save that touches any of its
+    SEARCH_KEY_FIELDS, adding search_key to update_fields when those are
+    restricted.
+    """
+    update_fields = save_kwargs.get('update_fields')
+    if update_fields is not None:
+        update_fields = set(update_fields)
+        if not update_fields & set(instance.SEARCH_KEY_FIELDS):
+            return
+        save_kwargs['update_fields'] = update_fields | {'search_key'}
+    instance.search_key = instance.build_search_key()
+
+
+_MISSING = object()
+
+
+class TrackedFieldsMixin:
+    """
+    Snapshot TRACKED_FIELDS when an instance is loaded, so save() can tell
+    which of them changed without reading the row again.
+    """
+    TRACKED_FIELDS = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = instance.tracked_values()
+        return instance
+
+    def tracked_values(self):
+        # Deferred fields are missing and count as changed once loaded;
+        # files are compared by name since FieldFile is updated in place
+        return {
+            field: getattr(value, 'name', value)
+            for field in self.TRACKED_FIELDS
+            if (value := self.__dict__.get(field, _MISSING)) is not _MISSING
+        }
+
+    def changed_fields(self):
+        """Tracked fields changed since load (all of them if never loaded)."""
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is None:
+            return set(self.TRACKED_FIELDS)
+        current = self.tracked_values()
+        return {
+            field for field in self.TRACKED_FIELDS
+            if current.get(field, _MISSING) != loaded.get(field, _MISSING)
+        }
+
+    def _snapshot(self, fields):
+        """Record the current values of the tracked fields named in fields."""
+        loaded = getattr(self, '_loaded_values', None)
+        current = self.tracked_values()
+        if fields is None or loaded is None:
+            self._loaded_values = current
+            return
+        fields = set(fields)
+        for field in self.TRACKED_FIELDS:
+            if field in current and (
+                field in fields or field.removesuffix('_id') in fields
+            ):
+                loaded[field] = current[field]
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        # Also how deferred fields load, which must not count as a change
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        self._snapshot(fields)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Fields left out of update_fields are still unsaved changes
+        self._snapshot(kwargs.get('update_fields'))
 
 
 class UserManager(BaseUserManager):
@@ -104,7 +191,7 @@ class UserRole(models.Model):
         return self.role_name
 
 
-class User(AbstractBaseUser, PermissionsMixin):
+class User(TrackedFieldsMixin, AbstractBaseUser, PermissionsMixin):
     """Custom User model with additional fields."""
     email = models.EmailField(max_length=255, unique=True)
     first_name = models.CharField(max_length=255)
@@ -140,6 +227,12 @@ class User(AbstractBaseUser, PermissionsMixin):
     number_logins = models.PositiveIntegerField(default=0)
     profile_updated = models.BooleanField(default=False)
     profile_picture_updated = models.BooleanField(default=False)
+    current_streak = models.PositiveIntegerField(default=0)
+    longest_streak = models.PositiveIntegerField(default=0)
+    last_active_date = models.DateField(null=True, blank=True)
+    # Bumped whenever the password, active flag or staff/superuser status
+    # changes, so cached copies of the user are never served afterwards
+    auth_version = models.PositiveIntegerField(default=0, editable=False)
     theme_mode = models.CharField(
         max_length=20,
         choices=[("light", "Light"), ("dark", "Dark")],
@@ -151,6 +244,17 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['first_name', 'last_name']
 
+    # Changes to these bump auth_version
+    AUTH_FIELDS = {'password', 'is_active', 'is_staff', 'is_superuser'}
+    # Written by UPDATE statements that bypass save() (logins, awards and
+    # points reconciliation); the auth cache leaves them out of its copies
+    COUNTER_FIELDS = (
+        'points', 'number_logins', 'current_streak', 'longest_streak',
+        'last_active_date', 'last_login',
+    )
+    # A preferred_region change moves the user's regional leaderboard entry
+    TRACKED_FIELDS = (*sorted(AUTH_FIELDS), 'profile_picture', 'preferred_region_id')
+
     def __str__(self):
         return self.email
 
@@ -158,6 +262,25 @@ class User(AbstractBaseUser, PermissionsMixin):
     def username(self):
         return self.email
 
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        # Reading one deferred counter loads the others in the same query
+        if fields is not None and set(fields) & set(self.COUNTER_FIELDS):
+            deferred = self.get_deferred_fields() & set(self.COUNTER_FIELDS)
+            fields = [*fields, *(deferred - set(fields))]
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+
+    def save(self, *args, **kwargs):
+        bump = not self._state.adding and self.changed_fields() & self.AUTH_FIELDS
+        if bump:
+            # Incremented in the database so concurrent saves both count
+            self.auth_version = models.F('auth_version') + 1
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'auth_version'}
+        super().save(*args, **kwargs)
+        if bump:
+            self.refresh_from_db(fields=['auth_version'])
+
 class DataSources(models.Model):
     name = models.CharField(max_length=255)
     description = models.TextField(null=True, blank=True)
@@ -166,7 +289,7 @@ class DataSources(models.Model):
         return self.name
 
 
-class Product(models.Model):
+class Product(TrackedFieldsMixin, models.Model):
     IMG_VERIFIED_CHOICES = [
         ('pending', 'Pending'),
         ('verified', 'Verified'),
@@ -190,16 +313,14 @@ class Product(models.Model):
         choices=IMG_VERIFIED_CHOICES,
         default='pending'
         )
-    option1name = models.CharField(max_length=255, null=True, blank=True)
-    option1value = models.CharField(max_length=255, null=True, blank=True)
-    option2name = models.CharField(max_length=255, null=True, blank=True)
-    option2value = models.CharField(max_length=255, null=True, blank=True)
-    option3name = models.CharField(max_length=255, null=True, blank=True)
-    option3value = models.CharField(max_length=255, null=True, blank=True)
-    option4name = models.CharField(max_length=255, null=True, blank=True)
-    option4value = models.CharField(max_length=255, null=True, blank=True)
-    option5name = models.CharField(max_length=255, null=True, blank=True)
-    option5value = models.CharField(max_length=255, null=True, blank=True)
+    attributes = models.JSONField(default=dict, blank=True)
+    # Attribute names in the option1..option5 slots of older clients;
+    # jsonb doesn't keep the key order of attributes
+    option_order = ArrayField(
+        models.CharField(max_length=255),
+        default=list,
+        blank=True
+        )
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.SET_NULL,
@@ -211,41 +332,71 @@ class Product(models.Model):
         null=True, blank=True
     )
     date_added = models.DateTimeField(auto_now_add=True)
+    search_key = ArrayField(
+        models.CharField(max_length=64),
+        default=list,
+        blank=True,
+        editable=False
+        )
 
-    def save(self, *args, **kwargs):
-        # Check if the instance is new or if the image field has been updated
-        is_new = False
-        if self.pk is None:
-            is_new = True
-        else:
-            old_instance = Product.objects.get(pk=self.pk)
-            if old_instance.image != self.image:
-                is_new = True
+    SEARCH_KEY_FIELDS = [
+        'name', 'brand', 'amount', 'category', 'manufacturer', 'barcode'
+    ]
+    TRACKED_FIELDS = ('image', 'barcode')
 
-        super().save(*args, **kwargs)
+    class Meta:
+        indexes = [
+            GinIndex(fields=['search_key'], name='core_product_search_key_gin'),
+            GinIndex(
+                fields=['attributes'],
+                name='core_product_attributes_gin',
+                opclasses=['jsonb_path_ops'],
+            ),
+        ]
 
-        if is_new and self.image:
+    def build_search_key(self):
+        return build_search_key(
+            *(getattr(self, field) for field in self.SEARCH_KEY_FIELDS)
+        )
+
+    def save(self, *args, track_changes=True, **kwargs):
+        """
+        Save, pointing image_url at a new or replaced image in the same
+        write. Bulk paths that never touch the image can pass
+        track_changes=False to skip the check.
+        """
+        sync_search_key(self, kwargs)
+
+        update_fields = kwargs.get('update_fields')
+        image_saved = update_fields is None or 'image' in update_fields
+        if (
+            track_changes and image_saved and self.image
+            and 'image' in self.changed_fields()
+        ):
+            # Store the file first (as pre_save would) so its URL is known
+            if not self.image._committed:
+                self.image.save(self.image.name, self.image.file, save=False)
             self.image_url = f"{settings.DOMAIN}{self.image.url}"
-            super().save(update_fields=['image_url'])
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'image_url'}
 
-    def delete(self, *args, **kwargs):
-        if self.image:
-            if os.path.isfile(self.image.path):
-                os.remove(self.image.path)
-        super().delete(*args, **kwargs)
+        super().save(*args, **kwargs)
 
     def __str__(self) -> str:
         return self.name
 
 
-class Region(models.Model):
+class Region(TrackedFieldsMixin, models.Model):
     region = models.CharField(max_length=255)
 
+    # A renamed region rebuilds its stores' search keys (see core.signals)
+    TRACKED_FIELDS = ('region',)
+
     def __str__(self) -> str:
         return self.region
 
 
-class Store(models.Model):
+class Store(TrackedFieldsMixin, models.Model):
     IMG_VERIFIED_CHOICES = [
         ('pending', 'Pending'),
         ('verified', 'Verified'),
@@ -302,18 +453,43 @@ class Store(models.Model):
         null=True, blank=True
     )
     date_added = models.DateTimeField(auto_now_add=True)
+    search_key = ArrayField(
+        models.CharField(max_length=64),
+        default=list,
+        blank=True,
+        editable=False
+        )
+
+    SEARCH_KEY_FIELDS = ['name', 'address', 'region']
+    TRACKED_FIELDS = ('image', 'name', 'address', 'region_id')
 
-    def delete(self, *args, **kwargs):
-        if self.image:
-            if os.path.isfile(self.image.path):
-                os.remove(self.image.path)
-        super().delete(*args, **kwargs)
+    class Meta:
+        indexes = [
+            GinIndex(fields=['search_key'], name='core_store_search_key_gin'),
+        ]
+
+    def build_search_key(self, region_name=_MISSING):
+        if region_name is _MISSING:
+            region_name = None
+            if Store.region.is_cached(self):
+                region_name = self.region.region if self.region else None
+            elif self.region_id:
+                region_name = Region.objects.filter(
+                    pk=self.region_id
+                ).values_list('region', flat=True).first()
+        return build_search_key(self.name, self.address, region_name)
+
+    def save(self, *args, **kwargs):
+        # Unchanged inputs keep the stored key, and skip the region lookup
+        if self.changed_fields() & {'name', 'address', 'region_id'}:
+            sync_search_key(self, kwargs)
+        super().save(*args, **kwargs)
 
     def __str__(self) -> str:
         return self.name
 
 
-class PriceListing(models.Model):
+class PriceListing(TrackedFieldsMixin, models.Model):
     PRICE_VERIFIED_CHOICES = [
         ('pending', 'Pending'),
         ('verified', 'Verified'),
@@ -355,11 +531,7 @@ class PriceListing(models.Model):
         null=True, blank=True
     )
 
-    def delete(self, *args, **kwargs):
-        if self.price_image:
-            if os.path.isfile(self.price_image.path):
-                os.remove(self.price_image.path)
-        super().delete(*args, **kwargs)
+    TRACKED_FIELDS = ('price_image',)
 
     class Meta:
         indexes = [
@@ -436,16 +608,40 @@ class ShoppingListItem(models.Model):
 
 
 class AnalyticsReport(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
     )
-    parameters = models.JSONField()
-    filters = models.JSONField()
-    report_data = models.JSONField()
+    report_type = models.CharField(max_length=50, blank=True, default='')
+    parameters = models.JSONField(default=dict, blank=True)
+    filters = models.JSONField(default=dict, blank=True)
+    report_data = models.JSONField(default=dict, blank=True)
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default='pending'
+        )
+    error = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['status', 'created_at'],
+                name='core_report_status_idx'
+            ),
+        ]
 
     def __str__(self) -> str:
-        return self.user
+        return f"{self.user} - {self.report_type} ({self.status})"
 
 
 class UserAction(models.Model):
@@ -454,13 +650,47 @@ class UserAction(models.Model):
         on_delete=models.CASCADE,
     )
     action_type = models.CharField(max_length=255)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Set when the action happens, not when the audit buffer flushes it
+    timestamp = models.DateTimeField(default=timezone.now)
     additional_data = models.JSONField(null=True, blank=True)
 
+    # On PostgreSQL the table is range-partitioned by month on timestamp
+    # (see migration 0024 and manage_useraction_partitions), so the
+    # database primary key is (id, timestamp).
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['user', 'timestamp'],
+                name='core_useraction_user_ts_idx'
+            ),
+            models.Index(
+                fields=['action_type', 'timestamp'],
+                name='core_useraction_type_ts_idx'
+            ),
+        ]
+
     def __str__(self) -> str:
         return f"{self.user} - {self.action_type}"
 
 
+class UserActionDailyCount(models.Model):
+    """Number of UserActions of each type per day, for dashboards."""
+    date = models.DateField()
+    action_type = models.CharField(max_length=255)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'action_type'],
+                name='unique_useraction_daily_count'
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.date} {self.action_type}: {self.count}"
+
+
 class Notification(models.Model):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -553,6 +783,37 @@ class PointsAction(models.Model):
         return f"{self.activity_type} - {self.point_amount} pts"
 
 
+class MilestoneRule(models.Model):
+    """
+    Awards a PointsAction when a user's counter for an activity family
+    reaches threshold. A rule without a threshold applies to every event
+    of the family that does not reach a milestone.
+    """
+    activity = models.CharField(max_length=100)
+    threshold = models.PositiveIntegerField(null=True, blank=True)
+    points_action = models.ForeignKey(
+        PointsAction,
+        on_delete=models.CASCADE,
+        related_name='milestone_rules'
+        )
+    is_active = models.BooleanField(default=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['activity', 'threshold', 'points_action'],
+                name='unique_milestone_rule'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['activity', 'threshold']),
+        ]
+
+    def __str__(self) -> str:
+        threshold = self.threshold if self.threshold is not None else 'every'
+        return f"{self.activity} @ {threshold} -> {self.points_action}"
+
+
 class UserPoint(models.Model):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -569,6 +830,28 @@ class UserPoint(models.Model):
         return f"{self.user} - {self.points_action}"
 
 
+class UserActivityCounter(models.Model):
+    """Running count of a user's activities within one activity family."""
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='activity_counters'
+        )
+    activity = models.CharField(max_length=100)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'activity'],
+                name='unique_user_activity_counter'
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user} - {self.activity}: {self.count}"
+
+
 class UnresolvedBarcode(models.Model):
     barcode = models.CharField(max_length=255, unique=True)
     timestamp = models.DateTimeField(auto_now_add=True)
@@ -598,4 +881,265 @@ class UserSearchHistory(models.Model):
         return self.query + ' - ' + self.user.email
 
     class Meta:
-        ordering = ['-timestamp']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'query'],
+                name='unique_search_history_query'
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-timestamp'],
+                name='core_search_user_recent_idx'
+            ),
+        ]
+
+
+class JobWatermark(models.Model):
+    """Progress marker for incremental background jobs."""
+    name = models.CharField(max_length=100, unique=True)
+    timestamp = models.DateTimeField(null=True, blank=True)
+    position = models.BigIntegerField(null=True, blank=True)
+    last_updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class SearchQueryTrend(models.Model):
+    """Decayed popularity of a search query, globally or per region."""
+    query = models.CharField(max_length=255)
+    region = models.ForeignKey(
+        Region,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True
+        )
+    score = models.FloatField(default=0)
+    searches = models.PositiveIntegerField(default=0)
+    last_searched = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['query', 'region'],
+                condition=models.Q(region__isnull=False),
+                name='unique_trend_per_region'
+            ),
+            models.UniqueConstraint(
+                fields=['query'],
+                condition=models.Q(region__isnull=True),
+                name='unique_trend_global'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['region', '-score']),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.query} ({self.region or 'global'})"
+
+
+class Leaderboard(models.Model):
+    """
+    A ranked points table: 'global', 'region:<id>', 'week:<yyyy>-W<ww>'
+    or 'month:<yyyy>-<mm>'. The row also serves as the lock serializing
+    full rebuilds of its board.
+    """
+    key = models.CharField(max_length=50, unique=True)
+    refreshed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self) -> str:
+        return self.key
+
+
+class LeaderboardEntry(models.Model):
+    """A user's points on one leaderboard."""
+    leaderboard = models.ForeignKey(
+        Leaderboard,
+        on_delete=models.CASCADE,
+        related_name='entries'
+        )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='leaderboard_entries'
+        )
+    points = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['leaderboard', 'user'],
+                name='unique_leaderboard_user'
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['leaderboard', '-points'],
+                name='core_leaderboard_points_idx'
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.leaderboard} {self.user}: {self.points}"
+
+
+class LeaderboardBucket(models.Model):
+    """
+    How many of a board's entries have exactly these points. Kept in step
+    with the entries by game.utils.leaderboard, so ranks and board sizes
+    are read from this histogram instead of counting entries.
+    """
+    leaderboard = models.ForeignKey(
+        Leaderboard,
+        on_delete=models.CASCADE,
+        related_name='buckets'
+        )
+    points = models.IntegerField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['leaderboard', 'points'],
+                name='unique_leaderboard_bucket'
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.leaderboard} {self.points}: {self.count}"
+
+
+class GameEvent(models.Model):
+    """Outbox of gamification events awaiting the process_game_events worker."""
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='game_events'
+        )
+    action_type = models.CharField(max_length=50)
+    data = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(null=True, blank=True)
+
+    def __str__(self) -> str:
+        return f"{self.user} - {self.action_type}"
+
+
+class GameNotification(models.Model):
+    """An award waiting to be shown to the user."""
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='game_notifications'
+        )
+    activity_type = models.CharField(max_length=255)
+    points = models.IntegerField(default=0)
+    badge = models.CharField(max_length=255, null=True, blank=True)
+    seen = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['user', 'id'],
+                condition=models.Q(seen=False),
+                name='core_gamenotif_unseen_idx'
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user} - {self.activity_type}"
+
+
+class PriceBasket(models.Model):
+    """A reference basket of products whose regional cost is tracked daily."""
+    name = models.CharField(max_length=255, unique=True)
+    description = models.TextField(null=True, blank=True)
+    is_active = models.BooleanField(default=True)
+    products = models.ManyToManyField(
+        Product,
+        through='PriceBasketItem',
+        related_name='price_baskets'
+        )
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class PriceBasketItem(models.Model):
+    basket = models.ForeignKey(
+        PriceBasket,
+        on_delete=models.CASCADE,
+        related_name='items'
+        )
+    product = models.ForeignKey(Product, on_delete=models.CASCADE)
+    quantity = models.DecimalField(max_digits=8, decimal_places=2, default=1)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['basket', 'product'],
+                name='unique_price_basket_item'
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.basket}: {self.quantity} x {self.product}"
+
+
+class RegionPriceIndex(models.Model):
+    """
+    Cost of a basket in a region from this date until the next row: the
+    sum over basket items of quantity times the average latest price
+    across the region's stores.
+    """
+    basket = models.ForeignKey(
+        PriceBasket,
+        on_delete=models.CASCADE,
+        related_name='index_points'
+        )
+    region = models.ForeignKey(Region, on_delete=models.CASCADE)
+    date = models.DateField()
+    cost = models.DecimalField(max_digits=12, decimal_places=2)
+    items_priced = models.PositiveIntegerField(default=0)
+    items_total = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['basket', 'region', 'date'],
+                name='unique_region_price_index_day'
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.basket} / {self.region} {self.date}: {self.cost}"
+
+
+class ImageDerivativeTask(models.Model):
+    """An uploaded image (storage name) waiting for its derivatives."""
+    name = models.CharField(max_length=255, unique=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class MediaBlob(models.Model):
+    """A content-addressed media file and the number of rows using it."""
+    name = models.CharField(max_length=255, unique=True)
+    sha256 = models.CharField(max_length=64, null=True, blank=True)
+    size = models.PositiveBigIntegerField(null=True, blank=True)
+    ref_count = models.PositiveIntegerField(default=0)
+    # Bumped by every upload of these bytes, so a pending deletion can
+    # tell the file was claimed again after its last reference went
+    uploads = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return f"{self.name} ({self.ref_count})"
@@ -0,0 +1,145 @@
+"""
+Search text normalization shared by the search filters, the suggestions
+endpoint and the denormalized search_key columns on Product and Store.
+"""
+import re
+import unicodedata
+
+STOPWORDS = {
+    "in", "at", "on", "and", "or", "for", "the", "a", "an", "of", "with",
+    "to", "from", "by",
+}
+WILDCARD_TERMS = {"&"}
+
+# Shortest prefix stored in a search key, so type-ahead input of this
+# length or more resolves through the index.
+MIN_PREFIX_LENGTH = 2
+MAX_TOKEN_LENGTH = 64
+
+UNIT_ALIASES = {
+    'l': 'l', 'lt': 'l', 'lts': 'l', 'ltr': 'l', 'ltrs': 'l',
+    'litre': 'l', 'litres': 'l', 'liter': 'l', 'liters': 'l',
+    'ml': 'ml', 'mls': 'ml', 'millilitre': 'ml', 'millilitres': 'ml',
+    'milliliter': 'ml', 'milliliters': 'ml',
+    'cl': 'cl',
+    'kg': 'kg', 'kgs': 'kg', 'kilo': 'kg', 'kilos': 'kg',
+    'kilogram': 'kg', 'kilograms': 'kg',
+    'g': 'g', 'gm': 'g', 'gms': 'g', 'gr': 'g', 'grm': 'g', 'grms': 'g',
+    'gram': 'g', 'grams': 'g', 'gramme': 'g', 'grammes': 'g',
+    'mg': 'mg',
+    'oz': 'oz', 'ozs': 'oz', 'ounce': 'oz', 'ounces': 'oz',
+    'floz': 'floz',
+    'lb': 'lb', 'lbs': 'lb', 'pound': 'lb', 'pounds': 'lb',
+    'pk': 'pk', 'pck': 'pk', 'pack': 'pk', 'packs': 'pk',
+    'ct': 'ct', 'count': 'ct',
+}
+
+TOKEN_SPLIT_RE = re.compile(r"[^a-z0-9.]+")
+FLUID_OUNCE_RE = re.compile(r"\bfl\.?\s*oz\b")
+NUMBER_RE = re.compile(r"^\d+(?:\.\d+)?$")
+QUANTITY_RE = re.compile(r"^(\d+(?:\.\d+)?)([a-z]+)$")
+
+
+def split_query(query):
+    """Split a raw query on whitespace, dropping stopwords and wildcards."""
+    return [
+        term for term in re.split(r'\s+', query.strip())
+        if term and term.lower() not in STOPWORDS
+        and term not in WILDCARD_TERMS
+    ]
+
+
+def _fold(text):
+    """Lowercase and strip accents."""
+    text = unicodedata.normalize('NFKD', str(text))
+    return "".join(c for c in text if not unicodedata.combining(c)).lower()
+
+
+def _canonical_number(number):
+    """'1.0' -> '1', '0.50' -> '0.5'."""
+    if '.' in number:
+        number = number.rstrip('0').rstrip('.')
+    return number or '0'
+
+
+def _canonical_quantity(token):
+    """'1ltr' -> '1l', '500grams' -> '500g'; other tokens are unchanged."""
+    match = QUANTITY_RE.match(token)
+    if match and match.group(2) in UNIT_ALIASES:
+        return _canonical_number(match.group(1)) + UNIT_ALIASES[match.group(2)]
+    if NUMBER_RE.match(token):
+        return _canonical_number(token)
+    return token
+
+
+def normalize_tokens(text):
+    """
+    Turn free text into lowercased, unit-canonicalized tokens.
+
+    A number followed by a unit word is joined into one token, so
+    "1 Ltr", "1ltr" and "1.0 litre" all become "1l".
+    """
+    if not text:
+        return []
+
+    text = FLUID_OUNCE_RE.sub('floz', _fold(text))
+    raw = [
+        part.strip('.')
+        for part in TOKEN_SPLIT_RE.split(text)
+    ]
+    raw = [part for part in raw if part]
+
+    tokens = []
+    i = 0
+    while i < len(raw):
+        token = raw[i]
+        following = raw[i + 1] if i + 1 < len(raw) else None
+        if NUMBER_RE.match(token) and following in UNIT_ALIASES:
+            token = token + following
+            i += 1
+        i += 1
+
+        token = _canonical_quantity(token)[:MAX_TOKEN_LENGTH]
+        if token not in STOPWORDS:
+            tokens.append(token)
+    return tokens
+
+
+def query_terms(query):
+    """Normalized, de-duplicated terms of a search query, in order."""
+    return list(dict.fromkeys(normalize_tokens(query)))
+
+
+def build_search_key(*values):
+    """
+    Build a search_key value: every token of the given values plus each
+    token's prefixes, so both whole-term and type-ahead matches are
+    plain array containment checks.
+    """
+    key = set()
+    for value in values:
+        for token in normalize_tokens(value):
+            key.add(token)
+            for length in range(MIN_PREFIX_LENGTH, len(token)):
+                key.add(token[:length])
+    return sorted(key)
+
+
+def attribute_key(name):
+    """'  Pack  Size ' -> 'pack size', the key attributes are stored under."""
+    return " ".join(_fold(name or '').split())
+
+
+def build_attributes(pairs):
+    """
+    Build a Product.attributes value from (name, value) pairs. Names are
+    normalized with attribute_key and values stripped; pairs with either
+    part blank are dropped, and a repeated name keeps its last value.
+    """
+    attributes = {}
+    for name, value in pairs:
+        key = attribute_key(name)
+        value = str(value).strip() if value is not None else ''
+        if key and value:
+            attributes[key] = value
+    return attributes
@@ -0,0 +1,137 @@
+"""
+Monthly range partitions on PostgreSQL.
+
+A partitioned table <table> has one partition per UTC calendar month named
+<table>_pYYYYMM covering [first of the month, first of the next month),
+plus a <table>_default partition catching anything outside those ranges.
+PostgreSQL refuses to create a partition for a month the default
+partition already holds rows for, so partitions added after the default
+one go through split_default_partition.
+"""
+import re
+from datetime import date, datetime, timezone as dt_timezone
+
+PARTITION_NAME_RE = r'_p(\d{4})(\d{2})$'
+
+
+def month_start(value):
+    return date(value.year, value.month, 1)
+
+
+def add_months(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_bounds(month):
+    """UTC datetimes bounding a month's partition."""
+    start = datetime(month.year, month.month, 1, tzinfo=dt_timezone.utc)
+    end_month = add_months(month, 1)
+    end = datetime(end_month.year, end_month.month, 1, tzinfo=dt_timezone.utc)
+    return start, end
+
+
+def partition_name(table, month):
+    return f"{table}_p{month:%Y%m}"
+
+
+def is_partitioned(cursor, table):
+    cursor.execute(
+        """
+        SELECT 1 FROM pg_partitioned_table pt
+        JOIN pg_class c ON c.oid = pt.partrelid
+        WHERE c.relname = %s
+        """,
+        [table],
+    )
+    return cursor.fetchone() is not None
+
+
+def list_partitions(cursor, table):
+    """{month: partition name} for the table's monthly partitions."""
+    cursor.execute(
+        """
+        SELECT child.relname FROM pg_inherits i
+        JOIN pg_class parent ON parent.oid = i.inhparent
+        JOIN pg_class child ON child.oid = i.inhrelid
+        WHERE parent.relname = %s
+        """,
+        [table],
+    )
+    pattern = re.compile(re.escape(table) + PARTITION_NAME_RE)
+    partitions = {}
+    for (name,) in cursor.fetchall():
+        match = pattern.match(name)
+        if match:
+            partitions[date(int(match.group(1)), int(match.group(2)), 1)] = name
+    return partitions
+
+
+def create_month_partition(cursor, quote_name, table, month):
+    """Create the month's partition if it doesn't exist yet."""
+    start, end = month_bounds(month)
+    cursor.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {quote_name(partition_name(table, month))}
+        PARTITION OF {quote_name(table)}
+        FOR VALUES FROM (%s) TO (%s)
+        """,
+        [start, end],
+    )
+
+
+def default_partition_name(table):
+    return f"{table}_default"
+
+
+def create_default_partition(cursor, quote_name, table):
+    cursor.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {quote_name(default_partition_name(table))}
+        PARTITION OF {quote_name(table)} DEFAULT
+        """
+    )
+
+
+def split_default_partition(cursor, quote_name, table, column, month):
+    """
+    Create the month's partition, first moving the month's rows (by the
+    partition column) out of the default partition into it. Returns the
+    number of rows moved. Run it in a transaction: inserts routed to the
+    default partition wait until it commits.
+    """
+    default = default_partition_name(table)
+    cursor.execute("SELECT to_regclass(%s)", [default])
+    if cursor.fetchone()[0] is None:
+        create_month_partition(cursor, quote_name, table, month)
+        return 0
+
+    name = partition_name(table, month)
+    start, end = month_bounds(month)
+    cursor.execute(f"LOCK TABLE {quote_name(default)} IN ACCESS EXCLUSIVE MODE")
+    cursor.execute(
+        f"""
+        CREATE TABLE {quote_name(name)}
+        (LIKE {quote_name(table)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)
+        """
+    )
+    cursor.execute(
+        f"""
+        WITH moved AS (
+            DELETE FROM {quote_name(default)}
+            WHERE {quote_name(column)} >= %s AND {quote_name(column)} < %s
+            RETURNING *
+        )
+        INSERT INTO {quote_name(name)} SELECT * FROM moved
+        """,
+        [start, end],
+    )
+    moved = cursor.rowcount
+    cursor.execute(
+        f"""
+        ALTER TABLE {quote_name(table)} ATTACH PARTITION {quote_name(name)}
+        FOR VALUES FROM (%s) TO (%s)
+        """,
+        [start, end],
+    )
+    return moved
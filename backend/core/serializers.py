@@ -2,6 +2,7 @@ from rest_framework import serializers
 from drf_spectacular.utils import extend_schema_field
 
 from rest_framework import serializers
+from .fields import ImageDerivativeField
 from .models import User, Store, Region
 
 
@@ -22,6 +23,7 @@ class RegionSerializer(serializers.ModelSerializer):
 class UserSerializer(serializers.ModelSerializer):
     preferred_stores = StoreSerializer(many=True, read_only=True)
     preferred_region = RegionSerializer(read_only=True)
+    profile_picture_thumbnail = ImageDerivativeField('thumb', source='profile_picture')
 
     class Meta:
         model = User
@@ -31,6 +33,7 @@ class UserSerializer(serializers.ModelSerializer):
             'last_name',
             'phone_number',
             'profile_picture',
+            'profile_picture_thumbnail',
             'preferred_stores',
             'preferred_region',
             'email_notifications',
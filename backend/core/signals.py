@@ -2,6 +2,14 @@ from django_rest_passwordreset.signals import reset_password_token_created
 from django.core.mail import EmailMultiAlternatives
 from django.template.loader import render_to_string
 from django.dispatch import receiver
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from core.auth_cache import bump_auth_version, invalidate_user
+from core.images import queue_derivatives
+from core.storage import acquire_blob, release_blob
+from core.models import PriceListing, Product, Region, Store, User
+
+SEARCH_KEY_BATCH_SIZE = 1000
 
 @receiver(reset_password_token_created)
 def password_reset_token_created(sender, instance, reset_password_token, **kwargs):
@@ -24,3 +32,102 @@ def password_reset_token_created(sender, instance, reset_password_token, **kwarg
     )
     email.attach_alternative(email_body, "text/html")
     email.send()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
+
+
+def bump_on_membership_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Role, group and permission changes bump the affected users."""
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        user_ids = [instance.pk]
+    elif action == 'pre_clear':
+        user_ids = list(sender.objects.filter(
+            **{instance._meta.model_name: instance}
+        ).values_list('user_id', flat=True))
+    else:
+        user_ids = list(pk_set)
+    if user_ids:
+        bump_auth_version(user_ids)
+
+
+for through in (User.roles.through, User.groups.through, User.user_permissions.through):
+    m2m_changed.connect(bump_on_membership_change, sender=through)
+
+
+@receiver(post_save, sender=Region)
+def rebuild_region_search_keys(sender, instance, created, **kwargs):
+    """A store's search key includes its region name; follow renames."""
+    if created or 'region' not in instance.changed_fields():
+        return
+    stores = Store.objects.filter(region=instance).only('name', 'address', 'region_id')
+    batch = []
+    for store in stores.order_by('pk').iterator(chunk_size=SEARCH_KEY_BATCH_SIZE):
+        store.search_key = store.build_search_key(region_name=instance.region)
+        batch.append(store)
+        if len(batch) >= SEARCH_KEY_BATCH_SIZE:
+            Store.objects.bulk_update(batch, ['search_key'])
+            batch = []
+    Store.objects.bulk_update(batch, ['search_key'])
+
+
+# Image fields rendered into derivatives (see core.images)
+IMAGE_FIELDS = {
+    Product: ['image'],
+    Store: ['image'],
+    PriceListing: ['price_image'],
+    User: ['profile_picture'],
+}
+
+
+def saved_image_changes(sender, instance, update_fields):
+    """
+    Image fields this save wrote a new value to. A field deferred when the
+    instance was loaded has no known previous value and is skipped.
+    """
+    changed = instance.changed_fields()
+    loaded = getattr(instance, '_loaded_values', None)
+    return [
+        field for field in IMAGE_FIELDS[sender]
+        if field in changed
+        and (loaded is None or field in loaded)
+        and (update_fields is None or field in update_fields)
+    ]
+
+
+def queue_image_derivatives(sender, instance, update_fields=None, **kwargs):
+    queue_derivatives([
+        getattr(instance, field).name
+        for field in saved_image_changes(sender, instance, update_fields)
+        if getattr(instance, field)
+    ])
+
+
+def track_media_references(sender, instance, update_fields=None, **kwargs):
+    """Move blob references when an image is set, replaced or cleared."""
+    loaded = getattr(instance, '_loaded_values', None) or {}
+    for field in saved_image_changes(sender, instance, update_fields):
+        previous, current = loaded.get(field), getattr(instance, field).name
+        if previous:
+            release_blob(previous)
+        if current:
+            acquire_blob(current)
+
+
+def release_media_references(sender, instance, **kwargs):
+    # Also runs for queryset deletes and cascades
+    for field in IMAGE_FIELDS[sender]:
+        name = getattr(instance, field).name
+        if name:
+            release_blob(name)
+
+
+for model in IMAGE_FIELDS:
+    post_save.connect(queue_image_derivatives, sender=model)
+    post_save.connect(track_media_references, sender=model)
+    post_delete.connect(release_media_references, sender=model)
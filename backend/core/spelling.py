@@ -0,0 +1,241 @@
+"""
+"Did you mean" spelling correction over the catalog vocabulary.
+
+Uses a symmetric-delete index (as in SymSpell): every vocabulary word is
+stored under all strings reachable by deleting up to MAX_EDIT_DISTANCE
+characters, so a lookup only generates the deletes of the query term and
+checks a handful of candidates.
+
+The index lives in process memory. A background thread per process
+builds it on first use and swaps in a rebuilt one when it is older than
+SPELLING_INDEX_MAX_AGE or when an import bumps the version stored in the
+database, checked every SPELLING_INDEX_CHECK_INTERVAL seconds; requests
+only read the current index and never build it. Until the first build
+finishes no corrections are offered, and other processes pick up an
+import within one check interval.
+"""
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.db import close_old_connections, connection
+from django.db.models import F
+
+from core.normalize import normalize_tokens, query_terms
+
+logger = logging.getLogger(__name__)
+
+MAX_EDIT_DISTANCE = 2
+PREFIX_LENGTH = 7
+MIN_WORD_LENGTH = 3
+SPELLING_INDEX_MAX_AGE = 60 * 60
+SPELLING_INDEX_CHECK_INTERVAL = 60
+SPELLING_WATERMARK = 'spelling-index'
+
+
+def edit_distance(source, target, max_distance):
+    """
+    Optimal string alignment distance between source and target, or
+    max_distance + 1 as soon as it is known to exceed max_distance.
+    """
+    if abs(len(source) - len(target)) > max_distance:
+        return max_distance + 1
+
+    previous_previous = None
+    previous = list(range(len(target) + 1))
+    for i in range(1, len(source) + 1):
+        current = [i] + [0] * len(target)
+        for j in range(1, len(target) + 1):
+            cost = 0 if source[i - 1] == target[j - 1] else 1
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + cost,
+            )
+            if (
+                previous_previous is not None and i > 1 and j > 1
+                and source[i - 1] == target[j - 2]
+                and source[i - 2] == target[j - 1]
+            ):
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        # Later rows only build on this row and the one before it
+        if min(current) > max_distance and min(previous) > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return previous[-1]
+
+
+def deletes(word, max_distance):
+    """All strings obtained by deleting up to max_distance characters."""
+    results = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {
+            candidate[:i] + candidate[i + 1:]
+            for candidate in frontier
+            for i in range(len(candidate))
+        }
+        results |= frontier
+    return results
+
+
+def is_correctable(token):
+    return len(token) >= MIN_WORD_LENGTH and token.isalpha()
+
+
+class SpellingIndex:
+    """Symmetric-delete index over a word frequency table."""
+
+    def __init__(self, frequencies, max_distance=MAX_EDIT_DISTANCE,
+                 prefix_length=PREFIX_LENGTH):
+        self.frequencies = dict(frequencies)
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.deletes = defaultdict(list)
+        for word in self.frequencies:
+            for variant in deletes(word[:prefix_length], max_distance):
+                self.deletes[variant].append(word)
+
+    def lookup(self, term):
+        """Return the closest, most frequent vocabulary word for term."""
+        if term in self.frequencies or not is_correctable(term):
+            return term
+
+        best, best_rank = None, None
+        seen = set()
+        for variant in deletes(term[:self.prefix_length], self.max_distance):
+            for word in self.deletes.get(variant, ()):
+                if word in seen:
+                    continue
+                seen.add(word)
+                distance = edit_distance(term, word, self.max_distance)
+                if distance > self.max_distance:
+                    continue
+                rank = (distance, -self.frequencies[word], word)
+                if best_rank is None or rank < best_rank:
+                    best, best_rank = word, rank
+        return best or term
+
+    def correct(self, query):
+        """Corrected form of query, or None when nothing would change."""
+        terms = query_terms(query)
+        corrected = [self.lookup(term) for term in terms]
+        if corrected == terms:
+            return None
+        return " ".join(corrected)
+
+
+def build_vocabulary():
+    """Word frequencies from product names/brands and store names/addresses."""
+    from core.models import Product, Store
+
+    frequencies = Counter()
+    sources = [
+        Product.objects.values_list('name', 'brand'),
+        Store.objects.values_list('name', 'address'),
+    ]
+    for rows in sources:
+        for row in rows.iterator(chunk_size=2000):
+            for value in row:
+                frequencies.update(
+                    token for token in normalize_tokens(value)
+                    if is_correctable(token)
+                )
+    return frequencies
+
+
+def current_version():
+    """Version bumped by invalidate_spelling_index, shared by all processes."""
+    from core.models import JobWatermark
+
+    return JobWatermark.objects.filter(
+        name=SPELLING_WATERMARK
+    ).values_list('position', flat=True).first() or 0
+
+
+class SpellingIndexRefresher:
+    """Holds a process's index and rebuilds it off the request path."""
+
+    def __init__(self, max_age, check_interval):
+        self.max_age = max_age
+        self.check_interval = check_interval
+        self.index = None
+        self.version = None
+        self.built_at = 0.0
+        self._refresh_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def refresh(self):
+        """Rebuild and swap in the index if it is missing, stale or expired."""
+        with self._refresh_lock:
+            version = current_version()
+            expired = time.monotonic() - self.built_at > self.max_age
+            if self.index is not None and version == self.version and not expired:
+                return False
+            index = SpellingIndex(build_vocabulary())
+            # Readers see either the old or the new index, never a partial one
+            self.index, self.version = index, version
+            self.built_at = time.monotonic()
+            return True
+
+    def start(self):
+        """Start the background refresh thread, once per process."""
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._run,
+                name='spelling-index-refresh',
+                daemon=True,
+            )
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                close_old_connections()
+                self.refresh()
+            except Exception:
+                logger.exception("Refreshing the spelling index failed")
+            finally:
+                connection.close()
+            time.sleep(self.check_interval)
+
+
+spelling_index = SpellingIndexRefresher(
+    max_age=SPELLING_INDEX_MAX_AGE,
+    check_interval=SPELLING_INDEX_CHECK_INTERVAL,
+)
+
+
+def get_spelling_index():
+    """The process's current index, or None while it is first being built."""
+    spelling_index.start()
+    return spelling_index.index
+
+
+def invalidate_spelling_index():
+    """Ask every process to rebuild its index (e.g. after imports)."""
+    from core.models import JobWatermark
+
+    updated = JobWatermark.objects.filter(name=SPELLING_WATERMARK).update(
+        position=F('position') + 1
+    )
+    if not updated:
+        JobWatermark.objects.get_or_create(
+            name=SPELLING_WATERMARK, defaults={'position': 1}
+        )
+
+
+def suggest_correction(query):
+    """Spelling suggestion for a query that produced no results."""
+    if not query or not query.strip():
+        return None
+    index = get_spelling_index()
+    if index is None:
+        return None
+    return index.correct(query)
@@ -0,0 +1,116 @@
+"""
+Content-addressed media storage.
+
+Uploads under CONTENT_ADDRESSED_PREFIX are named by the SHA-256 of their
+bytes (uploads/price_images/ab/ab12...ef.jpg), so an identical photo is
+stored once and a repeat upload skips the write. Each stored file has a
+MediaBlob row counting the model rows that reference it; the signals in
+core.signals acquire and release references as image fields change or
+rows are deleted, and a file (with its derivatives) is removed only when
+its last reference goes. Other paths, such as derivatives, are stored
+under their given names.
+
+Uploads and deletions of the same file serialize on its MediaBlob row
+lock: an upload holds it (until the uploader's transaction ends) while it
+bumps MediaBlob.uploads and writes the file, and the deletion re-checks
+ref_count and uploads under it, so bytes uploaded again while their last
+reference was going away are kept.
+"""
+import hashlib
+import posixpath
+
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db import transaction
+from django.db.models import F
+
+CONTENT_ADDRESSED_PREFIX = 'uploads/'
+
+
+def content_digest(content):
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage that names uploads by their content hash."""
+
+    def content_name(self, name, digest):
+        directory, basename = posixpath.split(name)
+        extension = posixpath.splitext(basename)[1].lower()
+        return posixpath.join(directory, digest[:2], f'{digest}{extension}')
+
+    def _save(self, name, content):
+        if not name.startswith(CONTENT_ADDRESSED_PREFIX):
+            return super()._save(name, content)
+
+        from core.models import MediaBlob
+
+        digest = content_digest(content)
+        target = self.content_name(name, digest)
+        with transaction.atomic():
+            blob, created = MediaBlob.objects.select_for_update().get_or_create(
+                name=target,
+                defaults={'sha256': digest, 'size': content.size, 'uploads': 1},
+            )
+            if not created:
+                MediaBlob.objects.filter(pk=blob.pk).update(uploads=F('uploads') + 1)
+            if not self.exists(target):
+                saved = super()._save(target, content)
+                if saved != target:
+                    # Another upload of the same bytes won the race
+                    self.delete(saved)
+        return target
+
+
+def acquire_blob(name):
+    """Count a new reference to a stored file."""
+    from core.models import MediaBlob
+
+    if MediaBlob.objects.filter(name=name).update(ref_count=F('ref_count') + 1):
+        return
+    _, created = MediaBlob.objects.get_or_create(
+        name=name, defaults={'ref_count': 1}
+    )
+    if not created:
+        MediaBlob.objects.filter(name=name).update(ref_count=F('ref_count') + 1)
+
+
+def release_blob(name, storage=None):
+    """
+    Drop a reference to a stored file, deleting the file and its
+    derivatives after commit once nothing references it. Files from
+    before content addressing have no MediaBlob and a single owner.
+    """
+    from core.models import MediaBlob
+
+    storage = storage or default_storage
+    uploads = None
+    with transaction.atomic():
+        blob = MediaBlob.objects.select_for_update().filter(name=name).first()
+        if blob is not None and blob.ref_count > 1:
+            MediaBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') - 1)
+            return
+        if blob is not None:
+            MediaBlob.objects.filter(pk=blob.pk).update(ref_count=0)
+            uploads = blob.uploads
+    transaction.on_commit(lambda: delete_unreferenced(name, storage, uploads))
+
+
+def delete_unreferenced(name, storage, uploads=None):
+    """
+    Delete a released file, its derivatives and its MediaBlob unless it was
+    referenced or uploaded again since the release saw `uploads` uploads.
+    """
+    from core.images import delete_derivatives
+    from core.models import MediaBlob
+
+    with transaction.atomic():
+        blob, created = MediaBlob.objects.select_for_update().get_or_create(name=name)
+        if not created and (blob.ref_count > 0 or blob.uploads != uploads):
+            return
+        if storage.exists(name):
+            storage.delete(name)
+        delete_derivatives(storage, name)
+        blob.delete()
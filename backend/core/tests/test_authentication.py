@@ -0,0 +1,108 @@
+"""
+Test the cached user lookup in CustomJWTAuthentication.
+"""
+from django.core.cache import cache, caches
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.auth_cache import AUTH_CACHE
+from core.authentication import CustomJWTAuthentication
+from core.models import PointsAction, User, UserRole
+from game.utils.awards import apply_award
+from game.utils.login import record_login
+
+
+class CachedUserTests(TestCase):
+    """Test cached users are never served after auth changes"""
+
+    def setUp(self):
+        cache.clear()
+        caches[AUTH_CACHE].clear()
+        self.user = User.objects.create_user(
+            email='shopper@example.com',
+            password='testpass123',
+            first_name='Test',
+            last_name='Shopper',
+        )
+        self.token = AccessToken.for_user(self.user)
+        self.auth = CustomJWTAuthentication()
+
+    def resolve(self):
+        return self.auth.get_user(self.token)
+
+    def change(self, **fields):
+        user = User.objects.get(pk=self.user.pk)
+        for field, value in fields.items():
+            setattr(user, field, value)
+        with self.captureOnCommitCallbacks(execute=True):
+            user.save()
+        return user
+
+    def test_repeat_requests_skip_the_user_query(self):
+        self.resolve()
+        with self.assertNumQueries(0):
+            user = self.resolve()
+        self.assertEqual(user.pk, self.user.pk)
+
+    def test_deactivated_user_is_rejected(self):
+        self.resolve()
+        self.change(is_active=False)
+
+        with self.assertRaises(AuthenticationFailed):
+            self.resolve()
+
+    def test_revoked_staff_status_is_seen(self):
+        self.change(is_staff=True)
+        self.assertTrue(self.resolve().is_staff)
+
+        self.change(is_staff=False)
+        self.assertFalse(self.resolve().is_staff)
+
+    def test_auth_changes_bump_auth_version(self):
+        user = User.objects.get(pk=self.user.pk)
+        user.set_password('newpass456')
+        user.save(update_fields=['password'])
+        user.refresh_from_db()
+        self.assertEqual(user.auth_version, 1)
+
+        user.first_name = 'Renamed'
+        user.save()
+        user.refresh_from_db()
+        self.assertEqual(user.auth_version, 1)
+
+    def test_role_change_drops_cached_user(self):
+        self.resolve()
+        role = UserRole.objects.create(role_name='moderator')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.roles.add(role)
+
+        with self.assertNumQueries(1):
+            user = self.resolve()
+        self.assertEqual(user.auth_version, 1)
+
+    def test_counters_updated_without_save_are_not_stale(self):
+        self.resolve()
+        PointsAction.objects.create(activity_type='New Review', point_amount=5)
+        today = timezone.localdate()
+        record_login(self.user, 2, today, timezone.now())
+        apply_award(self.user, 'New Review')
+
+        user = self.resolve()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(user.points, 5)
+            self.assertEqual(user.number_logins, 2)
+            self.assertEqual(user.current_streak, 1)
+
+    def test_concurrent_auth_changes_both_bump_auth_version(self):
+        first = User.objects.get(pk=self.user.pk)
+        second = User.objects.get(pk=self.user.pk)
+        first.is_staff = True
+        first.save()
+        second.is_active = False
+        second.save()
+
+        self.assertEqual(second.auth_version, 2)
+        self.assertEqual(User.objects.get(pk=self.user.pk).auth_version, 2)
@@ -0,0 +1,129 @@
+"""
+Test the bulk write endpoints.
+"""
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache, caches
+from django.db import IntegrityError
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.models import PriceListing, Product, Region, Store, User
+from core.throttling import THROTTLE_CACHE
+
+PRODUCT_BULK_URL = reverse('product:product-bulk')
+STORE_BULK_URL = reverse('store:store-bulk')
+PRICE_BULK_URL = reverse('price:price-bulk')
+
+
+class BulkWriteTests(TestCase):
+    """Test bulk create and update with per-item results"""
+
+    def setUp(self):
+        cache.clear()
+        caches[THROTTLE_CACHE].clear()
+        self.user = User.objects.create_user(
+            email='loader@example.com',
+            password='testpass123',
+            first_name='Data',
+            last_name='Loader',
+            is_staff=True,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_products_are_created_with_per_item_results(self):
+        Product.objects.create(name='Milk', barcode='111')
+        payload = [
+            {'name': 'Bread', 'brand': 'Baker', 'barcode': '222', 'attributes': {'Size': '800g'}},
+            {'name': 'Butter', 'barcode': '111'},
+            {'name': 'Jam', 'barcode': '222'},
+            {'name': 'Tea', 'source': 999},
+            {'brand': 'Nameless'},
+            {'name': 'Eggs'},
+        ]
+        response = self.client.post(PRODUCT_BULK_URL, payload, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        statuses = [result['status'] for result in response.data['results']]
+        self.assertEqual(statuses, ['created', 'invalid', 'invalid', 'invalid', 'invalid', 'created'])
+        self.assertIn('barcode', response.data['results'][1]['errors'])
+        self.assertIn('source', response.data['results'][3]['errors'])
+        self.assertIn('name', response.data['results'][4]['errors'])
+
+        bread = Product.objects.get(pk=response.data['results'][0]['id'])
+        self.assertEqual(bread.attributes, {'size': '800g'})
+        self.assertIn('baker', bread.search_key)
+
+    def test_queries_do_not_grow_with_the_batch(self):
+        payload = [{'name': f'Product {number}', 'barcode': str(number)} for number in range(50)]
+        with self.assertNumQueries(4):
+            # savepoint, barcode check, one insert, release
+            response = self.client.post(PRODUCT_BULK_URL, payload, format='json')
+
+        self.assertEqual(response.data['written'], 50)
+
+    def test_conflict_does_not_leak_constraint_details(self):
+        error = IntegrityError('duplicate key value violates unique constraint "core_product_barcode_key"')
+        with mock.patch.object(Product.objects, 'bulk_create', side_effect=error), \
+                self.assertLogs('core.bulk', 'ERROR'):
+            response = self.client.post(PRODUCT_BULK_URL, [{'name': 'Tea'}], format='json')
+
+        self.assertEqual(response.status_code, 409)
+        self.assertNotIn('constraint', response.data['detail'])
+        self.assertFalse(Product.objects.exists())
+
+    def test_products_are_updated_by_id(self):
+        milk = Product.objects.create(name='Milk', barcode='111')
+        payload = [
+            {'id': milk.id, 'brand': 'Dairy Co'},
+            {'id': 987654, 'brand': 'Missing'},
+            {'brand': 'No id'},
+        ]
+        response = self.client.patch(PRODUCT_BULK_URL, payload, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([result['status'] for result in response.data['results']],
+                         ['updated', 'invalid', 'invalid'])
+        milk.refresh_from_db()
+        self.assertEqual(milk.brand, 'Dairy Co')
+        self.assertIn('dairy', milk.search_key)
+
+    def test_stores_resolve_regions_by_name(self):
+        Region.objects.create(region='Dublin')
+        payload = [
+            {'name': 'Corner Shop', 'lat': '53.3', 'lon': '-6.2', 'region': 'Dublin'},
+            {'name': 'Market', 'lat': '51.9', 'lon': '-8.4', 'region': 'Cork'},
+        ]
+        response = self.client.post(STORE_BULK_URL, payload, format='json')
+
+        self.assertEqual(response.data['written'], 2)
+        market = Store.objects.get(name='Market')
+        self.assertEqual(market.region.region, 'Cork')
+        self.assertIn('cork', market.search_key)
+        self.assertEqual(Region.objects.filter(region='Dublin').count(), 1)
+
+    def test_prices_check_references(self):
+        product = Product.objects.create(name='Milk')
+        store = Store.objects.create(name='Corner Shop', lat=0, lon=0)
+        payload = [
+            {'product': product.id, 'store': store.id, 'price': '1.99'},
+            {'product': product.id, 'store': 999, 'price': '2.49'},
+        ]
+        response = self.client.post(PRICE_BULK_URL, payload, format='json')
+
+        self.assertEqual(response.data['written'], 1)
+        self.assertIn('store', response.data['results'][1]['errors'])
+        listing = PriceListing.objects.get()
+        self.assertEqual(listing.price, Decimal('1.99'))
+        self.assertEqual(listing.created_by, self.user)
+
+    def test_bulk_writes_require_staff(self):
+        self.user.is_staff = False
+        self.user.save()
+
+        response = self.client.post(PRODUCT_BULK_URL, [{'name': 'Milk'}], format='json')
+
+        self.assertEqual(response.status_code, 403)
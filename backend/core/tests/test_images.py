@@ -0,0 +1,57 @@
+"""
+Test the image derivative pipeline.
+"""
+import io
+import tempfile
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from core.images import derivative_name, image_url, process_image_tasks
+from core.models import ImageDerivativeTask, Store
+
+
+def photo(size=(3000, 2000)):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, 'orange').save(buffer, format='JPEG')
+    return SimpleUploadedFile('front.jpg', buffer.getvalue(), content_type='image/jpeg')
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), DOMAIN='')
+class ImageDerivativeTests(TestCase):
+    """Test queuing and rendering derivatives"""
+
+    def setUp(self):
+        self.store = Store.objects.create(name='Corner Shop', lat=0, lon=0)
+
+    def upload(self):
+        self.store.image = photo()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.store.save()
+
+    def test_upload_queues_and_worker_renders(self):
+        self.upload()
+        name = self.store.image.name
+        self.assertTrue(ImageDerivativeTask.objects.filter(name=name).exists())
+        self.assertEqual(image_url(self.store.image, 'thumb'), self.store.image.url)
+
+        self.assertEqual(process_image_tasks(), (1, 3))
+
+        self.assertFalse(ImageDerivativeTask.objects.exists())
+        thumb = derivative_name(name, 'thumb')
+        with default_storage.open(thumb) as rendered:
+            image = Image.open(rendered)
+            self.assertEqual((image.format, max(image.size)), ('WEBP', 200))
+        self.assertEqual(image_url(self.store.image, 'thumb'), default_storage.url(thumb))
+
+    def test_unchanged_image_is_not_queued_again(self):
+        self.upload()
+        ImageDerivativeTask.objects.all().delete()
+
+        self.store.name = 'Corner Shop Two'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.store.save()
+
+        self.assertFalse(ImageDerivativeTask.objects.exists())
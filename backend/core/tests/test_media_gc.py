@@ -0,0 +1,69 @@
+"""
+Test the orphaned media collector.
+"""
+import os
+import tempfile
+from io import StringIO
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase
+
+from core.media_gc import walk_files
+from core.models import Store
+
+
+def write_file(name, content=b'orphan'):
+    path = default_storage.path(name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as handle:
+        handle.write(content)
+
+
+class CollectOrphanedMediaTests(TestCase):
+    """Test orphans are found, reported and removed"""
+
+    def setUp(self):
+        media_root = self.settings(MEDIA_ROOT=tempfile.mkdtemp())
+        media_root.enable()
+        self.addCleanup(media_root.disable)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.store = Store.objects.create(
+                name='Corner Shop', lat=0, lon=0,
+                image=SimpleUploadedFile('front.jpg', b'front', content_type='image/jpeg'),
+            )
+        write_file('uploads/store_images/legacy.jpg', b'old front')
+        write_file('uploads/price_images/ab/abc.jpg', b'tag')
+
+    def run_command(self, **options):
+        out = StringIO()
+        call_command('collect_orphaned_media', min_age=0, stdout=out, **options)
+        return out.getvalue()
+
+    def test_walk_is_in_code_point_order(self):
+        for name in ('uploads/x/a.jpg', 'uploads/x/a/b.jpg', 'uploads/x/ab.jpg'):
+            write_file(name)
+
+        names = list(walk_files(default_storage))
+        self.assertEqual(names, sorted(names))
+
+    def test_report_only_by_default(self):
+        output = self.run_command()
+
+        self.assertIn('Found 2 orphaned files (12 bytes)', output)
+        self.assertTrue(default_storage.exists('uploads/store_images/legacy.jpg'))
+
+    def test_delete_keeps_referenced_files(self):
+        output = self.run_command(delete=True)
+
+        self.assertIn('Deleted 2 of 2 orphaned files, reclaiming 12 bytes', output)
+        self.assertTrue(default_storage.exists(self.store.image.name))
+        self.assertFalse(default_storage.exists('uploads/store_images/legacy.jpg'))
+        self.assertFalse(default_storage.exists('uploads/price_images/ab/abc.jpg'))
+
+    def test_quarantine_moves_files(self):
+        self.run_command(quarantine=True, batch_size=1)
+
+        self.assertFalse(default_storage.exists('uploads/store_images/legacy.jpg'))
+        self.assertTrue(default_storage.exists('quarantine/uploads/store_images/legacy.jpg'))
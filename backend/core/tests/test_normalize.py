@@ -0,0 +1,102 @@
+"""
+Test search text normalization and the search key filter.
+"""
+import unittest
+
+from django.db import connection
+from django.db.models import Q
+from django.test import SimpleTestCase, TestCase
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from core.filters import SearchKeyFilter
+from core.models import Product, Region, Store
+from core.normalize import build_search_key, normalize_tokens, query_terms, split_query
+
+
+class NormalizeTests(SimpleTestCase):
+    """Test tokens, units, prefixes and stopwords"""
+
+    def test_units_are_canonicalized(self):
+        self.assertEqual(normalize_tokens('1 ltr'), ['1l'])
+        self.assertEqual(normalize_tokens('1.0 Litres'), ['1l'])
+        self.assertEqual(normalize_tokens('500grams'), ['500g'])
+        self.assertEqual(normalize_tokens('12 fl oz'), ['12floz'])
+
+    def test_accents_case_and_stopwords(self):
+        self.assertEqual(normalize_tokens('Crème of the Café'), ['creme', 'cafe'])
+        self.assertEqual(query_terms('milk and MILK'), ['milk'])
+        self.assertEqual(query_terms('of the'), [])
+        self.assertEqual(split_query('  rice & the peas '), ['rice', 'peas'])
+
+    def test_search_key_holds_tokens_and_prefixes(self):
+        key = build_search_key('Brown Rice', None, '1 kg')
+
+        self.assertEqual(
+            key, sorted({'br', 'bro', 'brow', 'brown', 'ri', 'ric', 'rice', '1kg', '1k'})
+        )
+        self.assertNotIn('b', key)
+        self.assertEqual(build_search_key(None, ''), [])
+
+
+class SearchKeyFilterTests(TestCase):
+    """Test every term must match one of the search key fields"""
+
+    class ProductView:
+        search_key_fields = ['search_key']
+
+    def filter(self, search):
+        request = Request(APIRequestFactory().get('/', {'search': search}))
+        return SearchKeyFilter().filter_queryset(request, Product.objects.all(), self.ProductView())
+
+    def test_one_containment_test_per_term(self):
+        search_filter = SearchKeyFilter()
+        request = Request(APIRequestFactory().get('/', {'search': 'Brown 1 Ltr'}))
+
+        self.assertEqual(search_filter.get_search_terms(request), ['brown', '1l'])
+        self.assertEqual(
+            search_filter.get_term_condition('brown', ['name_key', 'brand_key']),
+            Q(name_key__contains=['brown']) | Q(brand_key__contains=['brown']),
+        )
+        self.assertEqual(len(self.filter('Brown 1 Ltr').query.where.children), 2)
+
+    def test_stopword_only_search_is_not_filtered(self):
+        self.assertFalse(self.filter('the of').query.where)
+
+    @unittest.skipUnless(connection.vendor == 'postgresql', 'array containment needs Postgres')
+    def test_matches_prefixes_of_every_term(self):
+        Product.objects.create(name='Brown Rice', amount='1kg')
+        Product.objects.create(name='White Rice', amount='1kg')
+
+        self.assertEqual(
+            [product.name for product in self.filter('bro ric')], ['Brown Rice']
+        )
+
+
+class StoreSearchKeyTests(TestCase):
+    """Test keeping Store.search_key in step with its inputs"""
+
+    def setUp(self):
+        self.region = Region.objects.create(region='Dublin')
+        self.store = Store.objects.create(
+            name='Corner Shop', address='Main Street', lat=53.3, lon=-6.2,
+            region=self.region,
+        )
+
+    def test_region_rename_rebuilds_store_keys(self):
+        self.assertIn('dublin', self.store.search_key)
+
+        self.region.region = 'Galway'
+        self.region.save()
+
+        self.store.refresh_from_db()
+        self.assertIn('galway', self.store.search_key)
+        self.assertNotIn('dublin', self.store.search_key)
+
+    def test_unchanged_inputs_skip_region_lookup(self):
+        store = Store.objects.get(pk=self.store.pk)
+        store.phone_number = '555'
+
+        # One query: the UPDATE, no region lookup for the key
+        with self.assertNumQueries(1):
+            store.save()
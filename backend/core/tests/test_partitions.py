@@ -0,0 +1,28 @@
+"""
+Test monthly partition helpers.
+"""
+from datetime import date, datetime, timezone
+
+from django.test import SimpleTestCase
+
+from core import partitions
+
+
+class PartitionHelperTests(SimpleTestCase):
+    """Test partition naming and bounds"""
+
+    def test_add_months_crosses_years(self):
+        self.assertEqual(partitions.add_months(date(2026, 11, 1), 3), date(2027, 2, 1))
+        self.assertEqual(partitions.add_months(date(2026, 1, 1), -1), date(2025, 12, 1))
+
+    def test_month_bounds_cover_the_month(self):
+        start, end = partitions.month_bounds(date(2026, 12, 1))
+
+        self.assertEqual(start, datetime(2026, 12, 1, tzinfo=timezone.utc))
+        self.assertEqual(end, datetime(2027, 1, 1, tzinfo=timezone.utc))
+
+    def test_partition_name(self):
+        self.assertEqual(
+            partitions.partition_name('core_useraction', date(2026, 3, 1)),
+            'core_useraction_p202603',
+        )
@@ -0,0 +1,98 @@
+"""
+Test the symmetric-delete spelling index.
+"""
+import unittest
+from unittest import mock
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.models import Product
+from core.spelling import (
+    SpellingIndex,
+    SpellingIndexRefresher,
+    edit_distance,
+    invalidate_spelling_index,
+)
+
+
+class SpellingIndexTests(SimpleTestCase):
+    """Test spelling correction over a fixed vocabulary."""
+
+    def setUp(self):
+        self.index = SpellingIndex({
+            'nestle': 5,
+            'carnation': 3,
+            'milk': 10,
+            'massy': 4,
+            'mass': 1,
+        })
+
+    def test_edit_distance(self):
+        """Test distances including transpositions and the cutoff."""
+        self.assertEqual(edit_distance('milk', 'milk', 2), 0)
+        self.assertEqual(edit_distance('mlik', 'milk', 2), 1)
+        self.assertEqual(edit_distance('nestel', 'nestle', 2), 1)
+        self.assertEqual(edit_distance('abc', 'xyz', 2), 3)
+
+    def test_known_words_are_not_corrected(self):
+        """Test that a query made of vocabulary words needs no correction."""
+        self.assertIsNone(self.index.correct('Nestle milk'))
+
+    def test_misspelt_words_are_corrected(self):
+        """Test that misspelt brand and product words are corrected."""
+        self.assertEqual(self.index.correct('nesle mlik'), 'nestle milk')
+        self.assertEqual(self.index.correct('carnaton'), 'carnation')
+
+    def test_prefers_closest_then_most_frequent(self):
+        """Test that ties on distance are broken by frequency."""
+        self.assertEqual(self.index.lookup('masy'), 'massy')
+
+    def test_unknown_and_short_terms_are_kept(self):
+        """Test that numbers, short and far-off terms are left alone."""
+        self.assertIsNone(self.index.correct('1 ltr'))
+        self.assertEqual(self.index.lookup('zz'), 'zz')
+        self.assertEqual(self.index.lookup('qwerty'), 'qwerty')
+
+
+class SpellingIndexRefresherTests(TestCase):
+    """Test building and swapping the per-process index."""
+
+    def setUp(self):
+        self.refresher = SpellingIndexRefresher(max_age=3600, check_interval=60)
+        Product.objects.create(name='Carnation Milk')
+
+    def test_rebuilds_only_when_the_version_changes(self):
+        """Test that a refresh is a no-op until an import bumps the version."""
+        self.assertTrue(self.refresher.refresh())
+        first = self.refresher.index
+        self.assertEqual(first.correct('carnaton'), 'carnation')
+
+        self.assertFalse(self.refresher.refresh())
+        self.assertIs(self.refresher.index, first)
+
+        Product.objects.create(name='Nestle Milk')
+        invalidate_spelling_index()
+        invalidate_spelling_index()
+
+        self.assertTrue(self.refresher.refresh())
+        self.assertEqual(self.refresher.version, 2)
+        self.assertEqual(self.refresher.index.correct('nesle'), 'nestle')
+        self.assertEqual(first.correct('nesle'), None)
+
+    @unittest.skipUnless(connection.vendor == 'postgresql', 'array containment needs Postgres')
+    def test_price_search_without_correction_has_no_suggestion_key(self):
+        """Test that did_you_mean is only set when there is a correction."""
+        self.refresher.refresh()
+        client = APIClient()
+        url = reverse('price:price-list')
+
+        with mock.patch('core.spelling.spelling_index', self.refresher), \
+                mock.patch.object(self.refresher, 'start'):
+            missing = client.get(url, {'search': 'zzzzqq'})
+            misspelt = client.get(url, {'search': 'carnaton'})
+
+        self.assertNotIn('did_you_mean', missing.data)
+        self.assertEqual(misspelt.data['did_you_mean'], 'carnation')
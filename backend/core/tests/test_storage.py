@@ -0,0 +1,116 @@
+"""
+Test content-addressed media storage.
+"""
+import os
+import tempfile
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+
+from core.models import MediaBlob, Store
+
+
+def upload(content=b'storefront'):
+    return SimpleUploadedFile('front.JPG', content, content_type='image/jpeg')
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ContentAddressedStorageTests(TestCase):
+    """Test deduplication and reference counting"""
+
+    def create_store(self, name, content=b'storefront'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Store.objects.create(name=name, lat=0, lon=0, image=upload(content))
+
+    def test_identical_uploads_share_one_file(self):
+        first = self.create_store('First')
+        second = self.create_store('Second')
+
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertRegex(first.image.name, r'^uploads/store_images/[0-9a-f]{2}/[0-9a-f]{64}\.jpg$')
+        self.assertEqual(len(os.listdir(os.path.dirname(first.image.path))), 1)
+        self.assertEqual(MediaBlob.objects.get(name=first.image.name).ref_count, 2)
+
+    def test_file_removed_with_last_reference(self):
+        first = self.create_store('First')
+        self.create_store('Second')
+        name = first.image.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(default_storage.exists(name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Store.objects.all().delete()
+        self.assertFalse(default_storage.exists(name))
+        self.assertFalse(MediaBlob.objects.filter(name=name).exists())
+
+    def test_replaced_image_is_released(self):
+        store = self.create_store('First')
+        old_name = store.image.name
+
+        store.image = upload(b'new storefront')
+        with self.captureOnCommitCallbacks(execute=True):
+            store.save()
+
+        self.assertNotEqual(store.image.name, old_name)
+        self.assertFalse(default_storage.exists(old_name))
+        self.assertEqual(MediaBlob.objects.get(name=store.image.name).ref_count, 1)
+
+    def test_deferred_image_loaded_later_is_not_counted_again(self):
+        store = self.create_store('First')
+        name = store.image.name
+
+        store = Store.objects.defer('image').get(pk=store.pk)
+        self.assertEqual(store.image.name, name)
+        store.name = 'Renamed'
+        with self.captureOnCommitCallbacks(execute=True):
+            store.save()
+
+        self.assertEqual(MediaBlob.objects.get(name=name).ref_count, 1)
+
+    def test_image_left_out_of_update_fields_is_not_counted(self):
+        store = self.create_store('First')
+        old_name = store.image.name
+
+        store.image = upload(b'new storefront')
+        store.name = 'Renamed'
+        with self.captureOnCommitCallbacks(execute=True):
+            store.save(update_fields=['name'])
+
+        self.assertEqual(MediaBlob.objects.get(name=old_name).ref_count, 1)
+        self.assertEqual(Store.objects.get(pk=store.pk).image.name, old_name)
+
+    def test_upload_during_release_keeps_the_file(self):
+        store = self.create_store('First')
+        name = store.image.name
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            store.delete()
+        # The same bytes are uploaded before the deletion runs, and the
+        # row referencing them hasn't been saved yet
+        uploaded = default_storage.save('uploads/store_images/front.jpg', upload())
+        for callback in callbacks:
+            callback()
+
+        self.assertEqual(uploaded, name)
+        self.assertTrue(default_storage.exists(name))
+        with self.captureOnCommitCallbacks(execute=True):
+            second = Store.objects.create(name='Second', lat=0, lon=0, image=name)
+        self.assertEqual(MediaBlob.objects.get(name=name).ref_count, 1)
+        self.assertTrue(second.image.storage.exists(name))
+
+    def test_upload_after_release_rewrites_the_file(self):
+        store = self.create_store('First')
+        name = store.image.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            store.delete()
+        self.assertFalse(default_storage.exists(name))
+
+        second = self.create_store('Second')
+
+        self.assertEqual(second.image.name, name)
+        self.assertTrue(default_storage.exists(name))
+        self.assertEqual(MediaBlob.objects.get(name=name).ref_count, 1)
@@ -0,0 +1,120 @@
+"""
+Test the cost-weighted token bucket throttle.
+"""
+from unittest.mock import patch
+
+from django.core.cache import caches
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.models import PriceListing, Product, Store, User
+from core.throttling import THROTTLE_CACHE, TokenBucketThrottle
+from search_suggest.views import SearchSuggestionsView
+
+PRICE_URL = reverse('price:price-list')
+PUBLIC_TOKEN_URL = reverse('public_token')
+
+
+def public_token():
+    token = AccessToken()
+    token['is_public'] = True
+    return str(token)
+
+
+@patch.object(TokenBucketThrottle, 'THROTTLE_RATES', {
+    'search': '10/min',
+    'public_token': '3/min',
+})
+class TokenBucketThrottleTests(TestCase):
+    """Test per-caller budgets and request costs"""
+
+    def setUp(self):
+        caches[THROTTLE_CACHE].clear()
+
+    def test_public_tokens_are_limited_per_ip(self):
+        statuses = [self.client.post(PUBLIC_TOKEN_URL).status_code for _ in range(4)]
+
+        self.assertEqual(statuses, [200, 200, 200, 429])
+        response = self.client.post(PUBLIC_TOKEN_URL, REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(response.status_code, 200)
+
+    def test_spoofed_forwarded_for_is_ignored(self):
+        statuses = [
+            self.client.post(
+                PUBLIC_TOKEN_URL, HTTP_X_FORWARDED_FOR=f'203.0.113.{i}'
+            ).status_code
+            for i in range(4)
+        ]
+
+        self.assertEqual(statuses, [200, 200, 200, 429])
+
+    def test_price_writes_are_not_budgeted(self):
+        staff = User.objects.create_user(
+            email='staff@example.com',
+            password='testpass123',
+            first_name='Staff',
+            last_name='User',
+            is_staff=True,
+        )
+        listing = PriceListing.objects.create(
+            product=Product.objects.create(name='Rice'),
+            store=Store.objects.create(name='Mart', lat=0, lon=0),
+            price='10.00',
+        )
+        client = APIClient()
+        client.force_authenticate(staff)
+        url = reverse('price:price-detail', args=[listing.id])
+        for _ in range(10):
+            client.get(PRICE_URL)
+
+        self.assertEqual(client.get(PRICE_URL).status_code, 429)
+        response = client.patch(url, {'price': '11.00'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_suggestion_cost_is_one_per_lookup(self):
+        view = SearchSuggestionsView()
+        factory = APIRequestFactory()
+
+        costs = [
+            view.get_throttle_cost(Request(factory.get('/', params)))
+            for params in [
+                {},
+                {'query': 'rice'},
+                {'query': 'rice', 'type': 'product'},
+                {'query': 'rice', 'include_stores': 'false'},
+            ]
+        ]
+
+        self.assertEqual(costs, [1, 3, 2, 2])
+
+    def test_expensive_calls_spend_more_tokens(self):
+        class SearchView:
+            throttle_scope = 'search'
+
+            def get_throttle_cost(self, request):
+                return 5 if request.GET.get('search') else 1
+
+        view = SearchView()
+        search = Request(APIRequestFactory().get(PRICE_URL, {'search': 'rice'}))
+        listing = Request(APIRequestFactory().get(PRICE_URL))
+        throttle = TokenBucketThrottle()
+
+        self.assertTrue(throttle.allow_request(search, view))
+        self.assertTrue(throttle.allow_request(listing, view))
+        self.assertFalse(throttle.allow_request(search, view))
+        self.assertGreater(throttle.wait(), 0)
+        for _ in range(4):
+            self.assertTrue(throttle.allow_request(listing, view))
+        self.assertFalse(throttle.allow_request(listing, view))
+
+    def test_buckets_are_keyed_by_public_token(self):
+        first = {'HTTP_AUTHORIZATION': f'Bearer {public_token()}'}
+        second = {'HTTP_AUTHORIZATION': f'Bearer {public_token()}'}
+        for _ in range(10):
+            self.client.get(PRICE_URL, **first)
+
+        self.assertEqual(self.client.get(PRICE_URL, **first).status_code, 429)
+        self.assertEqual(self.client.get(PRICE_URL, **second).status_code, 200)
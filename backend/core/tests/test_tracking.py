@@ -0,0 +1,56 @@
+"""
+Test change tracking on model saves.
+"""
+import tempfile
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from core.models import Product
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), DOMAIN='https://example.com')
+class ProductTrackingTests(TestCase):
+    """Test Product saves need no pre-read"""
+
+    def setUp(self):
+        Product.objects.create(name='Rice', brand='Grain Co')
+        self.product = Product.objects.get(name='Rice')
+
+    def test_plain_edit_is_a_single_update(self):
+        self.product.brand = 'Other Co'
+        with self.assertNumQueries(1):
+            self.product.save()
+
+        self.product.refresh_from_db()
+        self.assertIsNone(self.product.image_url)
+        self.assertIn('other', self.product.search_key)
+
+    def test_new_image_sets_image_url_in_the_same_update(self):
+        self.product.image = SimpleUploadedFile('rice.jpg', b'image', content_type='image/jpeg')
+        with CaptureQueriesContext(connection) as queries:
+            self.product.save()
+
+        # Besides the media reference count, only the product row is written
+        product_queries = [
+            query for query in queries.captured_queries
+            if 'core_product' in query['sql']
+        ]
+        self.assertEqual(len(product_queries), 1)
+        stored = Product.objects.get(pk=self.product.pk)
+        self.assertEqual(stored.image_url, f'https://example.com{stored.image.url}')
+        self.assertTrue(stored.image.name.startswith('uploads/product/'))
+
+        self.product.name = 'Brown Rice'
+        with self.assertNumQueries(1):
+            self.product.save()
+        self.assertEqual(self.product.image_url, stored.image_url)
+
+    def test_untracked_save_leaves_image_url(self):
+        self.product.image = SimpleUploadedFile('rice.jpg', b'image', content_type='image/jpeg')
+        self.product.save(track_changes=False)
+
+        self.product.refresh_from_db()
+        self.assertIsNone(self.product.image_url)
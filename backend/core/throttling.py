@@ -0,0 +1,89 @@
+"""
+Cost-weighted token bucket throttle for the public search endpoints.
+
+A view opts in with `throttle_scope`, whose rate ('120/min') comes from
+DEFAULT_THROTTLE_RATES, and may define `get_throttle_cost(request)` so
+expensive calls spend more tokens than cheap ones. Callers are keyed by
+user, by the jti of a public token, or by IP address (REMOTE_ADDR, or the
+X-Forwarded-For entry added by the outermost of NUM_PROXIES trusted
+proxies).
+
+The bucket is kept as two per-window counters in the 'throttle' cache
+(a sliding window: the previous window's spend drains linearly as the
+current one fills), so each request is one atomic incr plus a get and
+works the same on LocMem, memcached or Redis.
+"""
+import time
+
+from django.core.cache import caches
+from rest_framework.throttling import ScopedRateThrottle
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+THROTTLE_CACHE = 'throttle'
+
+
+class TokenBucketThrottle(ScopedRateThrottle):
+    cache_format = 'throttle:%(scope)s:%(ident)s'
+
+    def __init__(self):
+        self.cache = caches[THROTTLE_CACHE]
+        self.wait_seconds = None
+
+    def get_cost(self, request, view):
+        get_throttle_cost = getattr(view, 'get_throttle_cost', None)
+        cost = get_throttle_cost(request) if get_throttle_cost else 1
+        return max(1, min(cost, self.num_requests))
+
+    def get_cache_key(self, request, view):
+        token = request.auth
+        if request.user and request.user.is_authenticated:
+            ident = f'user:{request.user.pk}'
+        elif token is not None and hasattr(token, 'get') and token.get('is_public'):
+            ident = f'public:{token.get(jwt_settings.JTI_CLAIM)}'
+        else:
+            ident = f'ip:{self.get_ident(request)}'
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+    def spend(self, key, window, cost):
+        current = f'{key}:{window}'
+        self.cache.add(current, 0, self.duration * 2)
+        try:
+            return self.cache.incr(current, cost)
+        except ValueError:
+            # Expired between add and incr
+            self.cache.set(current, cost, self.duration * 2)
+            return cost
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, self.scope_attr, None)
+        if not self.scope:
+            return True
+
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        if self.rate is None:
+            return True
+
+        key = self.get_cache_key(request, view)
+        cost = self.get_cost(request, view)
+        now = time.time()
+        window, into = divmod(now, self.duration)
+        window = int(window)
+        remaining = 1 - into / self.duration
+
+        spent = self.spend(key, window, cost)
+        previous = self.cache.get(f'{key}:{window - 1}', 0)
+        excess = previous * remaining + spent - self.num_requests
+        if excess <= 0:
+            return True
+
+        self.cache.decr(f'{key}:{window}', cost)
+        if previous and excess <= previous * remaining:
+            # Enough of the previous window drains before this one ends
+            self.wait_seconds = self.duration * excess / previous
+        else:
+            self.wait_seconds = self.duration * remaining
+        return False
+
+    def wait(self):
+        return self.wait_seconds
@@ -4,6 +4,7 @@ from rest_framework.generics import RetrieveUpdateAPIView
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from rest_framework import status
 from drf_spectacular.utils import extend_schema
 from rest_framework_simplejwt.authentication import JWTAuthentication
@@ -11,6 +12,8 @@ from django.contrib.auth.password_validation import validate_password
 from rest_framework.exceptions import ValidationError
 from rest_framework.parsers import JSONParser
 
+from core.throttling import TokenBucketThrottle
+from game.outbox import record_game_event
 from .models import Region, User, Store
 from .serializers import (
     UpdateRegionSerializer,
@@ -28,14 +31,23 @@ from rest_framework.parsers import MultiPartParser
 class CustomTokenObtainPairView(TokenObtainPairView):
     """Custom view for obtaining token pair."""
     def post(self, request, *args, **kwargs):
-        response = super().post(request, *args, **kwargs)
-        return response
+        serializer = self.get_serializer(data=request.data)
+        try:
+            serializer.is_valid(raise_exception=True)
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
+
+        # Login awards are handled by the game worker
+        record_game_event(serializer.user, 'login')
+        return Response(serializer.validated_data, status=status.HTTP_200_OK)
 
 
 class PublicTokenView(APIView):
     """Generate a temporary JWT token for public users."""
     permission_classes = [AllowAny]  # Public access
     serializer_class = PublicTokenSerializer  # Add this line
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = 'public_token'  # keyed by IP for anonymous callers
 
     def post(self, request, *args, **kwargs):
         token = AccessToken()
@@ -51,7 +63,15 @@ class UserDetailView(RetrieveUpdateAPIView):
     serializer_class = UserSerializer
 
     def get_object(self):
-        return self.request.user
+        # request.user may be a cached copy; read and save the current row
+        return User.objects.get(pk=self.request.user.pk)
+
+    def perform_update(self, serializer):
+        serializer.save()
+        record_game_event(self.request.user, 'profile_update', {
+            field: self.request.data.get(field)
+            for field in ['address', 'phone_number', 'preferred_store']
+        })
 
 class RegisterUserView(APIView):
     """Register a new user."""
@@ -116,7 +136,7 @@ class ChangePasswordView(APIView):
         try:
             validate_password(new_password)
             user.set_password(new_password)
-            user.save()
+            user.save(update_fields=['password'])
             return Response(
                 {"message": "Password changed successfully."},
                 status=status.HTTP_200_OK,
@@ -143,7 +163,7 @@ class UpdateRegionView(APIView):
 
         user = request.user
         user.preferred_region = region
-        user.save()
+        user.save(update_fields=['preferred_region'])
 
         return Response({"message": "Region updated successfully."}, status=status.HTTP_200_OK)
 
@@ -162,7 +182,8 @@ class ProfileImageUploadView(APIView):
 
         # Save the file to the user's profile
         user.profile_picture = file
-        user.save()
+        user.save(update_fields=['profile_picture'])
+        record_game_event(user, 'profile_picture_update')
 
         return Response({"message": "Profile picture updated successfully."}, status=status.HTTP_200_OK)
 
@@ -1,40 +1,62 @@
 """
 Game Brain that uses app utils to perform gamification actions.
 Example usage: app/game/utils/user.py for user related gamification actions.
+
+Requests no longer call it directly: they record a GameEvent
+(game/outbox.py) and the process_game_events worker runs the brain once
+per user and action type, with count set to the number of coalesced events.
 """
+from django.utils import timezone
+
 from game.utils import user as user_game_checks
 from game.utils import price as price_game_checks
-from core.models import User
+
+USER_ACTIONS = ['login', 'profile_update', 'profile_picture_update']
+PRICE_ACTIONS = ['price_create']
 
 
 class GameBrain:
-    def __init__(self, user, action_type, data):
+    def __init__(self, user, action_type, data, count=1):
         self.user = user
         self.action_type = action_type
         self.data = data
+        self.count = count
+
+    def check(self):
+        """Run the checks for this action type and return any awards."""
+        if self.action_type in USER_ACTIONS:
+            point_actions = self.user_action_check()
+        elif self.action_type in PRICE_ACTIONS:
+            point_actions = self.price_action_check()
+        else:
+            point_actions = []
+        return [point_action for point_action in point_actions or [] if point_action]
 
     def user_action_check(self):
-        """Checks if the decorated view is a Login Action"""
+        """Checks if the event is a Login Action"""
         point_actions = []
         if self.action_type == 'login':
-            point_actions.append(user_game_checks.login_checks(user=self.user))
-            user_update = User.objects.get(email=self.user.email)
-            user_update.number_logins += 1
-            user_update.save()
+            data = self.data or {}
+            point_actions.extend(user_game_checks.login_checks(
+                user=self.user,
+                count=self.count,
+                days=data.get('event_dates') or [timezone.localdate()],
+                logged_in_at=data.get('last_event_at') or timezone.now(),
+            ))
             return point_actions
-        # Check if the decorated view is Managing the User
+        # Check if the event is Managing the User
         elif self.action_type == 'profile_update':
-            point_actions.append(user_game_checks.profile_update_checks(user=self.user, request=self.data))
+            point_actions.extend(user_game_checks.profile_update_checks(user=self.user, request=self.data))
             return point_actions
-        # Check if the decorated view is Managing the user Upload Profile Image
+        # Check if the event is Managing the user Upload Profile Image
         elif self.action_type == 'profile_picture_update':
-            point_actions.append(user_game_checks.user_image_checks(user=self.user))
+            point_actions.extend(user_game_checks.user_image_checks(user=self.user))
             return point_actions
 
 
     def price_action_check(self):
-        """Checks if the decorated view is a Price Viewset Action"""
+        """Checks if the event is a Price Viewset Action"""
         point_actions = []
         if self.action_type == 'price_create':
-            point_actions.append(price_game_checks.new_price_checks(user=self.user))
-            return point_actions
\ No newline at end of file
+            point_actions.extend(price_game_checks.new_price_checks(user=self.user, count=self.count))
+            return point_actions
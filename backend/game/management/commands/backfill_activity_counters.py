@@ -0,0 +1,78 @@
+"""
+Django command to rebuild activity counters from existing records
+"""
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Value
+
+from core.models import User, UserActivityCounter, UserPoint
+from game.utils import counters
+
+
+def price_listing_counts():
+    return (
+        UserPoint.objects
+        .filter(points_action__activity_type__contains=counters.PRICE_LISTING)
+        .values('user_id')
+        .annotate(events=Count('id'))
+        .order_by()
+        .values_list('user_id', 'events')
+    )
+
+
+def profile_update_counts():
+    return (
+        User.objects.filter(profile_updated=True)
+        .annotate(events=Value(1))
+        .values_list('id', 'events')
+    )
+
+
+def profile_picture_counts():
+    return (
+        User.objects.filter(profile_picture_updated=True)
+        .annotate(events=Value(1))
+        .values_list('id', 'events')
+    )
+
+
+# (user_id, count) rows for each activity family
+COUNT_SOURCES = {
+    counters.PRICE_LISTING: price_listing_counts,
+    counters.PROFILE_UPDATE: profile_update_counts,
+    counters.PROFILE_PICTURE: profile_picture_counts,
+}
+
+
+class Command(BaseCommand):
+    """Django command to backfill UserActivityCounter."""
+
+    help = 'Recompute per-user activity counters from points and profile flags.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of counters written per statement.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        for family in counters.ACTIVITY_FAMILIES:
+            activity_counters = [
+                UserActivityCounter(user_id=user_id, activity=family, count=count)
+                for user_id, count in COUNT_SOURCES[family]().iterator()
+            ]
+            UserActivityCounter.objects.bulk_create(
+                activity_counters,
+                batch_size=options['batch_size'],
+                update_conflicts=True,
+                unique_fields=['user', 'activity'],
+                update_fields=['count'],
+            )
+            self.stdout.write(
+                f"{family}: {len(activity_counters)} counters written."
+            )
+
+        self.stdout.write(self.style.SUCCESS('Activity counters backfilled.'))
@@ -0,0 +1,50 @@
+"""
+Django command to process queued gamification events
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from game.outbox import process_game_events
+
+
+class Command(BaseCommand):
+    """Django command to drain the GameEvent outbox."""
+
+    help = 'Process queued game events in batches, coalescing them per user.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of events claimed per batch.',
+        )
+        parser.add_argument(
+            '--watch',
+            action='store_true',
+            help='Keep polling for new events instead of exiting when idle.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=1.0,
+            help='Seconds to wait between polls in --watch mode.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        total_events = total_awards = 0
+        while True:
+            events, awards = process_game_events(options['batch_size'])
+            total_events += events
+            total_awards += awards
+            if events:
+                continue
+            if not options['watch']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {total_events} events, {total_awards} awards."
+        ))
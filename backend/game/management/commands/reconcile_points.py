@@ -0,0 +1,72 @@
+"""
+Django command to reconcile User.points with the points ledger
+"""
+
+from django.core.management.base import BaseCommand
+
+from game.utils import leaderboard
+from game.utils.reconcile import reconcile_points
+
+
+class Command(BaseCommand):
+    """Django command to report and repair points drift."""
+
+    help = (
+        'Compare User.points with the UserPoint ledger and optionally repair '
+        'the difference. Only users with new ledger rows are checked unless '
+        '--full is given.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repair',
+            action='store_true',
+            help='Write the ledger totals back to User.points.',
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Check every user instead of only those with new ledger rows.',
+        )
+        parser.add_argument(
+            '--show',
+            type=int,
+            default=20,
+            help='Number of largest drifts to list.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        result = reconcile_points(
+            full=options['full'],
+            repair=options['repair'],
+            limit=options['show'],
+        )
+
+        if not result['incremental']:
+            scope = 'all users'
+        elif result['until'] > result['since']:
+            scope = f"ledger rows {result['since'] + 1}-{result['until']}"
+        else:
+            scope = 'no new ledger rows'
+        self.stdout.write(
+            f"Checked {scope}: {result['drifted']} users drifted "
+            f"by {result['total_drift']} points in total."
+        )
+        for user_id, email, points, ledger_points, drift in result['largest']:
+            self.stdout.write(
+                f"  {user_id} {email}: stored {points}, "
+                f"ledger {ledger_points} ({drift:+d})"
+            )
+
+        if result['repaired']:
+            # Global and regional boards rank on User.points
+            leaderboard.rebuild_global_board()
+            leaderboard.rebuild_region_boards()
+            self.stdout.write(self.style.SUCCESS(
+                f"Repaired {result['repaired']} users."
+            ))
+        elif result['drifted']:
+            self.stdout.write(self.style.WARNING('Run with --repair to fix.'))
+        else:
+            self.stdout.write(self.style.SUCCESS('Points are consistent.'))
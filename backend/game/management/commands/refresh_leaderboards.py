@@ -0,0 +1,49 @@
+"""
+Django command to rebuild leaderboards from points totals
+"""
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from game.utils import leaderboard
+
+
+class Command(BaseCommand):
+    """
+    Django command to rebuild leaderboard points tables.
+
+    Awards keep the boards current incrementally; this reconciles them
+    after manual point edits and prunes expired week and month boards.
+    """
+
+    help = 'Rebuild the global, regional, weekly and monthly leaderboards.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--board',
+            choices=['all', 'global', 'region', 'weekly', 'monthly'],
+            default='all',
+            help='Which leaderboards to rebuild.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        board = options['board']
+        today = timezone.localdate()
+
+        rebuilt = []
+        if board in ('all', 'global'):
+            rebuilt.append(leaderboard.rebuild_global_board())
+        if board in ('all', 'region'):
+            rebuilt.extend(leaderboard.rebuild_region_boards())
+        if board in ('all', 'weekly'):
+            rebuilt.append(leaderboard.rebuild_week_board(today))
+        if board in ('all', 'monthly'):
+            rebuilt.append(leaderboard.rebuild_month_board(today))
+        if board in ('all', 'weekly', 'monthly'):
+            pruned = leaderboard.prune_period_boards(today)
+            self.stdout.write(f"Pruned {pruned} expired boards.")
+
+        for rebuilt_board in rebuilt:
+            self.stdout.write(f"{rebuilt_board.key}: {leaderboard.board_size(rebuilt_board)} entries.")
+        self.stdout.write(self.style.SUCCESS('Leaderboards refreshed.'))
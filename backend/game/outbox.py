@@ -0,0 +1,121 @@
+"""
+Outbox for gamification events.
+
+Views record a GameEvent row (a single insert) instead of running the game
+checks inline. process_game_events claims pending events in id order with
+SKIP LOCKED, so several workers can run side by side, coalesces them per
+user and action type, runs GameBrain once per group and stores the awards
+as GameNotification rows for the frontend to poll.
+"""
+import logging
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core.models import GameEvent, GameNotification, User
+from game.game_brain import GameBrain
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+
+
+def record_game_event(user, action_type, data=None):
+    """Queue a gamification event for the worker."""
+    if not user or not user.is_authenticated:
+        return None
+    return GameEvent.objects.create(
+        user=user,
+        action_type=action_type,
+        data=data or {}
+    )
+
+
+def coalesce_events(events):
+    """
+    Group events by user, then by action type in order of first occurrence.
+    Returns {user_id: [(action_type, count, merged_data), ...]}, where
+    merged_data also lists the distinct local dates of the events under
+    'event_dates' and the latest event time under 'last_event_at'.
+    """
+    grouped = {}
+    for event in events:
+        actions = grouped.setdefault(event.user_id, {})
+        count, data = actions.get(event.action_type, (0, {'event_dates': []}))
+        merged = dict(data)
+        merged.update(
+            (key, value) for key, value in (event.data or {}).items() if value
+        )
+        merged['event_dates'] = sorted(
+            set(data['event_dates']) | {timezone.localdate(event.created_at)}
+        )
+        merged['last_event_at'] = max(
+            data.get('last_event_at') or event.created_at, event.created_at
+        )
+        actions[event.action_type] = (count + 1, merged)
+    return {
+        user_id: [
+            (action_type, count, data)
+            for action_type, (count, data) in actions.items()
+        ]
+        for user_id, actions in grouped.items()
+    }
+
+
+def process_user_events(user, actions):
+    """Run the game checks for one user's coalesced events."""
+    notifications = []
+    for action_type, count, data in actions:
+        brain = GameBrain(user=user, action_type=action_type, data=data, count=count)
+        for award in brain.check():
+            notifications.append(GameNotification(
+                user=user,
+                activity_type=award['activity_type'],
+                points=award['new_points'],
+                badge=award['new_badge'],
+            ))
+    GameNotification.objects.bulk_create(notifications)
+    return notifications
+
+
+def process_game_events(batch_size=500):
+    """
+    Process one batch of pending events. Returns (events handled, awards).
+    Events of a user whose checks fail stay queued with their attempt
+    count raised, and are skipped after MAX_ATTEMPTS.
+    """
+    with transaction.atomic():
+        events = list(
+            GameEvent.objects
+            .select_for_update(skip_locked=True)
+            .filter(attempts__lt=MAX_ATTEMPTS)
+            .order_by('id')[:batch_size]
+        )
+        if not events:
+            return 0, 0
+
+        event_ids = {}
+        for event in events:
+            event_ids.setdefault(event.user_id, []).append(event.id)
+        users = User.objects.in_bulk(list(event_ids))
+
+        done, failed, awarded = [], [], 0
+        for user_id, actions in coalesce_events(events).items():
+            user_event_ids = event_ids[user_id]
+            try:
+                with transaction.atomic():
+                    awarded += len(process_user_events(users[user_id], actions))
+            except Exception as error:
+                logger.exception("Game events failed for user %s", user_id)
+                failed.append((user_event_ids, repr(error)))
+            else:
+                done.extend(user_event_ids)
+
+        GameEvent.objects.filter(id__in=done).delete()
+        for event_ids, error in failed:
+            GameEvent.objects.filter(id__in=event_ids).update(
+                attempts=F('attempts') + 1,
+                last_error=error,
+            )
+    return len(events), awarded
@@ -0,0 +1,34 @@
+from rest_framework import serializers
+
+
+class LeaderboardEntrySerializer(serializers.Serializer):
+    rank = serializers.IntegerField(read_only=True)
+    user_id = serializers.IntegerField(read_only=True)
+    name = serializers.CharField(read_only=True)
+    points = serializers.IntegerField(read_only=True)
+
+
+class LeaderboardRankSerializer(serializers.Serializer):
+    rank = serializers.IntegerField(read_only=True)
+    points = serializers.IntegerField(read_only=True)
+
+
+class LeaderboardSerializer(serializers.Serializer):
+    board = serializers.CharField(read_only=True)
+    size = serializers.IntegerField(read_only=True)
+    entries = LeaderboardEntrySerializer(many=True)
+    me = LeaderboardRankSerializer(allow_null=True)
+
+
+class GameNotificationSerializer(serializers.Serializer):
+    id = serializers.IntegerField(read_only=True)
+    activity_type = serializers.CharField(read_only=True)
+    points = serializers.IntegerField(read_only=True)
+    badge = serializers.CharField(read_only=True, allow_null=True)
+    created_at = serializers.DateTimeField(read_only=True)
+
+
+class GameNotificationAckSerializer(serializers.Serializer):
+    up_to = serializers.IntegerField(
+        help_text="Mark every notification with an id up to this one as seen."
+    )
@@ -0,0 +1,26 @@
+"""
+Signal handlers keeping the game caches in step with the database
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.models import Badge, PointsAction, User
+from game.utils.awards import invalidate_points_actions
+from game.utils.leaderboard import move_region_entry
+
+
+@receiver([post_save, post_delete], sender=PointsAction)
+@receiver([post_save, post_delete], sender=Badge)
+def points_action_changed(sender, **kwargs):
+    invalidate_points_actions()
+
+
+@receiver(post_save, sender=User)
+def preferred_region_changed(sender, instance, created, update_fields, **kwargs):
+    """Move the user's regional leaderboard entry with their region."""
+    if created:
+        return
+    if update_fields is not None and not {'preferred_region', 'preferred_region_id'} & update_fields:
+        return
+    if 'preferred_region_id' in instance.changed_fields():
+        move_region_entry(instance.pk, instance.preferred_region_id)
@@ -0,0 +1,99 @@
+"""
+Test award application.
+"""
+import threading
+import time
+from unittest import mock
+
+from django.db import connection
+from django.test import TransactionTestCase
+
+from core.models import Badge, PointsAction, User, UserBadge, UserPoint
+from game.utils import awards
+
+
+class ApplyAwardTests(TransactionTestCase):
+    """Test apply_award"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='player@example.com',
+            password='testpass123',
+            first_name='Test',
+            last_name='Player',
+        )
+        self.badge = Badge.objects.create(
+            name='Contributor',
+            description='Listed a first price',
+        )
+        PointsAction.objects.create(
+            activity_type='New Price Listing',
+            point_amount=5,
+        )
+        PointsAction.objects.create(
+            activity_type='First Price Listing',
+            point_amount=20,
+            badge=self.badge,
+        )
+
+    def test_apply_award_adds_points_and_badge(self):
+        response = awards.apply_award(self.user, 'First Price Listing')
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.points, 20)
+        self.assertEqual(response['new_badge'], 'Contributor')
+        self.assertTrue(
+            UserBadge.objects.filter(user=self.user, badge=self.badge).exists()
+        )
+
+    def test_points_action_cache_invalidated_on_change(self):
+        awards.apply_award(self.user, 'New Price Listing')
+        point_action = PointsAction.objects.get(activity_type='New Price Listing')
+        point_action.point_amount = 7
+        point_action.save()
+
+        response = awards.apply_award(self.user, 'New Price Listing')
+
+        self.assertEqual(response['new_points'], 7)
+
+    def test_points_action_cache_expires_without_version_bump(self):
+        awards.apply_award(self.user, 'New Price Listing')
+        # A queryset update skips the signal, like an edit whose version
+        # bump landed in another process's cache
+        PointsAction.objects.filter(
+            activity_type='New Price Listing'
+        ).update(point_amount=7)
+
+        response = awards.apply_award(self.user, 'New Price Listing')
+        self.assertEqual(response['new_points'], 5)
+
+        later = time.monotonic() + awards.POINTS_ACTIONS_TIMEOUT
+        with mock.patch('game.utils.awards.time.monotonic', return_value=later):
+            response = awards.apply_award(self.user, 'New Price Listing')
+
+        self.assertEqual(response['new_points'], 7)
+
+    def test_concurrent_awards_keep_every_point(self):
+        threads_count, awards_per_thread = 8, 10
+        errors = []
+
+        def worker():
+            try:
+                for _ in range(awards_per_thread):
+                    awards.apply_award(self.user, 'New Price Listing')
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(threads_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        total = threads_count * awards_per_thread
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.points, total * 5)
+        self.assertEqual(UserPoint.objects.filter(user=self.user).count(), total)
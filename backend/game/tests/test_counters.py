@@ -0,0 +1,147 @@
+"""
+Test activity counters and their backfill.
+"""
+from importlib import import_module
+from io import StringIO
+
+from django.apps import apps
+from django.core.management import call_command
+from django.test import TestCase
+
+from core.models import (
+    MilestoneRule,
+    PointsAction,
+    User,
+    UserActivityCounter,
+    UserPoint,
+)
+from game.utils import counters
+from game.utils.rules import evaluate_rules
+
+
+seed_migration = import_module('core.migrations.0034_seed_activity_counters')
+
+
+def create_user(email='player@example.com'):
+    return User.objects.create_user(
+        email=email,
+        password='testpass123',
+        first_name='Test',
+        last_name='Player',
+    )
+
+
+class ActivityCounterTests(TestCase):
+    """Test increment_activity and the milestones it drives"""
+
+    def setUp(self):
+        self.user = create_user()
+        for threshold, activity_type in [
+            (1, 'First Price Listing'),
+            (10, '10th Price Listing'),
+            (50, '50th Price Listing'),
+            (None, 'New Price Listing'),
+        ]:
+            MilestoneRule.objects.create(
+                activity=counters.PRICE_LISTING,
+                threshold=threshold,
+                points_action=PointsAction.objects.create(
+                    activity_type=activity_type,
+                    point_amount=1,
+                ),
+            )
+
+    def test_increment_returns_running_count(self):
+        self.assertEqual(
+            counters.increment_activity(self.user, counters.PRICE_LISTING), 1
+        )
+        self.assertEqual(
+            counters.increment_activity(self.user, counters.PRICE_LISTING, 4), 5
+        )
+        self.assertEqual(
+            counters.get_activity_count(self.user, counters.PRICE_LISTING), 5
+        )
+        self.assertEqual(
+            counters.get_activity_count(self.user, counters.PROFILE_UPDATE), 0
+        )
+
+    def test_milestones_fire_at_thresholds(self):
+        milestones = {}
+        for event_number in range(1, 51):
+            for response in evaluate_rules(self.user, counters.PRICE_LISTING):
+                if response['activity_type'] != 'New Price Listing':
+                    milestones[event_number] = response['activity_type']
+
+        self.assertEqual(milestones, {
+            1: 'First Price Listing',
+            10: '10th Price Listing',
+            50: '50th Price Listing',
+        })
+        self.assertEqual(
+            counters.get_activity_count(self.user, counters.PRICE_LISTING), 50
+        )
+
+    def test_backfill_reproduces_ledger_counts(self):
+        other = create_user('other@example.com')
+        for _ in range(12):
+            evaluate_rules(self.user, counters.PRICE_LISTING)
+        for _ in range(3):
+            evaluate_rules(other, counters.PRICE_LISTING)
+        other.profile_updated = True
+        other.save(update_fields=['profile_updated'])
+        expected = {
+            (user_id, activity): count
+            for user_id, activity, count in UserActivityCounter.objects
+            .values_list('user_id', 'activity', 'count')
+        }
+        expected[(other.pk, counters.PROFILE_UPDATE)] = 1
+        UserActivityCounter.objects.all().delete()
+        # A stale counter is overwritten, not added to
+        UserActivityCounter.objects.create(
+            user=self.user, activity=counters.PRICE_LISTING, count=99
+        )
+
+        call_command('backfill_activity_counters', stdout=StringIO())
+
+        backfilled = {
+            (user_id, activity): count
+            for user_id, activity, count in UserActivityCounter.objects
+            .values_list('user_id', 'activity', 'count')
+        }
+        self.assertEqual(backfilled, expected)
+        self.assertEqual(expected[(self.user.pk, counters.PRICE_LISTING)], 12)
+        self.assertEqual(
+            UserPoint.objects.filter(user=self.user).count(), 12
+        )
+
+    def test_migration_seeds_counters_without_overwriting(self):
+        other = create_user('other@example.com')
+        for _ in range(3):
+            evaluate_rules(self.user, counters.PRICE_LISTING)
+        User.objects.filter(pk=other.pk).update(
+            profile_updated=True, profile_picture_updated=True
+        )
+        UserActivityCounter.objects.filter(user=other).delete()
+        UserActivityCounter.objects.create(user=other, activity='Login', count=4)
+        # A live counter is left alone
+        UserActivityCounter.objects.filter(user=self.user).update(count=7)
+
+        seed_migration.seed_activity_counters(apps, None)
+
+        self.assertEqual(
+            set(UserActivityCounter.objects.values_list('user_id', 'activity', 'count')),
+            {
+                (self.user.pk, counters.PRICE_LISTING, 7),
+                (other.pk, counters.PROFILE_UPDATE, 1),
+                (other.pk, counters.PROFILE_PICTURE, 1),
+            },
+        )
+        # Seeded users aren't awarded the profile milestone again
+        MilestoneRule.objects.create(
+            activity=counters.PROFILE_UPDATE,
+            threshold=1,
+            points_action=PointsAction.objects.create(
+                activity_type='Update Profile Info', point_amount=1
+            ),
+        )
+        self.assertEqual(evaluate_rules(other, counters.PROFILE_UPDATE), [])
@@ -0,0 +1,170 @@
+"""
+Test incremental leaderboard maintenance.
+"""
+import random
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.models import Leaderboard, LeaderboardEntry, Region, User
+from game.utils import leaderboard
+
+LEADERBOARD_URL = reverse('leaderboard')
+
+
+class LeaderboardTests(TestCase):
+    """Test leaderboard point updates and derived ranks"""
+
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(
+                email=f'player{i}@example.com',
+                password='testpass123',
+                first_name='Player',
+                last_name=str(i),
+            )
+            for i in range(12)
+        ]
+
+    def ranks(self, key):
+        board = Leaderboard.objects.get(key=key)
+        return {
+            entry.user_id: entry.rank
+            for entry in leaderboard.top_entries(board, len(self.users))
+        }
+
+    def points(self, key):
+        board = Leaderboard.objects.get(key=key)
+        return dict(board.entries.values_list('user_id', 'points'))
+
+    def buckets(self, key):
+        board = Leaderboard.objects.get(key=key)
+        return dict(board.buckets.values_list('points', 'count'))
+
+    def test_ties_share_a_competition_rank(self):
+        now = timezone.now()
+        for user, amount in zip(self.users[:4], [10, 20, 20, 5]):
+            leaderboard.record_award(user, amount, now)
+
+        ranks = self.ranks(leaderboard.GLOBAL_BOARD)
+        self.assertEqual(
+            [ranks[user.id] for user in self.users[:4]],
+            [3, 1, 1, 4],
+        )
+
+    def test_incremental_ranks_match_rebuild(self):
+        rng = random.Random(32)
+        now = timezone.now()
+        totals = {}
+        for _ in range(200):
+            user = rng.choice(self.users)
+            amount = rng.choice([1, 5, 10, 20, 50])
+            leaderboard.record_award(user, amount, now)
+            totals[user.id] = totals.get(user.id, 0) + amount
+
+        incremental = self.points(leaderboard.GLOBAL_BOARD)
+        ranks = self.ranks(leaderboard.GLOBAL_BOARD)
+        buckets = self.buckets(leaderboard.GLOBAL_BOARD)
+        leaderboard.rebuild_board(leaderboard.GLOBAL_BOARD, totals.items())
+
+        self.assertEqual(incremental, totals)
+        self.assertEqual(incremental, self.points(leaderboard.GLOBAL_BOARD))
+        self.assertEqual(ranks, self.ranks(leaderboard.GLOBAL_BOARD))
+        self.assertEqual(buckets, self.buckets(leaderboard.GLOBAL_BOARD))
+        board = Leaderboard.objects.get(key=leaderboard.GLOBAL_BOARD)
+        for user_id, points in totals.items():
+            rank, size = leaderboard.rank_and_size(board, points)
+            self.assertEqual(rank, ranks[user_id])
+            self.assertEqual(size, len(totals))
+
+    def test_award_does_not_lock_the_board(self):
+        now = timezone.now()
+        leaderboard.record_award(self.users[0], 10, now)
+
+        with CaptureQueriesContext(connection) as queries:
+            leaderboard.record_award(self.users[1], 10, now)
+
+        board_table = Leaderboard._meta.db_table
+        for query in queries.captured_queries:
+            self.assertNotIn('FOR UPDATE', query['sql'])
+            self.assertFalse(query['sql'].startswith(f'UPDATE "{board_table}"'))
+
+    def test_view_ranks_entries_and_me(self):
+        now = timezone.now()
+        for user, amount in zip(self.users[:4], [10, 20, 20, 5]):
+            leaderboard.record_award(user, amount, now)
+        client = APIClient()
+        client.force_authenticate(self.users[0])
+
+        res = client.get(LEADERBOARD_URL, {'limit': 3})
+
+        self.assertEqual(res.data['size'], 4)
+        self.assertEqual(
+            [(entry['user_id'], entry['rank']) for entry in res.data['entries']],
+            [(self.users[1].id, 1), (self.users[2].id, 1), (self.users[0].id, 3)],
+        )
+        self.assertEqual(res.data['me'], {'rank': 3, 'points': 10})
+
+    def test_view_does_not_count_entries(self):
+        leaderboard.record_award(self.users[0], 10, timezone.now())
+        entries_table = LeaderboardEntry._meta.db_table
+
+        with CaptureQueriesContext(connection) as queries:
+            res = APIClient().get(LEADERBOARD_URL)
+
+        self.assertEqual(res.data['size'], 1)
+        for query in queries.captured_queries:
+            self.assertFalse(
+                'COUNT(' in query['sql'] and entries_table in query['sql'],
+                query['sql'],
+            )
+
+    def test_region_change_moves_the_regional_entry(self):
+        north, south = Region.objects.bulk_create(
+            [Region(region='North'), Region(region='South')]
+        )
+        user = self.users[0]
+        user.preferred_region = north
+        user.save()
+        leaderboard.record_award(user, 10, timezone.now())
+        User.objects.filter(pk=user.pk).update(points=10)
+        user = User.objects.get(pk=user.pk)
+
+        user.preferred_region = south
+        user.save(update_fields=['preferred_region'])
+
+        self.assertEqual(self.points(leaderboard.region_board(north.id)), {})
+        self.assertEqual(self.buckets(leaderboard.region_board(north.id)), {})
+        self.assertEqual(
+            self.points(leaderboard.region_board(south.id)), {user.id: 10}
+        )
+        self.assertEqual(self.buckets(leaderboard.region_board(south.id)), {10: 1})
+
+    def test_expired_period_boards_are_pruned(self):
+        today = timezone.localdate()
+        now = timezone.now()
+        old = now - timedelta(days=70)
+        leaderboard.record_award(self.users[0], 10, now)
+        for key in [leaderboard.week_board(old), leaderboard.month_board(old)]:
+            leaderboard.get_board(key)
+
+        self.assertEqual(leaderboard.prune_period_boards(today), 2)
+        self.assertEqual(
+            set(Leaderboard.objects.values_list('key', flat=True)),
+            {
+                leaderboard.GLOBAL_BOARD,
+                leaderboard.week_board(today),
+                leaderboard.month_board(today),
+            },
+        )
+
+        # A late award for an expired period doesn't bring its boards back
+        leaderboard.record_award(self.users[1], 5, old)
+        self.assertFalse(
+            Leaderboard.objects.filter(key=leaderboard.week_board(old)).exists()
+        )
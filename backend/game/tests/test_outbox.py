@@ -0,0 +1,72 @@
+"""
+Test the game event outbox.
+"""
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from core.models import (
+    GameEvent,
+    GameNotification,
+    MilestoneRule,
+    PointsAction,
+    User,
+)
+from game.outbox import process_game_events, record_game_event
+
+
+class GameOutboxTests(TestCase):
+    """Test queuing and processing game events"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='player@example.com',
+            password='testpass123',
+            first_name='Test',
+            last_name='Player',
+        )
+        for activity, threshold, activity_type, points in [
+            ('Login', 1, 'First Login', 10),
+            ('Price Listing', 1, 'First Price Listing', 20),
+            ('Price Listing', None, 'New Price Listing', 5),
+            ('Profile Picture', 1, 'First Profile Picture', 5),
+        ]:
+            MilestoneRule.objects.create(
+                activity=activity,
+                threshold=threshold,
+                points_action=PointsAction.objects.create(
+                    activity_type=activity_type,
+                    point_amount=points,
+                ),
+            )
+
+    def test_events_are_coalesced_per_user(self):
+        for _ in range(3):
+            record_game_event(self.user, 'login')
+        for listing in range(2):
+            record_game_event(self.user, 'price_create', {'price_listing': listing})
+
+        events, awards = process_game_events()
+
+        self.user.refresh_from_db()
+        self.assertEqual(events, 5)
+        self.assertEqual(self.user.number_logins, 3)
+        self.assertEqual(self.user.points, 10 + 20 + 5)
+        self.assertFalse(GameEvent.objects.exists())
+        self.assertEqual(
+            list(GameNotification.objects.values_list('activity_type', flat=True)),
+            ['First Login', 'First Price Listing', 'New Price Listing'],
+        )
+
+    @patch('game.utils.awards.apply_award', side_effect=PointsAction.DoesNotExist)
+    def test_failed_events_stay_queued(self, patched_apply_award):
+        record_game_event(self.user, 'profile_picture_update')
+
+        events, awards = process_game_events()
+
+        event = GameEvent.objects.get()
+        self.assertEqual((events, awards), (1, 0))
+        self.assertEqual(event.attempts, 1)
+        self.assertIn('DoesNotExist', event.last_error)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.profile_picture_updated)
@@ -0,0 +1,119 @@
+"""
+Test points ledger reconciliation.
+"""
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models import F
+from django.test import TestCase
+
+from core.models import JobWatermark, PointsAction, User, UserPoint
+from game.utils.reconcile import RECONCILE_WATERMARK, reconcile_points
+
+
+class ReconcilePointsTests(TestCase):
+    """Test reconcile_points and the reconcile_points command"""
+
+    def setUp(self):
+        self.action = PointsAction.objects.create(
+            activity_type='New Price Listing',
+            point_amount=5,
+        )
+        self.users = [
+            User.objects.create_user(
+                email=f'player{i}@example.com',
+                password='testpass123',
+                first_name='Player',
+                last_name=str(i),
+            )
+            for i in range(3)
+        ]
+
+    def award(self, user, times=1, points=None):
+        """Write ledger rows and (unless points is given) keep User.points in step."""
+        for _ in range(times):
+            UserPoint.objects.create(user=user, points_action=self.action)
+        User.objects.filter(pk=user.pk).update(
+            points=F('points') + 5 * times if points is None else points
+        )
+
+    def stored_points(self):
+        return dict(User.objects.values_list('id', 'points'))
+
+    def watermark(self):
+        return JobWatermark.objects.get(name=RECONCILE_WATERMARK).position
+
+    def last_ledger_id(self):
+        return UserPoint.objects.order_by('-id').values_list('id', flat=True)[0]
+
+    def test_reports_drift_without_repairing(self):
+        self.award(self.users[0], times=2)
+        self.award(self.users[1], times=3, points=7)
+
+        result = reconcile_points()
+
+        self.assertEqual(result['drifted'], 1)
+        self.assertEqual(result['total_drift'], 8)
+        self.assertEqual(
+            result['largest'],
+            [(self.users[1].id, self.users[1].email, 7, 15, 8)],
+        )
+        self.assertEqual(self.stored_points()[self.users[1].id], 7)
+
+    def test_repair_adds_drift_to_current_points(self):
+        self.award(self.users[0], times=2, points=3)
+        self.award(self.users[1], times=1, points=40)
+        out = StringIO()
+
+        call_command('reconcile_points', '--repair', stdout=out)
+
+        points = self.stored_points()
+        self.assertEqual(points[self.users[0].id], 10)
+        self.assertEqual(points[self.users[1].id], 5)
+        self.assertEqual(points[self.users[2].id], 0)
+        self.assertIn('Repaired 2 users.', out.getvalue())
+        self.assertEqual(reconcile_points()['drifted'], 0)
+
+    def test_watermark_held_back_until_repaired(self):
+        self.award(self.users[0])
+        reconcile_points()
+        clean_position = self.watermark()
+        self.assertEqual(clean_position, self.last_ledger_id())
+
+        self.award(self.users[1], times=2, points=1)
+        result = reconcile_points()
+
+        self.assertTrue(result['incremental'])
+        self.assertEqual(result['drifted'], 1)
+        self.assertEqual(self.watermark(), clean_position)
+
+        result = reconcile_points(repair=True)
+
+        self.assertEqual(result['repaired'], 1)
+        self.assertEqual(self.watermark(), self.last_ledger_id())
+
+    def test_incremental_run_only_checks_users_with_new_rows(self):
+        self.award(self.users[0])
+        self.award(self.users[1])
+        reconcile_points()
+        # Drift on a user without new ledger rows is left to --full runs
+        User.objects.filter(pk=self.users[0].pk).update(points=99)
+        self.award(self.users[1], times=1, points=2)
+
+        result = reconcile_points()
+
+        self.assertEqual(result['since'], self.last_ledger_id() - 1)
+        self.assertEqual(
+            [row[0] for row in result['largest']], [self.users[1].id]
+        )
+        self.assertEqual(
+            [row[3] for row in result['largest']], [10]
+        )
+
+        result = reconcile_points(full=True)
+
+        self.assertFalse(result['incremental'])
+        self.assertEqual(
+            sorted(row[0] for row in result['largest']),
+            [self.users[0].id, self.users[1].id],
+        )
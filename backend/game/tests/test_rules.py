@@ -0,0 +1,70 @@
+"""
+Test milestone rule evaluation.
+"""
+from django.test import TestCase
+
+from core.models import MilestoneRule, PointsAction, User
+from game.utils import counters
+from game.utils.rules import evaluate_rules, matching_rules
+
+
+class MilestoneRuleTests(TestCase):
+    """Test evaluate_rules"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='player@example.com',
+            password='testpass123',
+            first_name='Test',
+            last_name='Player',
+        )
+        for threshold, activity_type in [
+            (1, 'First Price Listing'),
+            (3, '3rd Price Listing'),
+            (None, 'New Price Listing'),
+        ]:
+            MilestoneRule.objects.create(
+                activity=counters.PRICE_LISTING,
+                threshold=threshold,
+                points_action=PointsAction.objects.create(
+                    activity_type=activity_type,
+                    point_amount=1,
+                ),
+            )
+
+    def awarded(self, responses):
+        return [response['activity_type'] for response in responses]
+
+    def test_milestones_replace_the_every_event_rule(self):
+        responses = evaluate_rules(self.user, counters.PRICE_LISTING, count=4)
+
+        self.assertEqual(self.awarded(responses), [
+            'First Price Listing',
+            'New Price Listing',
+            '3rd Price Listing',
+            'New Price Listing',
+        ])
+
+    def test_every_rule_fetched_in_one_query(self):
+        with self.assertNumQueries(1):
+            milestones, every_event = matching_rules(
+                counters.PRICE_LISTING, 1, 1000
+            )
+
+        self.assertEqual(sorted(milestones), [1, 3])
+        self.assertEqual(len(every_event), 1)
+
+    def test_new_threshold_needs_only_a_row(self):
+        evaluate_rules(self.user, counters.PRICE_LISTING, count=4)
+        MilestoneRule.objects.create(
+            activity=counters.PRICE_LISTING,
+            threshold=5,
+            points_action=PointsAction.objects.create(
+                activity_type='5th Price Listing',
+                point_amount=1,
+            ),
+        )
+
+        responses = evaluate_rules(self.user, counters.PRICE_LISTING)
+
+        self.assertEqual(self.awarded(responses), ['5th Price Listing'])
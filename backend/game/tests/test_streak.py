@@ -0,0 +1,92 @@
+"""
+Test login streak bookkeeping.
+"""
+from datetime import date, datetime, time, timezone
+
+from django.test import TestCase
+
+from core.models import MilestoneRule, PointsAction, User
+from game.utils import login
+from game.utils.user import login_checks
+
+
+def at(day):
+    return datetime.combine(day, time(15), tzinfo=timezone.utc)
+
+
+class LoginStreakTests(TestCase):
+    """Test streak updates"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='player@example.com',
+            password='testpass123',
+            first_name='Test',
+            last_name='Player',
+        )
+
+    def login_on(self, *days):
+        for day in days:
+            login.record_login(self.user, 1, day, at(day))
+        self.user.refresh_from_db()
+        return self.user.current_streak, self.user.longest_streak
+
+    def test_consecutive_days_extend_the_streak(self):
+        self.assertEqual(
+            self.login_on(date(2026, 3, 1), date(2026, 3, 2), date(2026, 3, 3)),
+            (3, 3),
+        )
+
+    def test_same_day_and_late_days_leave_the_streak(self):
+        self.login_on(date(2026, 3, 1), date(2026, 3, 2))
+
+        self.assertEqual(self.login_on(date(2026, 3, 2), date(2026, 2, 20)), (2, 2))
+        self.assertEqual(self.user.last_active_date, date(2026, 3, 2))
+        self.assertEqual(self.user.last_login, at(date(2026, 3, 2)))
+
+    def test_gap_resets_current_but_keeps_longest(self):
+        self.login_on(date(2026, 3, 1), date(2026, 3, 2), date(2026, 3, 3))
+
+        self.assertEqual(self.login_on(date(2026, 3, 5)), (1, 3))
+
+    def test_streak_milestone_awarded_once(self):
+        days = [date(2026, 3, day) for day in range(1, 5)]
+
+        awards = login_checks(self.user, len(days), days, at(days[-1]))
+        repeat = login_checks(self.user, 1, [date(2026, 3, 5)], at(date(2026, 3, 5)))
+
+        self.user.refresh_from_db()
+        self.assertEqual((self.user.current_streak, self.user.number_logins), (5, 5))
+        self.assertEqual(
+            [award['activity_type'] for award in awards if 'Streak' in award['activity_type']],
+            ['3 Day Login Streak'],
+        )
+        self.assertEqual(
+            [award for award in repeat if 'Streak' in award['activity_type']],
+            [],
+        )
+
+    def test_login_batch_is_one_row_update(self):
+        MilestoneRule.objects.create(
+            activity='Login',
+            threshold=1,
+            points_action=PointsAction.objects.create(
+                activity_type='First Login', point_amount=10
+            ),
+        )
+        first_at = datetime(2026, 3, 1, 15, tzinfo=timezone.utc)
+        logged_in_at = datetime(2026, 3, 2, 15, tzinfo=timezone.utc)
+
+        first = login_checks(self.user, 1, [date(2026, 3, 1)], first_at)
+        with self.assertNumQueries(1):
+            total = login.record_login(self.user, 2, date(2026, 3, 2), logged_in_at)
+        again = login_checks(self.user, 1, [date(2026, 3, 2)], first_at)
+
+        self.user.refresh_from_db()
+        self.assertEqual((total, self.user.number_logins), (3, 4))
+        self.assertEqual(self.user.last_login, logged_in_at)
+        self.assertEqual((self.user.current_streak, self.user.longest_streak), (2, 2))
+        self.assertEqual(
+            [award['activity_type'] for award in first + again],
+            ['First Login'],
+        )
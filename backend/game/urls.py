@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import LeaderboardView, GameNotificationView
+
+urlpatterns = [
+    path('leaderboard/', LeaderboardView.as_view(), name='leaderboard'),
+    path('notifications/', GameNotificationView.as_view(), name='game-notifications'),
+]
@@ -1,7 +1,74 @@
 """
  Award utilities related to gamification
  """
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
 from core.models import UserBadge, UserPoint, PointsAction, User
+from game.utils import leaderboard
+
+POINTS_ACTIONS_VERSION_KEY = 'points-actions-version'
+# Longest a process keeps its copy of the point actions. The version bump
+# reaches every process only when the default cache is shared (Redis,
+# Memcached); with the per-process LocMemCache other processes see an edit
+# after this many seconds.
+POINTS_ACTIONS_TIMEOUT = 60
+
+########################
+# POINTS ACTION CACHE
+########################
+
+_points_actions = {}
+_points_actions_version = None
+_points_actions_expires = 0.0
+_points_actions_lock = threading.Lock()
+
+
+def get_points_action(activity_type):
+    """
+    Return the PointsAction (with its badge) for activity_type from the
+    in-process cache, reloading every action when the shared version moves
+    or POINTS_ACTIONS_TIMEOUT has passed since the last load.
+    """
+    global _points_actions, _points_actions_version, _points_actions_expires
+
+    version = cache.get(POINTS_ACTIONS_VERSION_KEY, 0)
+
+    def is_stale():
+        return (
+            version != _points_actions_version
+            or time.monotonic() >= _points_actions_expires
+        )
+
+    if is_stale():
+        with _points_actions_lock:
+            if is_stale():
+                _points_actions = {
+                    point_action.activity_type: point_action
+                    for point_action in PointsAction.objects.select_related('badge')
+                }
+                _points_actions_version = version
+                _points_actions_expires = time.monotonic() + POINTS_ACTIONS_TIMEOUT
+
+    try:
+        return _points_actions[activity_type]
+    except KeyError:
+        raise PointsAction.DoesNotExist(
+            f"No PointsAction for activity type '{activity_type}'"
+        )
+
+
+def invalidate_points_actions():
+    """Ask every process to reload its point actions on next use."""
+    cache.add(POINTS_ACTIONS_VERSION_KEY, 0, None)
+    try:
+        cache.incr(POINTS_ACTIONS_VERSION_KEY)
+    except ValueError:
+        cache.set(POINTS_ACTIONS_VERSION_KEY, 1, None)
 
 ########################
 # APPLY AWARD
@@ -9,30 +76,33 @@ from core.models import UserBadge, UserPoint, PointsAction, User
 
 
 def apply_award(user, activity_type):
-    # print(f"Inside apply_award for activity_type {activity_type}")
-    point_action = PointsAction.objects.get(activity_type=activity_type)
-    UserPoint.objects.create(
-        user=user,
-        points_action=point_action
-    )
-    if point_action.badge:
-        UserBadge.objects.create(
+    point_action = get_points_action(activity_type)
+
+    with transaction.atomic():
+        user_point = UserPoint.objects.create(
             user=user,
-            badge=point_action.badge
+            points_action=point_action
         )
+        if point_action.badge:
+            UserBadge.objects.create(
+                user=user,
+                badge=point_action.badge
+            )
 
-    # Award the user the points in the
-    # User model and increment number_logins
-    update_user = User.objects.get(email=user.email)
-    update_user.points += point_action.point_amount
-
-    # Save the user
-    update_user.save()
+        # Increment in the database so concurrent awards can't overwrite
+        # each other's points
+        User.objects.filter(pk=user.pk).update(
+            points=F('points') + point_action.point_amount
+        )
+        leaderboard.record_award(
+            user,
+            point_action.point_amount,
+            user_point.timestamp
+        )
 
     response = {
         'activity_type': point_action.activity_type,
         'new_points': point_action.point_amount,
         'new_badge': point_action.badge.name if point_action.badge else None,
     }
-    print(f"Apply Awards Response: {response}")
-    return response if response else None
+    return response
@@ -0,0 +1,46 @@
+"""
+ Per-user activity counters used for milestone checks
+"""
+from django.db import connection
+
+from core.models import UserActivityCounter
+
+# Activity families counted per user and matched by MilestoneRule.activity
+PRICE_LISTING = 'Price Listing'
+LOGIN = 'Login'
+PROFILE_UPDATE = 'Profile Update'
+PROFILE_PICTURE = 'Profile Picture'
+
+# Level families: rules fire when a stored level (not a count) first
+# reaches their threshold
+LOGIN_STREAK = 'Login Streak'
+
+# Families kept in UserActivityCounter; logins are counted by
+# User.number_logins (see game.utils.login)
+ACTIVITY_FAMILIES = [PRICE_LISTING, PROFILE_UPDATE, PROFILE_PICTURE]
+
+
+def increment_activity(user, activity, amount=1):
+    """Atomically add amount to the user's counter and return the new count."""
+    table = UserActivityCounter._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {table} (user_id, activity, count)
+            VALUES (%s, %s, %s)
+            ON CONFLICT (user_id, activity)
+            DO UPDATE SET count = {table}.count + EXCLUDED.count
+            RETURNING count
+            """,
+            [user.pk, activity, amount],
+        )
+        return cursor.fetchone()[0]
+
+
+def get_activity_count(user, activity):
+    """Read the user's counter for an activity family."""
+    count = UserActivityCounter.objects.filter(
+        user=user,
+        activity=activity
+    ).values_list('count', flat=True).first()
+    return count or 0
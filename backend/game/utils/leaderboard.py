@@ -0,0 +1,303 @@
+"""
+ Leaderboard utilities related to gamification
+
+ Every board stores each user's points, plus a histogram of how many
+ entries hold each points value. An award updates the user's entry on
+ each board it counts towards and moves it between two histogram buckets,
+ so concurrent awards only wait on the same user's rows or on users with
+ the same points. Competition ranks (1, 2, 2, 4, ...) and board sizes are
+ sums over the histogram, not counts over the entries.
+
+ Week and month boards stop taking awards once they are older than the
+ previous period, and refresh_leaderboards prunes them.
+"""
+from collections import Counter
+from datetime import datetime, time, timedelta
+
+from django.db import connection, transaction
+from django.db.models import Q, Sum
+from django.utils import timezone
+
+from core.models import (
+    Leaderboard,
+    LeaderboardBucket,
+    LeaderboardEntry,
+    User,
+    UserPoint,
+)
+
+GLOBAL_BOARD = 'global'
+
+
+def region_board(region_id):
+    return f'region:{region_id}'
+
+
+def week_board(day):
+    year, week, _ = day.isocalendar()
+    return f'week:{year}-W{week:02d}'
+
+
+def month_board(day):
+    return f'month:{day:%Y-%m}'
+
+
+def oldest_period_boards(today):
+    """Oldest week and month boards still kept: the previous period's."""
+    last_month = today.replace(day=1) - timedelta(days=1)
+    return week_board(today - timedelta(days=7)), month_board(last_month)
+
+
+def boards_for_award(user, timestamp):
+    """Keys of every board an award at timestamp counts towards."""
+    day = timezone.localdate(timestamp)
+    oldest_week, oldest_month = oldest_period_boards(timezone.localdate())
+    keys = [GLOBAL_BOARD]
+    # Late awards don't recreate pruned boards
+    if week_board(day) >= oldest_week:
+        keys.append(week_board(day))
+    if month_board(day) >= oldest_month:
+        keys.append(month_board(day))
+    if user.preferred_region_id:
+        keys.append(region_board(user.preferred_region_id))
+    return keys
+
+
+def get_board(key):
+    """Fetch the board with this key, creating it if needed."""
+    board, _ = Leaderboard.objects.get_or_create(key=key)
+    return board
+
+
+def lock_board(key):
+    """Fetch (creating if needed) and row-lock the board with this key."""
+    return Leaderboard.objects.select_for_update().get(pk=get_board(key).pk)
+
+
+def top_entries(board, limit):
+    """The board's first limit entries, each with its competition rank."""
+    entries = list(
+        board.entries
+        .select_related('user')
+        .only('points', 'user__id', 'user__first_name', 'user__last_name')
+        .order_by('-points', 'user_id')[:limit]
+    )
+    previous_points, rank = None, 0
+    for position, entry in enumerate(entries, start=1):
+        if entry.points != previous_points:
+            rank, previous_points = position, entry.points
+        entry.rank = rank
+    return entries
+
+
+def rank_and_size(board, points):
+    """Competition rank of an entry with points, and the board's size."""
+    totals = board.buckets.aggregate(
+        above=Sum('count', filter=Q(points__gt=points)),
+        size=Sum('count'),
+    )
+    return (totals['above'] or 0) + 1, totals['size'] or 0
+
+
+def board_size(board):
+    """Number of entries on the board."""
+    return board.buckets.aggregate(size=Sum('count'))['size'] or 0
+
+
+########################
+# Incremental updates
+########################
+
+def _change_bucket(cursor, board_id, points, delta):
+    """Add delta (1 or -1) to the count of entries with points."""
+    table = LeaderboardBucket._meta.db_table
+    if delta > 0:
+        cursor.execute(
+            f"""
+            INSERT INTO {table} (leaderboard_id, points, count)
+            VALUES (%s, %s, %s)
+            ON CONFLICT (leaderboard_id, points)
+            DO UPDATE SET count = {table}.count + EXCLUDED.count
+            """,
+            [board_id, points, delta],
+        )
+        return
+    cursor.execute(
+        f"UPDATE {table} SET count = count - %s"
+        " WHERE leaderboard_id = %s AND points = %s",
+        [-delta, board_id, points],
+    )
+    cursor.execute(
+        f"DELETE FROM {table}"
+        " WHERE leaderboard_id = %s AND points = %s AND count = 0",
+        [board_id, points],
+    )
+
+
+def add_points(key, user_id, amount):
+    """Add amount to a user's entry on one board and return its new points."""
+    board = get_board(key)
+    table = LeaderboardEntry._meta.db_table
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {table} (leaderboard_id, user_id, points)
+            VALUES (%s, %s, 0)
+            ON CONFLICT (leaderboard_id, user_id) DO NOTHING
+            """,
+            [board.pk, user_id],
+        )
+        created = cursor.rowcount == 1
+        cursor.execute(
+            f"UPDATE {table} SET points = points + %s"
+            " WHERE leaderboard_id = %s AND user_id = %s RETURNING points",
+            [amount, board.pk, user_id],
+        )
+        points = cursor.fetchone()[0]
+
+        changes = [(points, 1)]
+        if not created:
+            changes.append((points - amount, -1))
+        # Ascending points order keeps concurrent awards from deadlocking
+        for bucket_points, delta in sorted(changes):
+            _change_bucket(cursor, board.pk, bucket_points, delta)
+    return points
+
+
+def remove_entry(key, user_id):
+    """Delete a user's entry from one board, if there is one."""
+    board = Leaderboard.objects.filter(key=key).first()
+    if board is None:
+        return
+    table = LeaderboardEntry._meta.db_table
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {table}"
+            " WHERE leaderboard_id = %s AND user_id = %s RETURNING points",
+            [board.pk, user_id],
+        )
+        row = cursor.fetchone()
+        if row is not None:
+            _change_bucket(cursor, board.pk, row[0], -1)
+
+
+def record_award(user, amount, timestamp):
+    """Apply an award's points to every board it counts towards."""
+    if not amount:
+        return
+    with transaction.atomic():
+        # A fixed order keeps concurrent awards to one user from deadlocking
+        for key in sorted(boards_for_award(user, timestamp)):
+            add_points(key, user.pk, amount)
+
+
+def move_region_entry(user_id, region_id):
+    """Move a user's regional entry to region_id (or drop it for None)."""
+    with transaction.atomic():
+        keys = Leaderboard.objects.filter(
+            key__startswith='region:', entries__user_id=user_id
+        ).values_list('key', flat=True)
+        for key in sorted(keys):
+            remove_entry(key, user_id)
+        points = User.objects.filter(pk=user_id).values_list(
+            'points', flat=True
+        ).first()
+        if region_id and points:
+            add_points(region_board(region_id), user_id, points)
+
+
+def prune_period_boards(today):
+    """Delete week and month boards older than the previous period."""
+    oldest_week, oldest_month = oldest_period_boards(today)
+    _, deleted = Leaderboard.objects.filter(
+        Q(key__startswith='week:', key__lt=oldest_week)
+        | Q(key__startswith='month:', key__lt=oldest_month)
+    ).delete()
+    return deleted.get(Leaderboard._meta.label, 0)
+
+
+########################
+# Full rebuilds
+########################
+
+def rebuild_board(key, rows):
+    """Replace a board's entries with rows of (user_id, points)."""
+    rows = list(rows)
+    with transaction.atomic():
+        # Awards don't take the board lock; it only serializes rebuilds
+        board = lock_board(key)
+        board.entries.all().delete()
+        board.buckets.all().delete()
+        LeaderboardEntry.objects.bulk_create(
+            [
+                LeaderboardEntry(leaderboard=board, user_id=user_id, points=points)
+                for user_id, points in rows
+            ],
+            batch_size=1000,
+        )
+        LeaderboardBucket.objects.bulk_create(
+            [
+                LeaderboardBucket(leaderboard=board, points=points, count=count)
+                for points, count in Counter(points for _, points in rows).items()
+            ],
+            batch_size=1000,
+        )
+        board.refreshed_at = timezone.now()
+        board.save(update_fields=['refreshed_at'])
+    return board
+
+
+def rebuild_global_board():
+    rows = User.objects.exclude(points=0).values_list('id', 'points')
+    return rebuild_board(GLOBAL_BOARD, rows)
+
+
+def rebuild_region_boards():
+    users = User.objects.exclude(points=0).filter(preferred_region__isnull=False)
+    by_region = {}
+    for user_id, region_id, points in users.values_list(
+        'id', 'preferred_region_id', 'points'
+    ).iterator():
+        by_region.setdefault(region_id, []).append((user_id, points))
+
+    stale = Leaderboard.objects.filter(key__startswith='region:').exclude(
+        key__in=[region_board(region_id) for region_id in by_region]
+    )
+    stale.delete()
+    return [
+        rebuild_board(region_board(region_id), rows)
+        for region_id, rows in by_region.items()
+    ]
+
+
+def period_points(start, end):
+    """(user_id, points) earned from awards in [start, end)."""
+    return (
+        UserPoint.objects
+        .filter(timestamp__gte=start, timestamp__lt=end)
+        .values('user_id')
+        .annotate(total=Sum('points_action__point_amount'))
+        .exclude(total=0)
+        .order_by()
+        .values_list('user_id', 'total')
+    )
+
+
+def _local_midnight(day):
+    return timezone.make_aware(
+        datetime.combine(day, time.min)
+    )
+
+
+def rebuild_week_board(day):
+    start = day - timedelta(days=day.weekday())
+    end = start + timedelta(days=7)
+    rows = period_points(_local_midnight(start), _local_midnight(end))
+    return rebuild_board(week_board(day), rows)
+
+
+def rebuild_month_board(day):
+    start = day.replace(day=1)
+    end = (start + timedelta(days=32)).replace(day=1)
+    rows = period_points(_local_midnight(start), _local_midnight(end))
+    return rebuild_board(month_board(day), rows)
@@ -0,0 +1,66 @@
+"""
+ Login bookkeeping related to gamification
+
+ A batch of logins updates number_logins, last_login and the streak state
+ in one UPDATE ... RETURNING on the user row; number_logins doubles as the
+ Login milestone counter, so a first login is simply number_logins == count.
+"""
+from datetime import timedelta
+
+from django.db import connection
+
+from core.models import User
+
+
+def record_login(user, count, day, logged_in_at):
+    """
+    Add count logins on day, the last at logged_in_at, and copy the stored
+    counters (but not last_login) back onto user. Returns the new
+    number_logins.
+    """
+    table = User._meta.db_table
+    ops = connection.ops
+    streak = """
+        CASE
+            WHEN last_active_date >= %(day)s THEN current_streak
+            WHEN last_active_date = %(previous_day)s THEN current_streak + 1
+            ELSE 1
+        END
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            UPDATE {table} SET
+                number_logins = number_logins + %(count)s,
+                last_login = CASE
+                    WHEN last_login IS NULL OR last_login < %(logged_in_at)s
+                    THEN %(logged_in_at)s ELSE last_login
+                END,
+                current_streak = {streak},
+                longest_streak = CASE
+                    WHEN {streak} > longest_streak THEN {streak}
+                    ELSE longest_streak
+                END,
+                last_active_date = CASE
+                    WHEN last_active_date > %(day)s THEN last_active_date
+                    ELSE %(day)s
+                END
+            WHERE id = %(user_id)s
+            RETURNING number_logins, current_streak, longest_streak,
+                last_active_date
+            """,
+            {
+                'count': count,
+                'logged_in_at': ops.adapt_datetimefield_value(logged_in_at),
+                'day': ops.adapt_datefield_value(day),
+                'previous_day': ops.adapt_datefield_value(day - timedelta(days=1)),
+                'user_id': user.pk,
+            },
+        )
+        row = cursor.fetchone()
+
+    fields = ['number_logins', 'current_streak', 'longest_streak',
+              'last_active_date']
+    for field, value in zip(fields, row):
+        setattr(user, field, User._meta.get_field(field).to_python(value))
+    return user.number_logins
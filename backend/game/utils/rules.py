@@ -0,0 +1,61 @@
+"""
+ Milestone rule evaluation for gamification
+"""
+from django.db import transaction
+from django.db.models import Q
+
+from core.models import MilestoneRule
+import game.utils.awards as awards
+from game.utils import counters
+
+
+def matching_rules(activity, first, last):
+    """
+    Rules for events first..last of an activity family, in one query:
+    ({threshold: [rules]}, [rules applying to every other event]).
+    """
+    rules = MilestoneRule.objects.filter(
+        Q(threshold__isnull=True) | Q(threshold__gte=first, threshold__lte=last),
+        activity=activity,
+        is_active=True,
+    ).select_related('points_action')
+
+    milestones, every_event = {}, []
+    for rule in rules:
+        if rule.threshold is None:
+            every_event.append(rule)
+        else:
+            milestones.setdefault(rule.threshold, []).append(rule)
+    return milestones, every_event
+
+
+def evaluate_range(user, activity, first, last):
+    """Apply the rules hit by events first..last of an activity family."""
+    milestones, every_event = matching_rules(activity, first, last)
+
+    responses = []
+    for event_number in range(first, last + 1):
+        for rule in milestones.get(event_number, every_event):
+            responses.append(
+                awards.apply_award(user, rule.points_action.activity_type)
+            )
+    return responses
+
+
+def evaluate_rules(user, activity, count=1):
+    """Count the user's new events of an activity family and apply the rules they hit."""
+    with transaction.atomic():
+        total = counters.increment_activity(user, activity, count)
+        return evaluate_range(user, activity, total - count + 1, total)
+
+
+def evaluate_level(user, activity, previous_level, level):
+    """Apply the rules whose threshold the user's level newly reached."""
+    if level <= previous_level:
+        return []
+    milestones, _ = matching_rules(activity, previous_level + 1, level)
+    return [
+        awards.apply_award(user, rule.points_action.activity_type)
+        for threshold in sorted(milestones)
+        for rule in milestones[threshold]
+    ]
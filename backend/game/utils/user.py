@@ -1,61 +1,58 @@
 """
  User utilities related to gamification
 """
-from core.models import UserPoint, User
-import game.utils.awards as awards
+from game.utils import counters
+from game.utils import login
+from game.utils import rules
 
 ########################
 # User Game Conditions
 ########################
 
 
-def is_first_login(user):
-    if UserPoint.objects.filter(user=user).exists():
-        return False
-    return True
-
-
-def is_first_profile_update(user, request):
-    user_account = User.objects.get(email=user.email)
-    data = request
-
-    address = data.get('address')
-    phone_number = data.get('phone_number')
-    preferred_store = data.get('preferred_store')
-
-    if user_account.profile_updated is False and (address or phone_number or preferred_store):
-        return True
-    return False
-
-
-def is_first_profile_picture_update(user):
-    user_account = User.objects.get(email=user.email)
-    if user_account.profile_picture_updated is False:
-        return True
-    return False
+def has_profile_details(data):
+    return bool(
+        data.get('address')
+        or data.get('phone_number')
+        or data.get('preferred_store')
+    )
 
 ########################
 # Awards for user game conditions
 ########################
 
 
-def login_checks(user):
-    if is_first_login(user):
-        return awards.apply_award(user, 'First Login')
-    return None
+def login_checks(user, count, days, logged_in_at):
+    """Record a batch of logins and award login and streak milestones."""
+    days = sorted(days)
+    previous_longest = user.longest_streak
+    # Only a batch spanning midnight has earlier days to fold into the
+    # streak first; their logins are counted with the last day's
+    for day in days[:-1]:
+        login.record_login(user, 0, day, logged_in_at)
+    total = login.record_login(user, count, days[-1], logged_in_at)
+
+    awards = rules.evaluate_range(user, counters.LOGIN, total - count + 1, total)
+    awards.extend(rules.evaluate_level(
+        user,
+        counters.LOGIN_STREAK,
+        previous_longest,
+        user.longest_streak,
+    ))
+    return awards
 
 
 def profile_update_checks(user, request):
-    if is_first_profile_update(user, request):
+    if not has_profile_details(request):
+        return []
+    if not user.profile_updated:
         user.profile_updated = True
-        user.save()
-        return awards.apply_award(user, 'Update Profile Info')
-    return None
+        user.save(update_fields=['profile_updated'])
+    return rules.evaluate_rules(user, counters.PROFILE_UPDATE)
 
 
 def user_image_checks(user):
-    if is_first_profile_picture_update(user):
+    if not user.profile_picture_updated:
         user.profile_picture_updated = True
-        user.save()
-        return awards.apply_award(user, 'First Profile Picture')
-    return None
+        user.save(update_fields=['profile_picture_updated'])
+    return rules.evaluate_rules(user, counters.PROFILE_PICTURE)
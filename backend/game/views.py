@@ -0,0 +1,148 @@
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from drf_spectacular.utils import extend_schema, OpenApiParameter
+from core.authentication import CustomJWTAuthentication
+from core.models import GameNotification, Leaderboard, LeaderboardEntry, Region
+from game.utils import leaderboard
+from .serializers import (
+    LeaderboardSerializer,
+    GameNotificationSerializer,
+    GameNotificationAckSerializer,
+)
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 100
+NOTIFICATION_LIMIT = 50
+
+
+@extend_schema(
+    parameters=[
+        OpenApiParameter(
+            name="board",
+            description="Which leaderboard to return.",
+            required=False,
+            type=str,
+            enum=["global", "region", "weekly", "monthly"],
+            default="global",
+        ),
+        OpenApiParameter(
+            name="region",
+            description="Region name for the regional board. Defaults to the user's preferred region.",
+            required=False,
+            type=str,
+        ),
+        OpenApiParameter(
+            name="limit",
+            description=f"Number of top entries to return (max {MAX_LIMIT}).",
+            required=False,
+            type=int,
+            default=DEFAULT_LIMIT,
+        ),
+    ],
+    responses={200: LeaderboardSerializer},
+    tags=["Game"],
+)
+class LeaderboardView(APIView):
+    authentication_classes = [CustomJWTAuthentication]
+    permission_classes = [AllowAny]
+    serializer_class = LeaderboardSerializer
+
+    def get_board_key(self, request, board_type):
+        today = timezone.localdate()
+        if board_type == "global":
+            return leaderboard.GLOBAL_BOARD
+        if board_type == "weekly":
+            return leaderboard.week_board(today)
+        if board_type == "monthly":
+            return leaderboard.month_board(today)
+        if board_type == "region":
+            region_name = request.GET.get("region", "").strip()
+            if region_name:
+                region_id = Region.objects.filter(
+                    region__iexact=region_name
+                ).values_list("id", flat=True).first()
+            elif request.user and request.user.is_authenticated:
+                region_id = request.user.preferred_region_id
+            else:
+                region_id = None
+            return leaderboard.region_board(region_id) if region_id else None
+        return None
+
+    def get_limit(self, request):
+        try:
+            limit = int(request.GET.get("limit", DEFAULT_LIMIT))
+        except ValueError:
+            return DEFAULT_LIMIT
+        return max(1, min(limit, MAX_LIMIT))
+
+    def get(self, request):
+        board_type = request.GET.get("board", "global")
+        if board_type not in ["global", "region", "weekly", "monthly"]:
+            return Response(
+                {"error": "board must be one of global, region, weekly or monthly."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        key = self.get_board_key(request, board_type)
+        board = Leaderboard.objects.filter(key=key).first() if key else None
+        results = {"board": key or board_type, "size": 0, "entries": [], "me": None}
+        if board is None:
+            return Response(self.serializer_class(results).data)
+
+        results["entries"] = [
+            {
+                "rank": entry.rank,
+                "user_id": entry.user.id,
+                "name": f"{entry.user.first_name} {entry.user.last_name[:1]}".strip(),
+                "points": entry.points,
+            }
+            for entry in leaderboard.top_entries(board, self.get_limit(request))
+        ]
+
+        if request.user and request.user.is_authenticated:
+            points = LeaderboardEntry.objects.filter(
+                leaderboard=board, user=request.user
+            ).values_list("points", flat=True).first()
+            if points is not None:
+                rank, results["size"] = leaderboard.rank_and_size(board, points)
+                results["me"] = {"rank": rank, "points": points}
+
+        if results["me"] is None:
+            results["size"] = leaderboard.board_size(board)
+        return Response(self.serializer_class(results).data)
+
+
+class GameNotificationView(APIView):
+    """Poll for award notifications and acknowledge the ones shown."""
+    authentication_classes = [CustomJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    serializer_class = GameNotificationSerializer
+
+    @extend_schema(
+        responses={200: GameNotificationSerializer(many=True)},
+        tags=["Game"],
+    )
+    def get(self, request):
+        notifications = GameNotification.objects.filter(
+            user=request.user,
+            seen=False
+        ).order_by("id")[:NOTIFICATION_LIMIT]
+        return Response(self.serializer_class(notifications, many=True).data)
+
+    @extend_schema(
+        request=GameNotificationAckSerializer,
+        responses={200: None},
+        tags=["Game"],
+    )
+    def post(self, request):
+        serializer = GameNotificationAckSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        updated = GameNotification.objects.filter(
+            user=request.user,
+            seen=False,
+            id__lte=serializer.validated_data["up_to"]
+        ).update(seen=True)
+        return Response({"seen": updated}, status=status.HTTP_200_OK)
@@ -0,0 +1,36 @@
+"""
+Django command to rebuild the regional basket price index
+"""
+
+from django.core.management.base import BaseCommand
+
+from core.models import PriceBasket
+from price.price_index import rebuild_basket_index
+
+
+class Command(BaseCommand):
+    """
+    Django command to recompute RegionPriceIndex rows from the listings.
+
+    Imports and new listings keep the index current incrementally; run this
+    after adding a basket or changing its items.
+    """
+
+    help = 'Rebuild the regional price index for the reference baskets.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--basket',
+            help='Name of a single basket to rebuild (default: all active).',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        baskets = PriceBasket.objects.filter(is_active=True)
+        if options['basket']:
+            baskets = PriceBasket.objects.filter(name=options['basket'])
+
+        for basket in baskets:
+            points = rebuild_basket_index(basket)
+            self.stdout.write(f"{basket.name}: {points} index points.")
+        self.stdout.write(self.style.SUCCESS('Price index rebuilt.'))
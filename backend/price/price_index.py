@@ -0,0 +1,196 @@
+"""
+Regional price index for the reference baskets.
+
+RegionPriceIndex stores one row per (basket, region) for every day the
+basket's cost changed; a row holds until the next one. The cost on a day is
+the sum over basket items of quantity times the average, across the
+region's stores, of each store's latest price for the product.
+
+New listings only move the index from their own day onwards, so a refresh
+loads the state as of the start of that day (the latest price per store and
+product) and the listings since, rolls forward day by day, and replaces the
+rows from that day on. Nothing before it is recomputed.
+"""
+from collections import defaultdict
+from datetime import datetime, time
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Min, OuterRef, Subquery
+from django.utils import timezone
+
+from core.models import (
+    PriceBasket, PriceBasketItem, PriceListing, RegionPriceIndex, Store,
+)
+
+CENT = Decimal('0.01')
+
+
+def start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def basket_cost(items, prices):
+    """
+    Cost of the basket given {product_id: {store_id: price}}, and how many
+    of its items have at least one price in the region.
+    """
+    cost = Decimal(0)
+    priced = 0
+    for product_id, quantity in items.items():
+        store_prices = prices.get(product_id)
+        if not store_prices:
+            continue
+        average = sum(store_prices.values()) / len(store_prices)
+        cost += quantity * average
+        priced += 1
+    return cost.quantize(CENT), priced
+
+
+def prices_before(product_ids, region_id, start):
+    """Latest price per store and product listed before start."""
+    listings = PriceListing.objects.filter(
+        product_id__in=product_ids,
+        store__region_id=region_id,
+    )
+    latest_date = listings.filter(
+        product=OuterRef('product'),
+        store=OuterRef('store'),
+        date_added__lt=start,
+    ).order_by('-date_added').values('date_added')[:1]
+
+    prices = defaultdict(dict)
+    rows = listings.filter(
+        date_added=Subquery(latest_date)
+    ).order_by('id').values_list('product_id', 'store_id', 'price')
+    for product_id, store_id, price in rows:
+        prices[product_id][store_id] = price
+    return prices
+
+
+def refresh_region_index(basket, region_id, since):
+    """Recompute the basket's index rows in one region from since onwards."""
+    items = dict(
+        PriceBasketItem.objects.filter(
+            basket=basket
+        ).values_list('product_id', 'quantity')
+    )
+    start = start_of_day(since)
+
+    with transaction.atomic():
+        # Serialize refreshes of the same basket
+        PriceBasket.objects.select_for_update().filter(pk=basket.pk).first()
+
+        previous = RegionPriceIndex.objects.filter(
+            basket=basket, region_id=region_id, date__lt=since
+        ).order_by('-date').values_list('cost', 'items_priced').first()
+
+        prices = prices_before(list(items), region_id, start)
+        changes = defaultdict(list)
+        listings = PriceListing.objects.filter(
+            product_id__in=list(items),
+            store__region_id=region_id,
+            date_added__gte=start,
+        ).order_by('date_added', 'id').values_list(
+            'product_id', 'store_id', 'price', 'date_added'
+        )
+        for product_id, store_id, price, date_added in listings:
+            changes[timezone.localdate(date_added)].append(
+                (product_id, store_id, price)
+            )
+
+        points = []
+        for day in sorted(set(changes) | {since}):
+            for product_id, store_id, price in changes.get(day, ()):
+                prices[product_id][store_id] = price
+            cost, priced = basket_cost(items, prices)
+            if priced and (cost, priced) != previous:
+                points.append(RegionPriceIndex(
+                    basket=basket,
+                    region_id=region_id,
+                    date=day,
+                    cost=cost,
+                    items_priced=priced,
+                    items_total=len(items),
+                ))
+                previous = (cost, priced)
+
+        RegionPriceIndex.objects.filter(
+            basket=basket, region_id=region_id, date__gte=since
+        ).delete()
+        RegionPriceIndex.objects.bulk_create(points)
+    return len(points)
+
+
+def refresh_price_index(since, region_ids, product_ids=None):
+    """
+    Refresh the active baskets that contain any of product_ids (all active
+    baskets when None) in the given regions from since onwards.
+    """
+    baskets = PriceBasket.objects.filter(is_active=True)
+    if product_ids is not None:
+        baskets = baskets.filter(items__product_id__in=product_ids).distinct()
+
+    refreshed = 0
+    for basket in baskets:
+        for region_id in region_ids:
+            refreshed += refresh_region_index(basket, region_id, since)
+    return refreshed
+
+
+def refresh_for_listing(listing):
+    """Fold a single new listing into the index."""
+    region_id = Store.objects.filter(
+        pk=listing.store_id
+    ).values_list('region_id', flat=True).first()
+    if region_id is None:
+        return 0
+    return refresh_price_index(
+        timezone.localdate(listing.date_added),
+        [region_id],
+        product_ids=[listing.product_id],
+    )
+
+
+def refresh_for_changes(dates, store_ids, product_ids):
+    """
+    Refresh the index after listings were added, edited or removed: from
+    the earliest of their (old and new) dates, in the regions of their
+    stores, for their products.
+    """
+    dates = [date for date in dates if date]
+    region_ids = list(
+        Store.objects.filter(
+            pk__in=[pk for pk in store_ids if pk], region__isnull=False
+        ).values_list('region_id', flat=True).distinct()
+    )
+    if not dates or not region_ids:
+        return 0
+    return refresh_price_index(
+        min(timezone.localdate(date) for date in dates),
+        region_ids,
+        product_ids=[pk for pk in product_ids if pk],
+    )
+
+
+def rebuild_basket_index(basket):
+    """Recompute a basket's index in every region from its first listing."""
+    product_ids = list(
+        basket.items.values_list('product_id', flat=True)
+    )
+    RegionPriceIndex.objects.filter(basket=basket).delete()
+    first_listed = PriceListing.objects.filter(
+        product_id__in=product_ids
+    ).aggregate(first=Min('date_added'))['first']
+    if first_listed is None:
+        return 0
+
+    region_ids = Store.objects.filter(
+        region__isnull=False,
+        pricelisting__product_id__in=product_ids,
+    ).values_list('region_id', flat=True).distinct()
+    since = timezone.localdate(first_listed)
+    return sum(
+        refresh_region_index(basket, region_id, since)
+        for region_id in region_ids
+    )
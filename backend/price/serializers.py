@@ -1,6 +1,7 @@
 from rest_framework import serializers
-from core.models import PriceListing
-from django.conf import settings
+from core.bulk import BulkItemSerializer
+from core.images import image_url
+from core.models import PriceListing, RegionPriceIndex
 from drf_spectacular.utils import extend_schema_field
 from rest_framework.fields import CharField
 
@@ -49,14 +50,16 @@ class PriceDetailSerializer(serializers.ModelSerializer):
 
     @extend_schema_field(CharField)
     def get_product_image(self, obj):
-        """Return product image URL or placeholder."""
+        """Return product thumbnail URL or placeholder."""
+        if obj.product.image:
+            return image_url(obj.product.image, 'thumb')
         return obj.product.image_url or "https://via.placeholder.com/150"
 
     @extend_schema_field(CharField)
     def get_store_image(self, obj):
-        """Return store image URL or placeholder."""
+        """Return store thumbnail URL or placeholder."""
         if obj.store.image:
-            return f"{settings.DOMAIN}{obj.store.image.url}"
+            return image_url(obj.store.image, 'thumb')
         else:
             return "https://via.placeholder.com/150"
 
@@ -119,3 +122,24 @@ class PriceHistorySerializer(serializers.Serializer):
     """Serializer for price history data."""
     date_added = serializers.DateTimeField()
     price = serializers.DecimalField(max_digits=10, decimal_places=2)
+
+
+class PriceIndexPointSerializer(serializers.ModelSerializer):
+    """Serializer for a point of the regional basket price index."""
+    region = serializers.CharField(source='region.region', read_only=True)
+
+    class Meta:
+        model = RegionPriceIndex
+        fields = ['region', 'date', 'cost', 'items_priced', 'items_total']
+
+
+class BulkPriceSerializer(BulkItemSerializer):
+    """Serializer for price listings in bulk writes."""
+
+    class Meta:
+        model = PriceListing
+        fields = [
+            'id', 'product', 'store', 'price', 'price_is_verified',
+            'date_added', 'source',
+        ]
+        read_only_fields = ['id']
@@ -0,0 +1,195 @@
+"""
+Test incremental maintenance of the regional price index.
+"""
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.models import (
+    PriceBasket, PriceBasketItem, PriceListing, Product, Region,
+    RegionPriceIndex, Store, User,
+)
+from price import price_index
+
+
+def at(day, hour=12):
+    return timezone.make_aware(datetime.combine(day, time(hour)))
+
+
+class PriceIndexTestCase(TestCase):
+    """Basket, region and helpers shared by the price index tests"""
+
+    def setUp(self):
+        self.today = timezone.localdate()
+        self.region = Region.objects.create(region='North')
+        self.stores = [
+            Store.objects.create(name=f'Store {i}', lat=0, lon=0, region=self.region)
+            for i in range(2)
+        ]
+        self.rice = Product.objects.create(name='Rice')
+        self.milk = Product.objects.create(name='Milk')
+        self.basket = PriceBasket.objects.create(name='Staples')
+        PriceBasketItem.objects.create(basket=self.basket, product=self.rice, quantity=2)
+        PriceBasketItem.objects.create(basket=self.basket, product=self.milk)
+
+    def list_price(self, product, store, price, day):
+        listing = PriceListing.objects.create(
+            product=product, store=store, price=Decimal(price), date_added=at(day)
+        )
+        price_index.refresh_for_listing(listing)
+        return listing
+
+    def series(self):
+        return list(
+            RegionPriceIndex.objects.filter(basket=self.basket)
+            .order_by('date').values_list('date', 'cost', 'items_priced')
+        )
+
+
+class PriceIndexTests(PriceIndexTestCase):
+    """Test the basket cost series per region"""
+
+    def test_incremental_matches_rebuild(self):
+        day0 = self.today - timedelta(days=5)
+        self.list_price(self.rice, self.stores[0], '10.00', day0)
+        self.list_price(self.rice, self.stores[1], '12.00', day0 + timedelta(days=1))
+        self.list_price(self.milk, self.stores[0], '5.50', day0 + timedelta(days=3))
+        # A backdated listing shifts every later point
+        self.list_price(self.milk, self.stores[1], '6.50', day0 + timedelta(days=2))
+
+        incremental = self.series()
+        self.assertEqual(incremental, [
+            (day0, Decimal('20.00'), 1),
+            (day0 + timedelta(days=1), Decimal('22.00'), 1),
+            (day0 + timedelta(days=2), Decimal('28.50'), 2),
+            (day0 + timedelta(days=3), Decimal('28.00'), 2),
+        ])
+
+        price_index.rebuild_basket_index(self.basket)
+        self.assertEqual(self.series(), incremental)
+
+    def test_unchanged_cost_adds_no_point(self):
+        day0 = self.today - timedelta(days=2)
+        self.list_price(self.rice, self.stores[0], '10.00', day0)
+        self.list_price(self.rice, self.stores[0], '10.00', day0 + timedelta(days=1))
+
+        self.assertEqual(len(self.series()), 1)
+
+    def test_endpoint_starts_with_point_in_effect(self):
+        day0 = self.today - timedelta(days=5)
+        self.list_price(self.rice, self.stores[0], '10.00', day0)
+        self.list_price(self.rice, self.stores[0], '11.00', day0 + timedelta(days=4))
+
+        response = self.client.get(reverse('price:price-index'), {
+            'basket': self.basket.id,
+            'region': 'north',
+            'date_from': (day0 + timedelta(days=2)).isoformat(),
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(point['date'], point['cost']) for point in response.data['points']],
+            [(day0.isoformat(), '20.00'), ((day0 + timedelta(days=4)).isoformat(), '22.00')],
+        )
+
+
+class PriceIndexWriteTests(PriceIndexTestCase):
+    """Test the index follows listing edits and deletes"""
+
+    def setUp(self):
+        super().setUp()
+        self.staff = User.objects.create_user(
+            email='staff@example.com',
+            password='testpass123',
+            first_name='Staff',
+            last_name='User',
+            is_staff=True,
+        )
+        self.api = APIClient()
+        self.api.force_authenticate(self.staff)
+        self.day0 = self.today - timedelta(days=4)
+        self.list_price(self.rice, self.stores[0], '10.00', self.day0)
+        self.list_price(self.milk, self.stores[0], '5.00', self.day0 + timedelta(days=1))
+        self.latest = self.list_price(
+            self.rice, self.stores[0], '11.00', self.day0 + timedelta(days=2)
+        )
+
+    def assert_matches_rebuild(self):
+        incremental = self.series()
+        price_index.rebuild_basket_index(self.basket)
+        self.assertEqual(incremental, self.series())
+
+    def test_update_refreshes_index(self):
+        response = self.api.patch(
+            reverse('price:price-detail', args=[self.latest.id]),
+            {'price': '15.00'},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.series()[-1], (
+            self.day0 + timedelta(days=2), Decimal('35.00'), 2,
+        ))
+        self.assert_matches_rebuild()
+
+    def test_destroy_refreshes_index(self):
+        response = self.api.delete(
+            reverse('price:price-detail', args=[self.latest.id])
+        )
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.series()[-1], (
+            self.day0 + timedelta(days=1), Decimal('25.00'), 2,
+        ))
+        self.assert_matches_rebuild()
+
+    def test_webmin_update_refreshes_index_on_commit(self):
+        url = reverse('webmin-price-listing-detail', args=[self.latest.id])
+
+        with mock.patch('webmin.views.refresh_for_changes') as refresh:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.api.patch(url, {'price_is_verified': 'verified'})
+                refresh.assert_not_called()
+
+        self.assertEqual(response.status_code, 200)
+        refresh.assert_called_once_with(
+            [self.latest.date_added, self.latest.date_added],
+            {self.stores[0].id},
+            {self.rice.id},
+        )
+
+    def test_webmin_destroy_refreshes_index(self):
+        url = reverse('webmin-price-listing-detail', args=[self.latest.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.api.delete(url)
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.series()[-1], (
+            self.day0 + timedelta(days=1), Decimal('25.00'), 2,
+        ))
+        self.assert_matches_rebuild()
+
+    def test_moved_listing_refreshes_old_and_new_day_and_region(self):
+        south = Region.objects.create(region='South')
+        south_store = Store.objects.create(name='South Store', lat=0, lon=0, region=south)
+        before = (self.latest.date_added, self.latest.store_id, self.latest.product_id)
+        self.latest.store = south_store
+        self.latest.date_added = at(self.day0 - timedelta(days=1))
+        self.latest.save()
+
+        price_index.refresh_for_changes(
+            [before[0], self.latest.date_added],
+            {before[1], self.latest.store_id},
+            {before[2], self.latest.product_id},
+        )
+
+        self.assertEqual(
+            list(RegionPriceIndex.objects.filter(region=south).values_list('date', 'cost')),
+            [(self.day0 - timedelta(days=1), Decimal('22.00'))],
+        )
+        self.assert_matches_rebuild()
@@ -11,4 +11,5 @@ app_name = 'price'
 urlpatterns = [
     path('', include(router.urls)),
     path('price-history/<int:pk>/', views.PriceHistoryView.as_view(), name='price-history'),  # New endpoint
+    path('price-index/', views.PriceIndexView.as_view(), name='price-index'),
 ]
@@ -2,29 +2,32 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework.permissions import AllowAny, IsAuthenticated
-from django.db.models import Max, Subquery, OuterRef, Count
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
+from django.db.models import Max, Subquery, OuterRef, Count, Q
 from core.authentication import CustomJWTAuthentication
+from core.bulk import BulkWriteMixin
 from price.permissions import IsStaffOrReadOnly
-from core.models import PriceListing
+from core.models import PriceBasket, PriceListing, RegionPriceIndex
+from core.filters import SearchKeyFilter
+from core.normalize import NUMBER_RE
+from core.spelling import suggest_correction
+from core.throttling import TokenBucketThrottle
+from game.outbox import record_game_event
+from price.price_index import refresh_for_changes, refresh_for_listing
 from price import serializers
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter
 from datetime import date, timedelta, datetime
 from django.utils.timezone import make_aware
 from django.utils import timezone
+from decimal import Decimal
 
-import re
 
-STOPWORDS = {"in", "at", "on", "and", "or", "for", "the", "a", "an", "of", "with", "to", "from", "by"}
-WILDCARD_TERMS = {"&"}
-
-
-class CustomSearchFilter(SearchFilter):
+class CustomSearchFilter(SearchKeyFilter):
     """
     A custom search filter that:
       1. Logs the original (raw) user query if authenticated,
-      2. Removes stopwords and wildcard terms before DRF applies the query across 'search_fields'.
+      2. Matches the normalized terms against the product and store search keys,
+         also treating numeric terms as an exact price.
     """
 
     def filter_queryset(self, request, queryset, view):
@@ -32,50 +35,55 @@ class CustomSearchFilter(SearchFilter):
 
         if request.user and request.user.is_authenticated and search_query:
             from core.models import UserSearchHistory
-            record, created = UserSearchHistory.objects.get_or_create(
+            # (user, query) is unique, so a repeat search just bumps the
+            # timestamp of the existing record in a single UPDATE.
+            bumped = UserSearchHistory.objects.filter(
                 user=request.user,
                 query=search_query
-            )
-            if not created:
-                # If a record with the same (user, query) already exists, 
-                # just update the timestamp to "bump" it.
-                record.timestamp = timezone.now()
-                record.save()
-
-        # Let SearchFilter handle the rest
+            ).update(timestamp=timezone.now())
+            if not bumped:
+                UserSearchHistory.objects.get_or_create(
+                    user=request.user,
+                    query=search_query
+                )
+
+        # Let SearchKeyFilter handle the rest
         return super().filter_queryset(request, queryset, view)
 
-    def get_search_terms(self, request):
-        # 2. DRF calls this to get the list of terms. We remove stopwords and wildcard terms here.
-        search_query = request.query_params.get(self.search_param, '')
-        words = re.split(r'\s+', search_query.strip())
-        cleaned_words = [
-            word for word in words
-            if word.lower() not in STOPWORDS and word not in WILDCARD_TERMS
-        ]
-        return cleaned_words
+    def get_term_condition(self, term, fields):
+        condition = super().get_term_condition(term, fields)
+        if NUMBER_RE.match(term):
+            condition |= Q(price=Decimal(term))
+        return condition
 
 
-class PriceViewSet(viewsets.ModelViewSet):
+class PriceViewSet(BulkWriteMixin, viewsets.ModelViewSet):
     """View for managing price APIs."""
     serializer_class = serializers.PriceDetailSerializer
+    bulk_serializer_class = serializers.BulkPriceSerializer
     queryset = PriceListing.objects.select_related('product', 'store__region')
 
     filter_backends = [DjangoFilterBackend, CustomSearchFilter]  # Our custom filter
     filterset_fields = ['store', 'product', 'product__barcode']
 
-    # The fields DRF will attempt to search on using the cleaned terms:
-    search_fields = [
-        'store__name',
-        'store__address',
-        'store__region__region',
-        'product__name',
-        'product__brand',
-        'product__amount',
-        'price'
-    ]
+    # The indexed search keys matched against the normalized terms:
+    search_key_fields = ['product__search_key', 'store__search_key']
 
     authentication_classes = [CustomJWTAuthentication]
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = 'search'
+
+    def get_throttles(self):
+        """Only reads are budgeted; writes are limited by their permissions."""
+        if self.action in ['list', 'retrieve']:
+            return super().get_throttles()
+        return []
+
+    def get_throttle_cost(self, request):
+        """Searches scan the search keys; plain listings and lookups are cheap."""
+        if self.action == 'list' and request.query_params.get('search'):
+            return 5
+        return 1
 
     def get_permissions(self):
         """
@@ -85,6 +93,8 @@ class PriceViewSet(viewsets.ModelViewSet):
             return [AllowAny()]
         elif self.action == 'price_image_upload':
             return [IsAuthenticated()]
+        elif self.action == 'bulk':
+            return [IsAuthenticated(), IsAdminUser()]
         else:
             return [IsAuthenticated(), IsStaffOrReadOnly()]
 
@@ -117,6 +127,57 @@ class PriceViewSet(viewsets.ModelViewSet):
 
         return queryset
 
+    def list(self, request, *args, **kwargs):
+        """List prices, suggesting a spelling correction for empty searches."""
+        response = super().list(request, *args, **kwargs)
+        search_query = request.query_params.get('search', '')
+        if search_query and isinstance(response.data, dict) and not response.data.get('count'):
+            correction = suggest_correction(search_query)
+            if correction:
+                response.data['did_you_mean'] = correction
+        return response
+
+    def perform_create(self, serializer):
+        price_listing = serializer.save()
+        record_game_event(self.request.user, 'price_create', {
+            'price_listing': price_listing.id,
+        })
+        refresh_for_listing(price_listing)
+
+    def prepare_bulk_instance(self, instance, fields):
+        if instance._state.adding:
+            instance.created_by = self.request.user
+        return []
+
+    def perform_update(self, serializer):
+        """Refresh the price index from the earlier of the old and new dates."""
+        old = serializer.instance
+        before = (old.date_added, old.store_id, old.product_id)
+        listing = serializer.save()
+        refresh_for_changes(
+            [before[0], listing.date_added],
+            {before[1], listing.store_id},
+            {before[2], listing.product_id},
+        )
+
+    def perform_destroy(self, instance):
+        instance.delete()
+        refresh_for_changes(
+            [instance.date_added], [instance.store_id], [instance.product_id]
+        )
+
+    def perform_bulk_write(self, created, updated, previous):
+        """Refresh the price index once for every touched region and product."""
+        listings = created + updated
+        dates = [listing.date_added for listing in listings]
+        product_ids = {listing.product_id for listing in listings}
+        store_ids = {listing.store_id for listing in listings}
+        for values in previous.values():
+            dates.append(values.get('date_added'))
+            product_ids.add(values.get('product'))
+            store_ids.add(values.get('store'))
+        refresh_for_changes(dates, store_ids, product_ids)
+
     @action(
         detail=True,
         methods=['PUT'],
@@ -180,3 +241,57 @@ class PriceHistoryView(APIView):
             return Response(
                 {"detail": "Price listing not found."}, status=status.HTTP_404_NOT_FOUND
             )
+
+
+class PriceIndexView(APIView):
+    """
+    Daily cost of a reference basket per region.
+
+    Each point holds until the next one for its region; the point in
+    effect on date_from is included so the series starts there.
+    """
+    permission_classes = [AllowAny]
+    serializer_class = serializers.PriceIndexPointSerializer
+
+    def get(self, request, *args, **kwargs):
+        baskets = PriceBasket.objects.filter(is_active=True).order_by('id')
+        basket_id = request.GET.get('basket')
+        if basket_id:
+            baskets = baskets.filter(pk=basket_id) if basket_id.isdigit() else baskets.none()
+        basket = baskets.first()
+        if basket is None:
+            return Response(
+                {"detail": "Price basket not found."}, status=status.HTTP_404_NOT_FOUND
+            )
+
+        try:
+            date_from = date.fromisoformat(request.GET['date_from']) if request.GET.get('date_from') else None
+            date_to = date.fromisoformat(request.GET['date_to']) if request.GET.get('date_to') else None
+        except ValueError:
+            return Response(
+                {"detail": "Dates must be YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        points = RegionPriceIndex.objects.filter(basket=basket).select_related('region')
+        region = request.GET.get('region', '').lower()
+        if region and region != 'everywhere':
+            points = points.filter(region__region__iexact=region)
+        if date_to:
+            points = points.filter(date__lte=date_to)
+        if date_from:
+            in_effect = RegionPriceIndex.objects.filter(
+                basket=basket,
+                region=OuterRef('region'),
+                date__lte=date_from,
+            ).order_by('-date').values('date')[:1]
+            points = points.filter(
+                Q(date__gt=date_from) | Q(date=Subquery(in_effect))
+            )
+
+        serializer = self.serializer_class(
+            points.order_by('region__region', 'date'), many=True
+        )
+        return Response({
+            "basket": basket.name,
+            "points": serializer.data,
+        }, status=status.HTTP_200_OK)
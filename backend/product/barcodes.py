@@ -0,0 +1,62 @@
+"""
+Exact barcode lookups for the scanner.
+
+A batch of barcodes resolves in one `barcode IN (...)` query on the
+unique index. Serialized products are kept in the default cache under
+barcode_key for BARCODE_CACHE_TIMEOUT, so hot codes skip the database;
+product saves and deletes drop their keys (see product.signals). Codes
+that match nothing are recorded once in UnresolvedBarcode with a single
+INSERT ... ON CONFLICT DO NOTHING.
+"""
+from django.core.cache import cache
+from django.db import transaction
+
+from core.models import Product, UnresolvedBarcode
+
+BARCODE_CACHE_TIMEOUT = 300
+MAX_BARCODES = 100
+
+
+def barcode_key(barcode):
+    return f'product-barcode:{barcode}'
+
+
+def resolve_barcodes(barcodes, serialize):
+    """
+    Map each barcode to its serialized product, or None when unknown.
+    serialize turns a list of products into a list of dicts.
+    """
+    cached = cache.get_many([barcode_key(code) for code in barcodes])
+    results = {
+        code: cached.get(barcode_key(code))
+        for code in barcodes
+    }
+
+    missing = [code for code, data in results.items() if data is None]
+    if missing:
+        products = list(Product.objects.filter(barcode__in=missing))
+        found = dict(zip(
+            (product.barcode for product in products),
+            serialize(products),
+        ))
+        cache.set_many(
+            {barcode_key(code): data for code, data in found.items()},
+            BARCODE_CACHE_TIMEOUT,
+        )
+        results.update(found)
+    return results
+
+
+def record_unresolved(barcodes, user):
+    """Remember barcodes nobody could resolve, ignoring known ones."""
+    UnresolvedBarcode.objects.bulk_create(
+        [UnresolvedBarcode(barcode=code, uploaded_by=user) for code in barcodes],
+        ignore_conflicts=True,
+    )
+
+
+def invalidate_barcodes(barcodes):
+    """Drop cached lookups once the current transaction commits."""
+    keys = [barcode_key(code) for code in barcodes if code]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
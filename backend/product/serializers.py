@@ -1,5 +1,53 @@
 from rest_framework import serializers
+from core.bulk import BulkItemSerializer
+from core.fields import ImageDerivativeField
 from core.models import Product
+from core.normalize import attribute_key, build_attributes
+from product.barcodes import MAX_BARCODES
+
+OPTION_SLOTS = range(1, 6)
+OPTION_FIELDS = [
+    f'option{slot}{part}'
+    for slot in OPTION_SLOTS for part in ('name', 'value')
+]
+
+
+def option_names(attributes, order):
+    """Attribute names in slot order: option_order first, then the rest by name."""
+    named = [name for name in order if name in attributes]
+    return named + sorted(set(attributes) - set(named))
+
+
+def legacy_options(attributes, order):
+    """The first five attributes as option1name/option1value..option5."""
+    names = option_names(attributes, order)
+    options = {}
+    for slot in OPTION_SLOTS:
+        name = names[slot - 1] if slot <= len(names) else None
+        options[f'option{slot}name'] = name
+        options[f'option{slot}value'] = attributes[name] if name else None
+    return options
+
+
+def fold_options(attributes, order, options):
+    """
+    Apply submitted option fields to attributes: each slot keeps its
+    current name or value unless given, and attributes beyond the five
+    option slots are left alone. Returns (attributes, option_order).
+    """
+    current = legacy_options(attributes, order)
+    current.update(options)
+    pairs = [
+        (current[f'option{slot}name'], current[f'option{slot}value'])
+        for slot in OPTION_SLOTS
+    ]
+    extra = [
+        (name, attributes[name])
+        for name in option_names(attributes, order)[len(OPTION_SLOTS):]
+    ]
+    folded = build_attributes(extra + pairs)
+    slot_names = [attribute_key(name) for name, _ in pairs]
+    return folded, [name for name in dict.fromkeys(slot_names) if name in folded]
 
 
 class ProductSerializer(serializers.ModelSerializer):
@@ -28,19 +76,51 @@ class ProductSerializer(serializers.ModelSerializer):
 
 
 class ProductDetailSerializer(ProductSerializer):
-    """Serializer for product detail view."""
+    """
+    Serializer for product detail view. The option1name..option5value
+    fields of older clients are still read and written, as a view of the
+    first five attributes.
+    """
+    image_thumbnail = ImageDerivativeField('thumb', source='image')
+    image_medium = ImageDerivativeField('medium', source='image')
+    attributes = serializers.DictField(
+        child=serializers.CharField(max_length=255, allow_blank=True),
+        required=False,
+    )
 
     class Meta(ProductSerializer.Meta):
         fields = ProductSerializer.Meta.fields + [
             'description', 'brand', 'category',
-            'manufacturer', 'image_url', 'option1name',
-            'option1value', 'option2name', 'option2value',
-            'option3name', 'option3value', 'option4name',
-            'option4value', 'option5name', 'option5value',
-            'img_is_verified',
+            'manufacturer', 'image_url', 'attributes',
+            'img_is_verified', 'image_thumbnail', 'image_medium',
 
             ]
 
+    def validate_attributes(self, value):
+        return build_attributes(value.items())
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        data.update(legacy_options(instance.attributes, instance.option_order))
+        return data
+
+    def to_internal_value(self, data):
+        validated = super().to_internal_value(data)
+        options = {
+            field: data[field] for field in OPTION_FIELDS
+            if field in data
+        }
+        if options:
+            attributes = validated.get(
+                'attributes',
+                self.instance.attributes if self.instance is not None else {},
+            )
+            order = self.instance.option_order if self.instance is not None else []
+            validated['attributes'], validated['option_order'] = fold_options(
+                attributes, order, options
+            )
+        return validated
+
 
 class ProductImageSerializer(serializers.ModelSerializer):
     """Serializer for uploading images to product."""
@@ -67,3 +147,48 @@ class ProductImgVerifiedSerializer(serializers.ModelSerializer):
 
         instance.save()
         return instance
+
+
+class BarcodeLookupSerializer(serializers.Serializer):
+    """Serializer for a batch of barcodes to resolve."""
+    barcodes = serializers.ListField(
+        child=serializers.CharField(max_length=255),
+        allow_empty=False,
+        max_length=MAX_BARCODES,
+    )
+
+    def validate_barcodes(self, value):
+        return list(dict.fromkeys(code.strip() for code in value if code.strip()))
+
+
+class BarcodeResultSerializer(serializers.Serializer):
+    """Serializer for one resolved (or unknown) barcode."""
+    barcode = serializers.CharField()
+    product = ProductDetailSerializer(allow_null=True)
+
+
+class BarcodeLookupResponseSerializer(serializers.Serializer):
+    """Serializer for barcode lookup results, in request order."""
+    results = BarcodeResultSerializer(many=True)
+
+
+class BulkProductSerializer(BulkItemSerializer):
+    """Serializer for products in bulk writes."""
+    attributes = serializers.DictField(
+        child=serializers.CharField(max_length=255, allow_blank=True),
+        required=False,
+    )
+
+    class Meta:
+        model = Product
+        fields = [
+            'id', 'barcode', 'name', 'description', 'amount', 'brand',
+            'category', 'manufacturer', 'attributes', 'source',
+        ]
+        read_only_fields = ['id']
+
+    def validate_barcode(self, value):
+        return value or None
+
+    def validate_attributes(self, value):
+        return build_attributes(value.items())
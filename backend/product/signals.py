@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.models import Product
+from product.barcodes import invalidate_barcodes
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_cached_barcode(sender, instance, **kwargs):
+    loaded = getattr(instance, '_loaded_values', {})
+    invalidate_barcodes({instance.barcode, loaded.get('barcode')})
@@ -0,0 +1,112 @@
+"""
+Test JSON product attributes and their filter.
+"""
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from core.filters import AttributeFilter
+from core.models import Product
+from core.normalize import build_attributes
+from product.serializers import ProductDetailSerializer, legacy_options
+
+
+class ProductAttributeTests(TestCase):
+    """Test attributes replace the option columns"""
+
+    def test_names_are_normalized(self):
+        attributes = build_attributes([(' Pack  Size ', ' 6 '), ('Colour', ''), (None, 'x')])
+
+        self.assertEqual(attributes, {'pack size': '6'})
+
+    def test_legacy_options_write_attributes(self):
+        product = Product.objects.create(
+            name='Cola',
+            attributes={'flavour': 'cherry'},
+            option_order=['flavour'],
+        )
+        serializer = ProductDetailSerializer(
+            product,
+            data={'option1value': 'lime', 'option2name': 'Colour', 'option2value': 'red'},
+            partial=True,
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        product.refresh_from_db()
+        self.assertEqual(product.attributes, {'flavour': 'lime', 'colour': 'red'})
+        self.assertEqual(product.option_order, ['flavour', 'colour'])
+        data = ProductDetailSerializer(product).data
+        self.assertEqual(
+            (data['option1name'], data['option2name'], data['option2value']),
+            ('flavour', 'colour', 'red'),
+        )
+        self.assertIsNone(data['option3name'])
+
+    def test_slots_follow_option_order_not_key_order(self):
+        attributes = {'size': '2L', 'brand': 'X', 'flavour': 'lime'}
+
+        options = legacy_options(attributes, ['flavour', 'gone', 'size'])
+
+        self.assertEqual(
+            [options[f'option{slot}name'] for slot in range(1, 5)],
+            ['flavour', 'size', 'brand', None],
+        )
+
+    def test_filter_builds_one_containment_test(self):
+        class ProductView:
+            attribute_field = 'attributes'
+
+        request = Request(APIRequestFactory().get(
+            '/', {'attr.Size': '2L', 'attr.pack': '6', 'attr.flavour': ['lime', 'cherry'], 'search': 'x'}
+        ))
+        queryset = AttributeFilter().filter_queryset(request, Product.objects.all(), ProductView())
+
+        lookups = queryset.query.where.children
+        self.assertEqual(lookups[0].lookup_name, 'contains')
+        self.assertEqual(lookups[0].rhs, {'size': '2L', 'pack': '6'})
+        alternatives = [child.rhs for child in lookups[1].children]
+        self.assertEqual(alternatives, [{'flavour': 'lime'}, {'flavour': 'cherry'}])
+
+
+class AttributeMigrationTests(TransactionTestCase):
+    """Test migration 0030 keeps the option slot order both ways"""
+
+    before = [('core', '0029_media_blob')]
+    after = [('core', '0030_product_attributes')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_round_trip_keeps_slot_order(self):
+        Product = self.migrate(self.before).get_model('core', 'Product')
+        Product.objects.create(
+            name='Cola',
+            option1name='Size', option1value='2L',
+            option2name='Flavour', option2value='lime',
+            option3name='Colour', option3value='',
+        )
+
+        Product = self.migrate(self.after).get_model('core', 'Product')
+        product = Product.objects.get()
+        self.assertEqual(product.attributes, {'size': '2L', 'flavour': 'lime'})
+        self.assertEqual(product.option_order, ['size', 'flavour'])
+
+        Product = self.migrate(self.before).get_model('core', 'Product')
+        product = Product.objects.get()
+        self.assertEqual(
+            [
+                (getattr(product, f'option{slot}name'), getattr(product, f'option{slot}value'))
+                for slot in range(1, 4)
+            ],
+            [('size', '2L'), ('flavour', 'lime'), (None, None)],
+        )
@@ -0,0 +1,79 @@
+"""
+Test the barcode lookup endpoint.
+"""
+from django.core.cache import cache, caches
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.models import Product, UnresolvedBarcode, User
+from core.throttling import THROTTLE_CACHE
+
+BARCODE_URL = reverse('product:barcode-lookup')
+
+
+class BarcodeLookupTests(TestCase):
+    """Test exact, cached and batched barcode lookups"""
+
+    def setUp(self):
+        cache.clear()
+        caches[THROTTLE_CACHE].clear()
+        self.client = APIClient()
+        self.product = Product.objects.create(name='Milk', barcode='5391234567890')
+        Product.objects.create(name='Bread', barcode='5390000000001')
+
+    def test_batch_lookup_preserves_order(self):
+        response = self.client.get(BARCODE_URL, {'barcode': '5390000000001,000,5391234567890'})
+
+        self.assertEqual(response.status_code, 200)
+        results = response.data['results']
+        self.assertEqual([result['barcode'] for result in results],
+                         ['5390000000001', '000', '5391234567890'])
+        self.assertEqual(results[0]['product']['name'], 'Bread')
+        self.assertIsNone(results[1]['product'])
+        self.assertEqual(results[2]['product']['id'], self.product.id)
+
+    def test_hot_codes_are_served_from_cache(self):
+        self.client.get(BARCODE_URL, {'barcode': '5391234567890'})
+
+        with self.assertNumQueries(0):
+            response = self.client.get(BARCODE_URL, {'barcode': '5391234567890'})
+        self.assertEqual(response.data['results'][0]['product']['name'], 'Milk')
+
+    def test_changed_barcode_is_not_served_stale(self):
+        self.client.get(BARCODE_URL, {'barcode': '5391234567890'})
+        product = Product.objects.get(pk=self.product.pk)
+        product.barcode = '5391234567891'
+        with self.captureOnCommitCallbacks(execute=True):
+            product.save()
+
+        response = self.client.post(
+            BARCODE_URL, {'barcodes': ['5391234567890', '5391234567891']}, format='json'
+        )
+        old, new = response.data['results']
+        self.assertIsNone(old['product'])
+        self.assertEqual(new['product']['id'], self.product.id)
+
+    def test_misses_are_recorded_once(self):
+        user = User.objects.create_user(
+            email='scanner@example.com',
+            password='testpass123',
+            first_name='Test',
+            last_name='Scanner',
+        )
+        self.client.force_authenticate(user)
+
+        for _ in range(2):
+            self.client.post(BARCODE_URL, {'barcodes': ['111', '222', '5391234567890']}, format='json')
+
+        self.assertEqual(
+            sorted(UnresolvedBarcode.objects.values_list('barcode', flat=True)),
+            ['111', '222'],
+        )
+
+    def test_too_many_barcodes_rejected(self):
+        response = self.client.post(
+            BARCODE_URL, {'barcodes': [str(code) for code in range(101)]}, format='json'
+        )
+
+        self.assertEqual(response.status_code, 400)
@@ -9,5 +9,6 @@ router.register('product-img-verified', views.ProductImgVerifiedViewSet, basenam
 app_name = 'product'
 
 urlpatterns = [
+    path('barcode/', views.BarcodeLookupView.as_view(), name='barcode-lookup'),
     path('', include(router.urls)),
 ]
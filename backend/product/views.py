@@ -2,12 +2,18 @@ from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
+from drf_spectacular.utils import OpenApiParameter, extend_schema
 from core.authentication import CustomJWTAuthentication
+from core.bulk import BulkWriteMixin
+from core.spelling import invalidate_spelling_index
+from core.throttling import TokenBucketThrottle
 from product.permissions import IsStaffOrReadOnly
 from core.models import Product
 from product import serializers
+from product.barcodes import invalidate_barcodes, record_unresolved, resolve_barcodes
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter
+from core.filters import AttributeFilter, SearchKeyFilter
 # from action.action_brain import user_action
 from rest_framework.pagination import PageNumberPagination
 
@@ -18,13 +24,16 @@ class ProductPagination(PageNumberPagination):
     max_page_size = 100  # Prevent excessive data loads
 
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(BulkWriteMixin, viewsets.ModelViewSet):
     """View for managing product APIs."""
     serializer_class = serializers.ProductDetailSerializer
+    bulk_serializer_class = serializers.BulkProductSerializer
+    bulk_unique_fields = ['barcode']
     queryset = Product.objects.all().order_by('date_added')
-    filter_backends = [DjangoFilterBackend, SearchFilter]
+    filter_backends = [DjangoFilterBackend, SearchKeyFilter, AttributeFilter]
     # filterset_fields = ['barcode', 'category', 'brand', 'manufacturer', 'img_is_verified']
-    search_fields = ['name', 'description', 'amount', 'category', 'brand', 'manufacturer', 'barcode']
+    search_key_fields = ['search_key']
+    attribute_field = 'attributes'
     authentication_classes = [CustomJWTAuthentication]
     ordering_fields = ['name', 'amount', 'category', 'brand', 'manufacturer', 'barcode']
     default_ordering = ['name']
@@ -39,6 +48,8 @@ class ProductViewSet(viewsets.ModelViewSet):
             return [permissions.AllowAny()]
         elif self.action == 'upload_image':
             return [permissions.IsAuthenticated()]
+        elif self.action == 'bulk':
+            return [permissions.IsAuthenticated(), permissions.IsAdminUser()]
         else:
             return [permissions.IsAuthenticated(), IsStaffOrReadOnly()]
 
@@ -46,6 +57,19 @@ class ProductViewSet(viewsets.ModelViewSet):
         response = super().create(request, *args, **kwargs)
         return response
 
+    def prepare_bulk_instance(self, instance, fields):
+        if fields & set(instance.SEARCH_KEY_FIELDS):
+            instance.search_key = instance.build_search_key()
+            return ['search_key']
+        return []
+
+    def perform_bulk_write(self, created, updated, previous):
+        invalidate_spelling_index()
+        invalidate_barcodes(
+            {product.barcode for product in updated}
+            | {values.get('barcode') for values in previous.values()}
+        )
+
     @action(detail=True, methods=['PUT'], serializer_class=serializers.ProductImageSerializer)
     def upload_image(self, request, pk=None):
         product = self.get_object()
@@ -71,3 +95,66 @@ class ProductImgVerifiedViewSet(viewsets.ModelViewSet):
         serializer.save()
         # user_action(request.user, 'product image verification', {'data': [serializer.data, instance.id]})
         return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class BarcodeLookupView(APIView):
+    """
+    Resolve scanned barcodes to products with exact matches. GET takes
+    ?barcode= (repeated or comma separated); POST takes {"barcodes": [...]}
+    for larger batches. Unknown codes scanned by signed-in users are
+    recorded in UnresolvedBarcode.
+    """
+    authentication_classes = [CustomJWTAuthentication]
+    permission_classes = [permissions.AllowAny]
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = 'search'
+
+    def get_throttle_cost(self, request):
+        """One token per call, plus one per ten barcodes."""
+        if request.method == 'POST':
+            barcodes = request.data.get('barcodes') if hasattr(request.data, 'get') else None
+            count = len(barcodes) if isinstance(barcodes, list) else 0
+        else:
+            count = len(self.query_barcodes(request))
+        return 1 + count // 10
+
+    def query_barcodes(self, request):
+        return [
+            code
+            for value in request.query_params.getlist('barcode')
+            for code in value.split(',')
+        ]
+
+    def lookup(self, request, data):
+        serializer = serializers.BarcodeLookupSerializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        barcodes = serializer.validated_data['barcodes']
+
+        results = resolve_barcodes(
+            barcodes,
+            lambda products: serializers.ProductDetailSerializer(products, many=True).data,
+        )
+        unresolved = [code for code in barcodes if results[code] is None]
+        if unresolved and request.user.is_authenticated:
+            record_unresolved(unresolved, request.user)
+
+        return Response({
+            'results': [
+                {'barcode': code, 'product': results[code]}
+                for code in barcodes
+            ],
+        })
+
+    @extend_schema(
+        parameters=[OpenApiParameter('barcode', str, many=True, required=True)],
+        responses=serializers.BarcodeLookupResponseSerializer,
+    )
+    def get(self, request):
+        return self.lookup(request, {'barcodes': self.query_barcodes(request)})
+
+    @extend_schema(
+        request=serializers.BarcodeLookupSerializer,
+        responses=serializers.BarcodeLookupResponseSerializer,
+    )
+    def post(self, request):
+        return self.lookup(request, request.data)
@@ -0,0 +1,82 @@
+"""
+Django command to cap and age out user search history
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from django.utils import timezone
+
+from core.models import UserSearchHistory
+
+
+class Command(BaseCommand):
+    """Django command to prune old search history in batches."""
+
+    help = (
+        'Keep only the most recent searches per user and optionally drop '
+        'searches older than a given age.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--keep',
+            type=int,
+            default=settings.SEARCH_HISTORY_MAX_PER_USER,
+            help='Number of most recent searches to keep per user.',
+        )
+        parser.add_argument(
+            '--max-age-days',
+            type=int,
+            default=None,
+            help='Also delete searches older than this many days.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Maximum number of rows deleted per statement.',
+        )
+
+    def delete_in_batches(self, queryset, batch_size):
+        """Delete the ids selected by queryset, batch_size rows at a time."""
+        deleted = 0
+        while True:
+            ids = list(queryset.values_list('id', flat=True)[:batch_size])
+            if not ids:
+                return deleted
+            count, _ = UserSearchHistory.objects.filter(id__in=ids).delete()
+            deleted += count
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        keep = options['keep']
+        batch_size = options['batch_size']
+        deleted = 0
+
+        if options['max_age_days'] is not None:
+            cutoff = timezone.now() - timedelta(days=options['max_age_days'])
+            deleted += self.delete_in_batches(
+                UserSearchHistory.objects.filter(timestamp__lt=cutoff),
+                batch_size,
+            )
+
+        over_cap = (
+            UserSearchHistory.objects
+            .values('user_id')
+            .annotate(searches=Count('id'))
+            .filter(searches__gt=keep)
+            .values_list('user_id', flat=True)
+            .order_by()
+        )
+        for user_id in over_cap.iterator():
+            # Walks the (user, -timestamp) index past the newest `keep` rows
+            stale = UserSearchHistory.objects.filter(
+                user_id=user_id
+            ).order_by('-timestamp', '-id')[keep:]
+            deleted += self.delete_in_batches(stale, batch_size)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {deleted} search history entries.'
+        ))
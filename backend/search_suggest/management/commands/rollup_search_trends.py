@@ -0,0 +1,22 @@
+"""
+Django command to roll search history up into trending queries
+"""
+
+from django.core.management.base import BaseCommand
+
+from search_suggest.trending import rollup_search_trends
+
+
+class Command(BaseCommand):
+    """Django command to refresh the trending search queries."""
+
+    help = 'Fold new search history into the decayed trending-queries table.'
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        self.stdout.write('Rolling up search history...')
+        result = rollup_search_trends()
+        self.stdout.write(self.style.SUCCESS(
+            f"Merged {result['merged']} query counts, "
+            f"pruned {result['pruned']} stale trends."
+        ))
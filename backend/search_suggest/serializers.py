@@ -26,7 +26,13 @@ class UserSearchHistorySerializer(serializers.ModelSerializer):
         model = UserSearchHistory
         fields = ["id", "query", "timestamp"]  # Directly map to model fields
 
+class TrendingQuerySerializer(serializers.Serializer):
+    query = serializers.CharField(read_only=True)
+    score = serializers.FloatField(read_only=True)
+
 class SearchSuggestionsSerializer(serializers.Serializer):
     stores = SearchStoreSerializer(many=True, required=False)
     products = SearchProductSerializer(many=True, required=False)
     history = UserSearchHistorySerializer(many=True, required=False)
+    trending = TrendingQuerySerializer(many=True, required=False)
+    did_you_mean = serializers.CharField(required=False)
@@ -0,0 +1,114 @@
+"""
+Test search history retention: the dedupe migration and pruning.
+"""
+from datetime import timedelta
+from importlib import import_module
+from io import StringIO
+from unittest.mock import patch
+
+from django.apps import apps
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from core.models import User, UserSearchHistory
+
+retention_migration = import_module('core.migrations.0016_usersearchhistory_retention')
+
+
+def create_user(email):
+    return User.objects.create_user(
+        email=email,
+        password='testpass123',
+        first_name='Test',
+        last_name='Shopper',
+    )
+
+
+def search(user, query, when):
+    entry = UserSearchHistory.objects.create(user=user, query=query)
+    UserSearchHistory.objects.filter(pk=entry.pk).update(timestamp=when)
+    return entry
+
+
+class DedupeSearchHistoryTests(TransactionTestCase):
+    """Test duplicate (user, query) rows collapse before the constraint"""
+
+    def setUp(self):
+        constraint = next(
+            constraint for constraint in UserSearchHistory._meta.constraints
+            if constraint.name == 'unique_search_history_query'
+        )
+        # SQLite rebuilds the table from Meta, so drop it there as well
+        others = [c for c in UserSearchHistory._meta.constraints if c is not constraint]
+        with patch.object(UserSearchHistory._meta, 'constraints', others), \
+                connection.schema_editor() as editor:
+            editor.remove_constraint(UserSearchHistory, constraint)
+
+        def restore():
+            with connection.schema_editor() as editor:
+                editor.add_constraint(UserSearchHistory, constraint)
+        self.addCleanup(restore)
+
+    def test_newest_row_survives_with_latest_timestamp(self):
+        now = timezone.now()
+        users = [create_user(f'user{number}@example.com') for number in range(3)]
+        search(users[0], 'milk', now)
+        search(users[0], 'milk', now - timedelta(days=2))
+        newest = search(users[0], 'milk', now - timedelta(days=1))
+        search(users[0], 'bread', now)
+        for user in users[1:]:
+            search(user, 'milk', now)
+            search(user, 'milk', now)
+
+        # Two users per batch, so the walk has to carry on past the first
+        with patch.object(retention_migration, 'DEDUPE_BATCH_SIZE', 2):
+            retention_migration.dedupe_search_history(apps, None)
+
+        self.assertEqual(UserSearchHistory.objects.count(), 4)
+        survivor = UserSearchHistory.objects.get(user=users[0], query='milk')
+        self.assertEqual(survivor.pk, newest.pk)
+        self.assertEqual(survivor.timestamp, now)
+        self.assertEqual(
+            UserSearchHistory.objects.filter(user__in=users[1:]).count(), 2
+        )
+
+
+class PruneSearchHistoryTests(TestCase):
+    """Test the per-user cap and age cutoff"""
+
+    def setUp(self):
+        self.now = timezone.now()
+        self.heavy = create_user('heavy@example.com')
+        self.light = create_user('light@example.com')
+        for number in range(5):
+            search(self.heavy, f'query {number}', self.now - timedelta(hours=number))
+        search(self.light, 'milk', self.now - timedelta(days=40))
+        search(self.light, 'bread', self.now)
+
+    def prune(self, **options):
+        out = StringIO()
+        call_command('prune_search_history', stdout=out, batch_size=2, **options)
+        return out.getvalue()
+
+    def test_keeps_newest_searches_per_user(self):
+        output = self.prune(keep=3)
+
+        self.assertIn('Deleted 2 search history entries', output)
+        self.assertEqual(
+            list(UserSearchHistory.objects.filter(user=self.heavy)
+                 .order_by('-timestamp').values_list('query', flat=True)),
+            ['query 0', 'query 1', 'query 2'],
+        )
+        self.assertEqual(UserSearchHistory.objects.filter(user=self.light).count(), 2)
+
+    def test_drops_searches_older_than_max_age(self):
+        self.prune(keep=10, max_age_days=30)
+
+        self.assertEqual(
+            list(UserSearchHistory.objects.filter(user=self.light)
+                 .values_list('query', flat=True)),
+            ['bread'],
+        )
+        self.assertEqual(UserSearchHistory.objects.filter(user=self.heavy).count(), 5)
@@ -0,0 +1,47 @@
+"""
+Test the search suggestions endpoint.
+"""
+import unittest
+
+from django.core.cache import cache, caches
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from core.models import Product, Store
+from core.throttling import THROTTLE_CACHE
+
+SUGGEST_URL = reverse('search-suggest')
+
+
+class SearchSuggestionsTests(TestCase):
+    """Test catalog suggestions come from the search keys"""
+
+    def setUp(self):
+        cache.clear()
+        caches[THROTTLE_CACHE].clear()
+        Product.objects.create(name='Brown Bread', brand='Baker')
+        Product.objects.create(name='Milk', amount='1 ltr')
+        Store.objects.create(name='Bread Shop', lat=0, lon=0)
+
+    def suggest(self, query, **params):
+        return self.client.get(SUGGEST_URL, {'query': query, **params}).data
+
+    def test_stopword_only_query_suggests_nothing(self):
+        results = self.suggest('the of', include_trending='false')
+
+        self.assertEqual(results['products'], [])
+        self.assertEqual(results['stores'], [])
+
+    @unittest.skipUnless(connection.vendor == 'postgresql', 'array overlap needs Postgres')
+    def test_suggests_products_and_stores_by_prefix(self):
+        results = self.suggest('brea', include_trending='false')
+
+        self.assertEqual([product['name'] for product in results['products']], ['Brown Bread'])
+        self.assertEqual([store['name'] for store in results['stores']], ['Bread Shop'])
+
+    @unittest.skipUnless(connection.vendor == 'postgresql', 'array overlap needs Postgres')
+    def test_units_match_in_any_spelling(self):
+        results = self.suggest('1 litre', type='product')
+
+        self.assertEqual([product['name'] for product in results['products']], ['Milk'])
@@ -0,0 +1,100 @@
+"""
+Test the trending search rollup.
+"""
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from core.models import JobWatermark, Region, SearchQueryTrend, User, UserSearchHistory
+from search_suggest.trending import (
+    ROLLUP_WATERMARK,
+    get_trending,
+    match_trending,
+    rollup_search_trends,
+)
+
+
+class TrendingRollupTests(TestCase):
+    """Test decay, region windows and the watermark"""
+
+    def setUp(self):
+        cache.clear()
+        self.region = Region.objects.create(region='Dublin')
+        self.now = timezone.now()
+
+    def create_user(self, email, region=None):
+        return User.objects.create_user(
+            email=email,
+            password='testpass123',
+            first_name='Test',
+            last_name='Shopper',
+            preferred_region=region,
+        )
+
+    def search(self, user, query, when):
+        entry = UserSearchHistory.objects.create(user=user, query=query)
+        UserSearchHistory.objects.filter(pk=entry.pk).update(timestamp=when)
+
+    def trend(self, query, region=None):
+        return SearchQueryTrend.objects.get(query=query, region=region)
+
+    def test_searches_count_globally_and_per_region(self):
+        local = self.create_user('local@example.com', self.region)
+        visitor = self.create_user('visitor@example.com')
+        self.search(local, 'Brown  Bread', self.now - timedelta(hours=1))
+        self.search(visitor, 'brown bread', self.now - timedelta(hours=2))
+
+        result = rollup_search_trends(now=self.now)
+
+        self.assertEqual(result['merged'], 2)
+        self.assertEqual(self.trend('brown bread').searches, 2)
+        self.assertEqual(self.trend('brown bread', self.region).searches, 1)
+        self.assertEqual(
+            JobWatermark.objects.get(name=ROLLUP_WATERMARK).timestamp, self.now
+        )
+
+    def test_later_rollups_decay_and_only_add_new_searches(self):
+        user = self.create_user('local@example.com', self.region)
+        self.search(user, 'milk', self.now - timedelta(hours=1))
+        rollup_search_trends(now=self.now)
+
+        later = self.now + timedelta(days=7)
+        self.search(user, 'eggs', later - timedelta(hours=1))
+        rollup_search_trends(now=later)
+
+        self.assertAlmostEqual(self.trend('milk').score, 0.5)
+        self.assertEqual(self.trend('milk').searches, 1)
+        self.assertEqual(self.trend('eggs').score, 1)
+
+    def test_stale_trends_are_pruned(self):
+        user = self.create_user('local@example.com')
+        self.search(user, 'milk', self.now - timedelta(hours=1))
+        rollup_search_trends(now=self.now)
+
+        result = rollup_search_trends(now=self.now + timedelta(days=60))
+
+        self.assertEqual(result['pruned'], 1)
+        self.assertFalse(SearchQueryTrend.objects.exists())
+
+    def test_region_without_trends_falls_back_to_global(self):
+        user = self.create_user('visitor@example.com')
+        self.search(user, 'milk', self.now - timedelta(hours=1))
+        rollup_search_trends(now=self.now)
+
+        self.assertEqual(get_trending(self.region.id), [{'query': 'milk', 'score': 1.0}])
+
+    def test_match_trending_matches_word_prefixes(self):
+        trending = [
+            {'query': 'brown bread', 'score': 3},
+            {'query': 'breadcrumbs', 'score': 2},
+            {'query': 'milk', 'score': 1},
+        ]
+
+        self.assertEqual(
+            [trend['query'] for trend in match_trending(trending, ['BREAD'])],
+            ['brown bread', 'breadcrumbs'],
+        )
+        self.assertEqual(match_trending(trending, ['rown']), [])
+        self.assertEqual(len(match_trending(trending, [], limit=2)), 2)
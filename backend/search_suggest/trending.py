@@ -0,0 +1,177 @@
+"""
+Trending search queries rolled up from UserSearchHistory.
+
+The rollup folds new history rows into SearchQueryTrend with an exponential
+decay, and the read path only ever looks at a cached top-N list built from
+that compact table.
+"""
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Max
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from core.models import JobWatermark, SearchQueryTrend, UserSearchHistory
+
+ROLLUP_WATERMARK = 'search-trending-rollup'
+TRENDING_HALF_LIFE = timedelta(days=7)
+TRENDING_MIN_SCORE = 0.05
+TRENDING_LIST_SIZE = 25
+TRENDING_CACHE_TIMEOUT = 60 * 5
+BATCH_SIZE = 1000
+
+
+def trending_cache_key(region_id=None):
+    return f"search-trending:{region_id or 'global'}"
+
+
+def normalize_query(query):
+    """Collapse case and whitespace so equivalent queries share a row."""
+    return " ".join(query.lower().split())[:255]
+
+
+def collect_new_searches(since, until):
+    """Aggregate history rows touched in (since, until] by query and region."""
+    history = UserSearchHistory.objects.filter(timestamp__lte=until)
+    if since:
+        history = history.filter(timestamp__gt=since)
+
+    rows = (
+        history
+        .annotate(lowered=Lower('query'))
+        .values('lowered', 'user__preferred_region')
+        .annotate(searches=Count('id'), last_searched=Max('timestamp'))
+        .order_by()
+    )
+
+    counts = {}
+    for row in rows.iterator(chunk_size=BATCH_SIZE):
+        query = normalize_query(row['lowered'])
+        if not query:
+            continue
+        # Every search counts globally and, if known, for the user's region
+        for region_id in {None, row['user__preferred_region']}:
+            searches, last_searched = counts.get((query, region_id), (0, None))
+            counts[(query, region_id)] = (
+                searches + row['searches'],
+                max(filter(None, [last_searched, row['last_searched']])),
+            )
+    return counts
+
+
+def merge_trends(counts):
+    """Add new search counts onto the existing (already decayed) trends."""
+    keys = list(counts.items())
+    for start in range(0, len(keys), BATCH_SIZE):
+        batch = dict(keys[start:start + BATCH_SIZE])
+        queries = {query for query, _ in batch}
+        existing = {
+            (trend.query, trend.region_id): trend
+            for trend in SearchQueryTrend.objects.filter(query__in=queries)
+        }
+
+        to_update, to_create = [], []
+        for (query, region_id), (searches, last_searched) in batch.items():
+            trend = existing.get((query, region_id))
+            if trend:
+                trend.score += searches
+                trend.searches += searches
+                trend.last_searched = max(trend.last_searched, last_searched)
+                to_update.append(trend)
+            else:
+                to_create.append(SearchQueryTrend(
+                    query=query,
+                    region_id=region_id,
+                    score=searches,
+                    searches=searches,
+                    last_searched=last_searched,
+                ))
+
+        SearchQueryTrend.objects.bulk_update(
+            to_update, ['score', 'searches', 'last_searched']
+        )
+        SearchQueryTrend.objects.bulk_create(to_create)
+
+
+def rollup_search_trends(now=None):
+    """Decay existing trends and fold in searches since the last rollup."""
+    now = now or timezone.now()
+
+    with transaction.atomic():
+        watermark, _ = JobWatermark.objects.select_for_update().get_or_create(
+            name=ROLLUP_WATERMARK
+        )
+        since = watermark.timestamp
+
+        if since:
+            elapsed = max((now - since).total_seconds(), 0)
+            decay = 0.5 ** (elapsed / TRENDING_HALF_LIFE.total_seconds())
+            SearchQueryTrend.objects.update(score=F('score') * decay)
+
+        counts = collect_new_searches(since, now)
+        merge_trends(counts)
+
+        pruned, _ = SearchQueryTrend.objects.filter(
+            score__lt=TRENDING_MIN_SCORE
+        ).delete()
+
+        watermark.timestamp = now
+        watermark.save()
+
+    refresh_trending_cache()
+    return {'merged': len(counts), 'pruned': pruned}
+
+
+def load_trending(region_id=None):
+    """Read the top-N trends for a region (or globally) from the rollup table."""
+    trends = SearchQueryTrend.objects.filter(
+        region_id=region_id
+    ).order_by('-score')[:TRENDING_LIST_SIZE]
+    return [
+        {'query': trend.query, 'score': round(trend.score, 3)}
+        for trend in trends
+    ]
+
+
+def refresh_trending_cache():
+    """Rebuild the cached top-N lists for every region with trends."""
+    region_ids = SearchQueryTrend.objects.filter(
+        region__isnull=False
+    ).values_list('region_id', flat=True).distinct()
+
+    lists = {trending_cache_key(): load_trending()}
+    for region_id in region_ids:
+        lists[trending_cache_key(region_id)] = load_trending(region_id)
+    cache.set_many(lists, TRENDING_CACHE_TIMEOUT)
+
+
+def get_trending(region_id=None):
+    """Return the cached top-N trending queries, falling back to global."""
+    key = trending_cache_key(region_id)
+    trending = cache.get(key)
+    if trending is None:
+        trending = load_trending(region_id)
+        cache.set(key, trending, TRENDING_CACHE_TIMEOUT)
+
+    if not trending and region_id:
+        return get_trending()
+    return trending
+
+
+def match_trending(trending, terms, limit=10):
+    """Filter a trending list down to queries with a word starting with a term."""
+    terms = [term.lower() for term in terms if term]
+    if not terms:
+        return trending[:limit]
+
+    matches = [
+        trend for trend in trending
+        if any(
+            word.startswith(term)
+            for word in trend['query'].split()
+            for term in terms
+        )
+    ]
+    return matches[:limit]
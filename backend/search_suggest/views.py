@@ -1,10 +1,14 @@
-import re
+from django.db.models import Q
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiExample
 from core.authentication import CustomJWTAuthentication
-from core.models import UserSearchHistory, Product, Store
+from core.models import UserSearchHistory, Product, Store, Region
+from core.normalize import split_query, query_terms
+from core.spelling import suggest_correction
+from core.throttling import TokenBucketThrottle
+from search_suggest.trending import get_trending, match_trending
 from .serializers import (
     SearchStoreSerializer,
     SearchProductSerializer,
@@ -26,10 +30,10 @@ from .serializers import (
         ),
         OpenApiParameter(
             name="type",
-            description="Type of suggestions to retrieve. Options are 'store', 'product', 'history', or 'all'.",
+            description="Type of suggestions to retrieve. Options are 'store', 'product', 'history', 'trending', or 'all'.",
             required=False,
             type=str,
-            enum=["store", "product", "history", "all"],
+            enum=["store", "product", "history", "trending", "all"],
             default="all",
         ),
         OpenApiParameter(
@@ -39,6 +43,19 @@ from .serializers import (
             type=bool,
             default=True,
         ),
+        OpenApiParameter(
+            name="include_trending",
+            description="Whether to include trending queries in the results. Defaults to true.",
+            required=False,
+            type=bool,
+            default=True,
+        ),
+        OpenApiParameter(
+            name="region",
+            description="Region name for trending queries. Defaults to the user's preferred region, then global.",
+            required=False,
+            type=str,
+        ),
         OpenApiParameter(
             name="include_products",
             description="Whether to include product suggestions in the results. Defaults to true.",
@@ -61,48 +78,59 @@ class SearchSuggestionsView(APIView):
     authentication_classes = [CustomJWTAuthentication]
     permission_classes = [AllowAny]
     serializer_class = SearchSuggestionsSerializer
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = 'suggest'
+
+    def get_throttle_cost(self, request):
+        """One token, plus one per catalog lookup a non-empty query runs."""
+        if not request.GET.get("query", "").strip():
+            return 1
+        suggestion_type = request.GET.get("type", "all")
+        lookups = sum(
+            suggestion_type in ["all", kind]
+            and request.GET.get(f"include_{kind}s", "true").lower() == "true"
+            for kind in ["store", "product"]
+        )
+        return 1 + lookups
 
-    def split_query_terms(self, query):
-        stopwords = {"in", "at", "on", "and", "or", "for", "the", "a", "an", "of", "with", "to", "from", "by"}
-        terms = re.split(r'\s+', query)
-        return [term for term in terms if term.lower() not in stopwords]
+    def get_trending_region_id(self, request):
+        region_name = request.GET.get("region", "").strip()
+        if region_name and region_name.lower() != "everywhere":
+            return Region.objects.filter(
+                region__iexact=region_name
+            ).values_list("id", flat=True).first()
+        if request.user and request.user.is_authenticated:
+            return request.user.preferred_region_id
+        return None
 
     def get(self, request):
         query = request.GET.get("query", "").strip()
         suggestion_type = request.GET.get("type", "all")
         include_history = request.GET.get("include_history", "true").lower() == "true"
+        include_trending = request.GET.get("include_trending", "true").lower() == "true"
         include_products = request.GET.get("include_products", "true").lower() == "true"
         include_stores = request.GET.get("include_stores", "true").lower() == "true"
 
-        terms = self.split_query_terms(query)
+        terms = split_query(query)
+        key_terms = query_terms(query)
         results = {}
 
-        # Suggest stores
+        # Suggest stores (any term matching the indexed search key; none without terms)
         if suggestion_type in ["all", "store"] and include_stores:
-            store_queryset = Store.objects.none()
-            for term in terms:
-                store_queryset |= Store.objects.filter(
-                    name__icontains=term
-                ) | Store.objects.filter(
-                    address__icontains=term
-                ) | Store.objects.filter(
-                    region__region__icontains=term
-                )
-            stores = store_queryset.distinct()[:10]
+            stores = []
+            if key_terms:
+                stores = Store.objects.only("id", "name", "address").filter(
+                    search_key__overlap=key_terms
+                )[:10]
             results["stores"] = [{"id": store.id, "name": store.name, "address": store.address} for store in stores]
 
-        # Suggest products
+        # Suggest products (any term matching the indexed search key; none without terms)
         if suggestion_type in ["all", "product"] and include_products:
-            product_queryset = Product.objects.none()
-            for term in terms:
-                product_queryset |= Product.objects.filter(
-                    name__icontains=term
-                ) | Product.objects.filter(
-                    brand__icontains=term
-                ) | Product.objects.filter(
-                    amount__icontains=term
-                )
-            products = product_queryset.distinct()[:10]
+            products = []
+            if key_terms:
+                products = Product.objects.only("id", "name", "brand", "amount").filter(
+                    search_key__overlap=key_terms
+                )[:10]
             results["products"] = [
                 {"id": product.id, "name": product.name, "brand": product.brand, "amount": product.amount}
                 for product in products
@@ -111,11 +139,12 @@ class SearchSuggestionsView(APIView):
         # Suggest user history
         if suggestion_type in ["all", "history"] and include_history:
             if request.user and request.user.is_authenticated:
-                history_queryset = UserSearchHistory.objects.none()
-                for term in terms:
-                    history_queryset |= UserSearchHistory.objects.filter(
-                        user=request.user, query__icontains=term
-                    )
+                history_queryset = UserSearchHistory.objects.filter(user=request.user)
+                if terms:
+                    term_filter = Q()
+                    for term in terms:
+                        term_filter |= Q(query__icontains=term)
+                    history_queryset = history_queryset.filter(term_filter)
                 history = history_queryset.order_by("-timestamp").distinct()[:10]
                 results["history"] = [
                     {"id": record.id, "query": record.query, "timestamp": record.timestamp}
@@ -124,4 +153,15 @@ class SearchSuggestionsView(APIView):
             else:
                 results["history"] = []
 
+        # Suggest trending queries (served from the cached rollup)
+        if suggestion_type in ["all", "trending"] and include_trending:
+            trending = get_trending(self.get_trending_region_id(request))
+            results["trending"] = match_trending(trending, terms)
+
+        # Offer a spelling correction when nothing matched at all
+        if query and not any(results.values()):
+            correction = suggest_correction(query)
+            if correction:
+                results["did_you_mean"] = correction
+
         return Response(results)
@@ -1,4 +1,6 @@
 from rest_framework import serializers
+from core.bulk import BulkItemSerializer
+from core.fields import ImageDerivativeField
 from core.models import Store, Region
 
 
@@ -30,6 +32,8 @@ class StoreDetailSerializer(StoreSerializer):
     """Serializer for store detail view."""
     region_name = serializers.CharField(source='region.region', read_only=True)
     region = serializers.CharField(write_only=True, required=False)  # Accepts region name
+    image_thumbnail = ImageDerivativeField('thumb', source='image')
+    image_medium = ImageDerivativeField('medium', source='image')
 
     class Meta(StoreSerializer.Meta):
         fields = StoreSerializer.Meta.fields + [
@@ -37,6 +41,7 @@ class StoreDetailSerializer(StoreSerializer):
             'opening_hours', 'region', 'region_name', 'store_type',
             'parking_availability', 'wheelchair_accessible',
             'additional_info', 'date_added', 'img_is_verified',
+            'image_thumbnail', 'image_medium',
         ]
 
     def create(self, validated_data):
@@ -79,3 +84,18 @@ class StoreImgVerifiedSerializer(serializers.ModelSerializer):
 
         instance.save()
         return instance
+
+
+class BulkStoreSerializer(BulkItemSerializer):
+    """Serializer for stores in bulk writes; region is given by name."""
+    region = serializers.CharField(required=False, allow_blank=True, max_length=255)
+
+    class Meta:
+        model = Store
+        fields = [
+            'id', 'name', 'address', 'lat', 'lon', 'phone_number', 'email',
+            'website', 'opening_hours', 'region', 'store_type',
+            'parking_availability', 'wheelchair_accessible',
+            'additional_info', 'source',
+        ]
+        read_only_fields = ['id']
@@ -1,13 +1,15 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from core.authentication import CustomJWTAuthentication
+from core.bulk import BulkWriteMixin
+from core.spelling import invalidate_spelling_index
 from store.permissions import IsStaffOrReadOnly
-from core.models import Store
+from core.models import Region, Store
 from store import serializers
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter
+from core.filters import SearchKeyFilter
 from rest_framework.pagination import PageNumberPagination
 
 class StorePagination(PageNumberPagination):
@@ -16,17 +18,14 @@ class StorePagination(PageNumberPagination):
     page_size_query_param = "page_size"
     max_page_size = 100  # Prevent excessive data loads
 
-class StoreViewSet(viewsets.ModelViewSet):
+class StoreViewSet(BulkWriteMixin, viewsets.ModelViewSet):
     """View for managing store APIs."""
     serializer_class = serializers.StoreDetailSerializer
+    bulk_serializer_class = serializers.BulkStoreSerializer
     queryset = Store.objects.all().order_by('date_added')
-    filter_backends = [DjangoFilterBackend, SearchFilter]
+    filter_backends = [DjangoFilterBackend, SearchKeyFilter]
     filterset_fields = ['region__region']
-    search_fields = [
-    'name',
-    'address',
-    'region__region'
-]
+    search_key_fields = ['search_key']
     authentication_classes = [CustomJWTAuthentication]
     pagination_class = StorePagination
 
@@ -38,6 +37,8 @@ class StoreViewSet(viewsets.ModelViewSet):
             return [AllowAny()]
         elif self.action == 'store_image_upload':
             return [IsAuthenticated()]
+        elif self.action == 'bulk':
+            return [IsAuthenticated(), IsAdminUser()]
         else:
             return [IsAuthenticated(), IsStaffOrReadOnly()]
 
@@ -45,6 +46,38 @@ class StoreViewSet(viewsets.ModelViewSet):
         response = super().create(request, *args, **kwargs)
         return response
 
+    def get_bulk_queryset(self):
+        return Store.objects.select_related('region')
+
+    def prepare_bulk_items(self, items, errors):
+        """Resolve region names, creating missing regions in one insert."""
+        for item in items.values():
+            if not item.get('region', True):
+                del item['region']  # Blank keeps the current region
+        names = {item['region'] for item in items.values() if 'region' in item}
+        regions = {}
+        for region in Region.objects.filter(region__in=names).order_by('-pk'):
+            regions[region.region] = region
+        missing = [Region(region=name) for name in names if name not in regions]
+        for region in Region.objects.bulk_create(missing):
+            regions[region.region] = region
+
+        self.bulk_regions = {region.pk: region for region in regions.values()}
+        for item in items.values():
+            if 'region' in item:
+                item['region'] = regions[item['region']].pk
+
+    def prepare_bulk_instance(self, instance, fields):
+        if 'region' in fields:
+            instance.region = self.bulk_regions[instance.region_id]
+        if fields & set(instance.SEARCH_KEY_FIELDS):
+            instance.search_key = instance.build_search_key()
+            return ['search_key']
+        return []
+
+    def perform_bulk_write(self, created, updated, previous):
+        invalidate_spelling_index()
+
     @action(
         detail=True,
         methods=['PUT'],
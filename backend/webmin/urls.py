@@ -8,6 +8,7 @@ from .views import (
     PriceListImportHistoryListView,
     UndoPriceListImportView,
     PriceListingWebminViewSet,  # <-- new
+    AuditMetricsView,
 )
 
 router = DefaultRouter()
@@ -20,6 +21,7 @@ urlpatterns = [
     path("users/<int:id>/", UserDetailView.as_view(), name="user-detail"),
     path("pricelistimporthistory/", PriceListImportHistoryListView.as_view(), name="price-list-import-history"),
     path("undo-mti-import/<int:id>/", UndoPriceListImportView.as_view(), name="undo-price-list-import"),
+    path("audit-metrics/", AuditMetricsView.as_view(), name="audit-metrics"),
 ]
 
 # Append router urls
@@ -116,7 +116,10 @@ def process_product_import(products_df):
             product.name = product_row["Item"] or product.name
             product.brand = product_row["Brand"] or product.brand
             product.amount = product_row["Size"] or product.amount
-            product.save()
+            product.save(
+                update_fields=['name', 'brand', 'amount'],
+                track_changes=False,
+            )
         else:
             # Create if not found
             Product.objects.create(
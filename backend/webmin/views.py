@@ -11,13 +11,17 @@ from rest_framework.permissions import IsAdminUser
 from .serializers import PriceListUploadSerializer, WebminUserSerializer, PriceListImportHistorySerializer, UndoPriceListImportSerializer, WebminPriceListingSerializer
 from django.contrib.auth import get_user_model
 from core.models import Region, PriceListImportHistory, PriceListing
+from core.filters import SearchKeyFilter
+from core.spelling import invalidate_spelling_index
+from price.price_index import refresh_for_changes, refresh_price_index
+from action.audit import audit_buffer
 from .utils import (
     extract_sheet_data, process_product_import, process_store_import,
     process_price_import, log_import_history, detect_header_row
 )
 from django.db import transaction
 import pandas as pd
-from django.utils.timezone import now
+from django.utils.timezone import localdate, now
 
 User = get_user_model()
 
@@ -52,6 +56,7 @@ class PriceListUploadView(APIView):
                 process_product_import(products_df)
 
                 # Process each sheet
+                imported_regions = []
                 for sheet in sheet_names:
                     df = xl.parse(sheet)
                     region_name = sheet.strip().title()
@@ -61,10 +66,13 @@ class PriceListUploadView(APIView):
                         _, stores_df, price_instances_df = extract_sheet_data(sheet, df)
                         unresolved_stores.extend(process_store_import(stores_df, region))
                         process_price_import(price_instances_df, region, date_added)
+                        imported_regions.append(region.id)
                     except Exception as e:
                         skipped_sheets.append({"sheet": sheet, "error": str(e)})
 
                 log_import_history(file.name, request.user, True, date_added, f"Processed {len(sheet_names)} sheets.")
+                invalidate_spelling_index()
+                refresh_price_index(localdate(date_added), imported_regions)
 
                 return Response({
                     "message": "File processed successfully.",
@@ -129,6 +137,10 @@ class UndoPriceListImportView(RetrieveDestroyAPIView):
             # Delete associated price listings
             deleted_count, _ = PriceListing.objects.filter(date_added=instance.date_imported).delete()
             instance.delete()
+            refresh_price_index(
+                localdate(instance.date_imported),
+                Region.objects.values_list('id', flat=True),
+            )
 
         return Response(
             {
@@ -157,7 +169,43 @@ class PriceListingWebminViewSet(ModelViewSet):
     permission_classes = [permissions.IsAdminUser]
 
     pagination_class = PriceListingPagination
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
-    # We'll search by related product fields:
-    search_fields = ['product__brand', 'product__name', 'product__amount', 'store__name', 'store__address']
+    filter_backends = [DjangoFilterBackend, SearchKeyFilter, OrderingFilter]
+    # We'll search by the related product and store search keys:
+    search_key_fields = ['product__search_key', 'store__search_key']
     ordering_fields = ['product__brand', 'product__name', 'product__amount', 'store__name', 'store__address']
+
+    def refresh_index_on_commit(self, dates, store_ids, product_ids):
+        transaction.on_commit(
+            lambda: refresh_for_changes(dates, store_ids, product_ids)
+        )
+
+    def perform_create(self, serializer):
+        listing = serializer.save()
+        self.refresh_index_on_commit(
+            [listing.date_added], [listing.store_id], [listing.product_id]
+        )
+
+    def perform_update(self, serializer):
+        """Refresh the price index from the earlier of the old and new dates."""
+        old = serializer.instance
+        before = (old.date_added, old.store_id, old.product_id)
+        listing = serializer.save()
+        self.refresh_index_on_commit(
+            [before[0], listing.date_added],
+            {before[1], listing.store_id},
+            {before[2], listing.product_id},
+        )
+
+    def perform_destroy(self, instance):
+        instance.delete()
+        self.refresh_index_on_commit(
+            [instance.date_added], [instance.store_id], [instance.product_id]
+        )
+
+
+class AuditMetricsView(APIView):
+    """Audit buffer metrics for the process serving the request."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(audit_buffer.metrics(), status=status.HTTP_200_OK)